@@ -0,0 +1,41 @@
+"""fractional photo positions
+
+Revision ID: 0b94e6d2c8a1
+Revises: f3c71a8e5b20
+Create Date: 2026-10-19 17:08:12.730944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b94e6d2c8a1'
+down_revision: Union[str, None] = 'f3c71a8e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('listing_photos', 'position',
+               existing_type=sa.INTEGER(),
+               type_=sa.Float(),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    # Renumber first so no two photos round to the same integer
+    op.execute("""
+        UPDATE listing_photos SET position = ranked.rank
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY position, id) - 1 AS rank
+            FROM listing_photos
+        ) AS ranked
+        WHERE listing_photos.id = ranked.id
+    """)
+    op.alter_column('listing_photos', 'position',
+               existing_type=sa.Float(),
+               type_=sa.INTEGER(),
+               existing_nullable=False)
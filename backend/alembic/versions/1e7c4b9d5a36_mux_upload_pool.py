@@ -0,0 +1,36 @@
+"""mux upload pool
+
+Revision ID: 1e7c4b9d5a36
+Revises: f5a1c8e3d264
+Create Date: 2026-10-19 22:41:17.204815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e7c4b9d5a36'
+down_revision: Union[str, None] = 'f5a1c8e3d264'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mux_upload_pool',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('upload_url', sa.Text(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mux_upload_pool_expires_at'), 'mux_upload_pool', ['expires_at'], unique=False)
+    op.add_column('listing_videos', sa.Column('mux_upload_id', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('listing_videos', 'mux_upload_id')
+    op.drop_index(op.f('ix_mux_upload_pool_expires_at'), table_name='mux_upload_pool')
+    op.drop_table('mux_upload_pool')
@@ -0,0 +1,28 @@
+"""mux webhook attempts
+
+Revision ID: 3e8a1f6c9b52
+Revises: d6f2a8c4b913
+Create Date: 2026-10-20 11:02:17.394061
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a1f6c9b52'
+down_revision: Union[str, None] = 'd6f2a8c4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('mux_webhook_events', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('mux_webhook_events', sa.Column('last_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('mux_webhook_events', 'last_error')
+    op.drop_column('mux_webhook_events', 'attempts')
@@ -0,0 +1,28 @@
+"""listing list indexes
+
+Revision ID: 4f1d2a9b7c3e
+Revises: cc353c2bfa61
+Create Date: 2026-10-19 09:12:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1d2a9b7c3e'
+down_revision: Union[str, None] = 'cc353c2bfa61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_listings_photographer_id'), 'listings', ['photographer_id'], unique=False)
+    op.create_index('ix_listing_photos_listing_id_position', 'listing_photos', ['listing_id', 'position'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_photos_listing_id_position', table_name='listing_photos')
+    op.drop_index(op.f('ix_listings_photographer_id'), table_name='listings')
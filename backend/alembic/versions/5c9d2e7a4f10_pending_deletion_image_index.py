@@ -0,0 +1,26 @@
+"""pending deletion image index
+
+Revision ID: 5c9d2e7a4f10
+Revises: 3e8a1f6c9b52
+Create Date: 2026-10-21 09:41:52.107384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9d2e7a4f10'
+down_revision: Union[str, None] = '3e8a1f6c9b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_pending_storage_deletions_cloudflare_image_id', 'pending_storage_deletions', ['cloudflare_image_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_storage_deletions_cloudflare_image_id', table_name='pending_storage_deletions')
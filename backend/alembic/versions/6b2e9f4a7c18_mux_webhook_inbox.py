@@ -0,0 +1,40 @@
+"""mux webhook inbox
+
+Revision ID: 6b2e9f4a7c18
+Revises: 1e7c4b9d5a36
+Create Date: 2026-10-19 23:12:45.618302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2e9f4a7c18'
+down_revision: Union[str, None] = '1e7c4b9d5a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mux_webhook_events',
+    sa.Column('id', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_mux_webhook_events_pending', 'mux_webhook_events', ['processed_at', 'occurred_at'], unique=False)
+    op.create_index(op.f('ix_listing_videos_mux_asset_id'), 'listing_videos', ['mux_asset_id'], unique=False)
+    op.create_index(op.f('ix_listing_videos_mux_upload_id'), 'listing_videos', ['mux_upload_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_listing_videos_mux_upload_id'), table_name='listing_videos')
+    op.drop_index(op.f('ix_listing_videos_mux_asset_id'), table_name='listing_videos')
+    op.drop_index('ix_mux_webhook_events_pending', table_name='mux_webhook_events')
+    op.drop_table('mux_webhook_events')
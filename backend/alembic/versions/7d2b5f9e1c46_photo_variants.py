@@ -0,0 +1,32 @@
+"""photo variants
+
+Revision ID: 7d2b5f9e1c46
+Revises: 0b94e6d2c8a1
+Create Date: 2026-10-19 17:52:30.214587
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2b5f9e1c46'
+down_revision: Union[str, None] = '0b94e6d2c8a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_photos', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('listing_photos', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('listing_photos', sa.Column('blur_data_url', sa.Text(), nullable=True))
+    op.add_column('listing_photos', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('listing_photos', 'variants')
+    op.drop_column('listing_photos', 'blur_data_url')
+    op.drop_column('listing_photos', 'height')
+    op.drop_column('listing_photos', 'width')
@@ -0,0 +1,26 @@
+"""listing pagination index
+
+Revision ID: 8a3e5c1f0d27
+Revises: 4f1d2a9b7c3e
+Create Date: 2026-10-19 10:03:17.402961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a3e5c1f0d27'
+down_revision: Union[str, None] = '4f1d2a9b7c3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_listings_photographer_id_created_at', 'listings', ['photographer_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listings_photographer_id_created_at', table_name='listings')
@@ -0,0 +1,28 @@
+"""photo content hash
+
+Revision ID: 9c5e1a7d3f82
+Revises: 7d2b5f9e1c46
+Create Date: 2026-10-19 19:04:11.528310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5e1a7d3f82'
+down_revision: Union[str, None] = '7d2b5f9e1c46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_photos', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index('ix_listing_photos_content_sha256', 'listing_photos', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_photos_content_sha256', table_name='listing_photos')
+    op.drop_column('listing_photos', 'content_sha256')
@@ -0,0 +1,26 @@
+"""photo perceptual hash
+
+Revision ID: a4d8e2f61b37
+Revises: 9c5e1a7d3f82
+Create Date: 2026-10-19 19:41:52.063184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2f61b37'
+down_revision: Union[str, None] = '9c5e1a7d3f82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_photos', sa.Column('perceptual_hash', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('listing_photos', 'perceptual_hash')
@@ -0,0 +1,26 @@
+"""video reconcile index
+
+Revision ID: a9d3c6e1f047
+Revises: 6b2e9f4a7c18
+Create Date: 2026-10-19 23:47:29.530146
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3c6e1f047'
+down_revision: Union[str, None] = '6b2e9f4a7c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_listing_videos_status_created_at', 'listing_videos', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_videos_status_created_at', table_name='listing_videos')
@@ -0,0 +1,48 @@
+"""full text search
+
+Revision ID: b71c4e2d9a05
+Revises: 8a3e5c1f0d27
+Create Date: 2026-10-19 11:26:52.630184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71c4e2d9a05'
+down_revision: Union[str, None] = '8a3e5c1f0d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The PostgreSQL search schema lives only here; SQLite test databases get
+    # their FTS5 tables from the DDL hooks in app.services.search.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "ALTER TABLE listings ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(address, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(mls_number, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+    )
+    op.execute("CREATE INDEX ix_listings_search_vector ON listings USING GIN (search_vector)")
+    op.execute(
+        "ALTER TABLE leads ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(email, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(message, '')), 'B')) STORED"
+    )
+    op.execute("CREATE INDEX ix_leads_search_vector ON leads USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index('ix_leads_search_vector', table_name='leads')
+    op.drop_column('leads', 'search_vector')
+    op.drop_index('ix_listings_search_vector', table_name='listings')
+    op.drop_column('listings', 'search_vector')
@@ -0,0 +1,40 @@
+"""pending storage deletions
+
+Revision ID: c3f7b9a2e815
+Revises: a4d8e2f61b37
+Create Date: 2026-10-19 20:26:37.940215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f7b9a2e815'
+down_revision: Union[str, None] = 'a4d8e2f61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('pending_storage_deletions',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('cloudflare_image_id', sa.String(length=255), nullable=True),
+    sa.Column('media_key', sa.String(length=255), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pending_storage_deletions_next_attempt_at', 'pending_storage_deletions', ['next_attempt_at'], unique=False)
+    # Lookups by image id decide whether a queued image is still referenced
+    op.create_index('ix_listing_photos_cloudflare_image_id', 'listing_photos', ['cloudflare_image_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_photos_cloudflare_image_id', table_name='listing_photos')
+    op.drop_index('ix_pending_storage_deletions_next_attempt_at', table_name='pending_storage_deletions')
+    op.drop_table('pending_storage_deletions')
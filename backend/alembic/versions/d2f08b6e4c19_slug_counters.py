@@ -0,0 +1,35 @@
+"""slug counters
+
+Revision ID: d2f08b6e4c19
+Revises: b71c4e2d9a05
+Create Date: 2026-10-19 13:41:09.257731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f08b6e4c19'
+down_revision: Union[str, None] = 'b71c4e2d9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Counters are seeded lazily from existing slugs on first use of each base
+    op.create_table('slug_counters',
+    sa.Column('base', sa.String(length=300), nullable=False),
+    sa.Column('last_suffix', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('base')
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index('ix_listings_slug_pattern', 'listings', ['slug'], unique=False, postgresql_ops={'slug': 'varchar_pattern_ops'})
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_listings_slug_pattern', table_name='listings')
+    op.drop_table('slug_counters')
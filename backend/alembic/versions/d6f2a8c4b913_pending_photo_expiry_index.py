@@ -0,0 +1,27 @@
+"""pending photo expiry index
+
+Revision ID: d6f2a8c4b913
+Revises: a9d3c6e1f047
+Create Date: 2026-10-20 10:14:36.482917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6f2a8c4b913'
+down_revision: Union[str, None] = 'a9d3c6e1f047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_listing_photos_pending_created_at', 'listing_photos', ['created_at'], unique=False,
+                    postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_photos_pending_created_at', table_name='listing_photos')
@@ -0,0 +1,47 @@
+"""photographer stats
+
+Revision ID: e6a9d3b1f724
+Revises: d2f08b6e4c19
+Create Date: 2026-10-19 15:02:37.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a9d3b1f724'
+down_revision: Union[str, None] = 'd2f08b6e4c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('photographer_stats',
+    sa.Column('photographer_id', sa.String(length=36), nullable=False),
+    sa.Column('active_listings', sa.Integer(), nullable=False),
+    sa.Column('total_listings', sa.Integer(), nullable=False),
+    sa.Column('total_leads', sa.Integer(), nullable=False),
+    sa.Column('total_agents', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['photographer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('photographer_id')
+    )
+    # Backfill from the source tables (same as `python -m app.services.stats --repair`)
+    op.execute("""
+        INSERT INTO photographer_stats
+            (photographer_id, active_listings, total_listings, total_leads, total_agents, updated_at)
+        SELECT u.id,
+            (SELECT COUNT(*) FROM listings l WHERE l.photographer_id = u.id AND l.status = 'active'),
+            (SELECT COUNT(*) FROM listings l WHERE l.photographer_id = u.id),
+            (SELECT COUNT(*) FROM leads ld JOIN listings l ON l.id = ld.listing_id WHERE l.photographer_id = u.id),
+            (SELECT COUNT(*) FROM agents a WHERE a.photographer_id = u.id),
+            CURRENT_TIMESTAMP
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('photographer_stats')
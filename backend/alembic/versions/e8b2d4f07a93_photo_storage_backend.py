@@ -0,0 +1,28 @@
+"""photo storage backend
+
+Revision ID: e8b2d4f07a93
+Revises: c3f7b9a2e815
+Create Date: 2026-10-19 21:12:48.417702
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2d4f07a93'
+down_revision: Union[str, None] = 'c3f7b9a2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_photos', sa.Column('storage_backend', sa.String(length=20), server_default='cloudflare', nullable=False))
+    op.add_column('pending_storage_deletions', sa.Column('storage_backend', sa.String(length=20), server_default='cloudflare', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('pending_storage_deletions', 'storage_backend')
+    op.drop_column('listing_photos', 'storage_backend')
@@ -0,0 +1,26 @@
+"""photo upload status
+
+Revision ID: f3c71a8e5b20
+Revises: e6a9d3b1f724
+Create Date: 2026-10-19 16:24:51.604219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c71a8e5b20'
+down_revision: Union[str, None] = 'e6a9d3b1f724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('listing_photos', sa.Column('status', sa.String(length=20), server_default='ready', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('listing_photos', 'status')
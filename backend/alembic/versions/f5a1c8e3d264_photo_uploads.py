@@ -0,0 +1,39 @@
+"""photo uploads
+
+Revision ID: f5a1c8e3d264
+Revises: e8b2d4f07a93
+Create Date: 2026-10-19 21:58:03.771529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a1c8e3d264'
+down_revision: Union[str, None] = 'e8b2d4f07a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('photo_uploads',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('listing_id', sa.String(length=36), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_photo_uploads_listing_id'), 'photo_uploads', ['listing_id'], unique=False)
+    op.create_index(op.f('ix_photo_uploads_expires_at'), 'photo_uploads', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_photo_uploads_expires_at'), table_name='photo_uploads')
+    op.drop_index(op.f('ix_photo_uploads_listing_id'), table_name='photo_uploads')
+    op.drop_table('photo_uploads')
@@ -6,6 +6,7 @@ from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.agent import Agent
 from app.schemas.agent import AgentCreate, AgentUpdate, AgentResponse
+from app.services.stats import adjust_stats
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
@@ -26,6 +27,8 @@ def create_agent(
 ):
     agent = Agent(**req.model_dump(), photographer_id=user.id)
     db.add(agent)
+    db.flush()
+    adjust_stats(db, user.id, total_agents=1)
     db.commit()
     db.refresh(agent)
     return agent
@@ -76,4 +79,6 @@ def delete_agent(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     db.delete(agent)
+    db.flush()
+    adjust_stats(db, user.id, total_agents=-1)
     db.commit()
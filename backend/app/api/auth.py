@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.auth import hash_password, verify_password, create_access_token, get_current_user
 from app.models.user import User
+from app.models.stats import PhotographerStats
 from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -14,6 +15,8 @@ def signup(req: SignupRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     user = User(email=req.email, password_hash=hash_password(req.password), business_name=req.business_name)
     db.add(user)
+    db.flush()
+    db.add(PhotographerStats(photographer_id=user.id))
     db.commit()
     db.refresh(user)
     return user
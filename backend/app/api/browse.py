@@ -0,0 +1,67 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.responses import model_response
+from app.models.listing import Listing
+from app.models.photo import ListingPhoto
+from app.schemas.public import BrowsePage
+from app.services.facet_index import facet_index
+
+router = APIRouter(prefix="/browse", tags=["public"])
+
+
+@router.get("", response_model=BrowsePage)
+def browse_listings(
+    min_price: int | None = Query(None, ge=0),
+    max_price: int | None = Query(None, ge=0),
+    min_beds: int | None = Query(None, ge=0),
+    max_beds: int | None = Query(None, ge=0),
+    min_baths: int | None = Query(None, ge=0),
+    max_baths: int | None = Query(None, ge=0),
+    min_sqft: int | None = Query(None, ge=0),
+    max_sqft: int | None = Query(None, ge=0),
+    sort: Literal["price", "price_per_sqft"] = Query("price"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    limit: int = Query(24, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Public discovery of active listings, filtered and sorted in memory."""
+    facet_index.ensure_loaded(db)  # kept current by the background refresher
+    total, ids = facet_index.query(
+        min_price=min_price, max_price=max_price,
+        min_beds=min_beds, max_beds=max_beds,
+        min_baths=min_baths, max_baths=max_baths,
+        min_sqft=min_sqft, max_sqft=max_sqft,
+        sort=sort, order=order, limit=limit, offset=offset,
+    )
+    if not ids:
+        return model_response(BrowsePage(total=total, items=[]))
+
+    first_photo = (
+        select(ListingPhoto.thumbnail_url)
+        .where(ListingPhoto.listing_id == Listing.id, ListingPhoto.status == "ready")
+        .order_by(ListingPhoto.position)
+        .limit(1)
+        .correlate(Listing)
+        .scalar_subquery()
+    )
+    rows = db.query(
+        Listing.id,
+        Listing.slug,
+        Listing.address,
+        Listing.price,
+        Listing.beds,
+        Listing.baths,
+        Listing.sqft,
+        first_photo.label("first_photo_url"),
+    ).filter(Listing.id.in_(ids), Listing.status == "active").all()
+
+    # Keep the index's ordering; rows archived or deleted since the last sync drop out
+    by_id = {row.id: row for row in rows}
+    items = [by_id[listing_id]._asdict() for listing_id in ids if listing_id in by_id]
+    return model_response(BrowsePage(total=total, items=items))
@@ -0,0 +1,22 @@
+import re
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.core.files import file_response
+from app.services.storage import LocalStorage
+
+router = APIRouter(tags=["files"])
+
+# Names LocalStorage gives stored images: uuid4 hex plus an extension
+IMAGE_ID = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]{1,5}$")
+
+
+@router.api_route("/files/{image_id}", methods=["GET", "HEAD"], include_in_schema=False)
+def get_stored_file(image_id: str, request: Request):
+    """Photo originals kept by the local storage backend (byte ranges, cached for a year)."""
+    if not IMAGE_ID.match(image_id):
+        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        return file_response(LocalStorage().path(image_id), request.headers)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.database import get_db
@@ -8,6 +9,8 @@ from app.models.listing import Listing
 from app.models.lead import Lead
 from app.schemas.lead import LeadCreate, LeadResponse
 from app.services.email import send_lead_notification
+from app.services.search import ranked_matches
+from app.services.stats import adjust_stats
 
 router = APIRouter(tags=["leads"])
 
@@ -32,6 +35,8 @@ def submit_lead(slug: str, req: LeadCreate, db: Session = Depends(get_db)):
         message=req.message,
     )
     db.add(lead)
+    db.flush()
+    adjust_stats(db, listing.photographer_id, total_leads=1)
     db.commit()
     db.refresh(lead)
 
@@ -92,3 +97,42 @@ def list_leads(
             )
         )
     return result
+
+
+@router.get("/leads/search", response_model=list[LeadResponse])
+def search_leads(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Full-text search over lead name, email and message, best match first."""
+    own_listings = select(Listing.id).where(Listing.photographer_id == user.id)
+    matches = ranked_matches(Lead, q, db, Lead.listing_id.in_(own_listings))
+    if matches is None:
+        return []
+    rows = (
+        db.query(Lead, Listing.address)
+        .join(Listing, Listing.id == Lead.listing_id)
+        .join(matches, matches.c.id == Lead.id)
+        .filter(Listing.photographer_id == user.id)
+        .order_by(matches.c.rank.desc(), Lead.created_at.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    return [
+        LeadResponse(
+            id=lead.id,
+            listing_id=lead.listing_id,
+            name=lead.name,
+            email=lead.email,
+            phone=lead.phone,
+            message=lead.message,
+            notified=lead.notified,
+            created_at=lead.created_at,
+            listing_address=address,
+        )
+        for lead, address in rows
+    ]
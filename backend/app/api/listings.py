@@ -1,32 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import base64
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.core.database import get_db
 from app.core.auth import get_current_user
+from app.core.responses import adapter_response
 from app.models.user import User
 from app.models.agent import Agent
 from app.models.listing import Listing
+from app.models.photo import ListingPhoto
+from app.models.video import ListingVideo
+from app.models.lead import Lead
+from app.models.upload import PhotoUpload
 from app.schemas.listing import (
     ListingCreate,
     ListingUpdate,
     ListingStatusUpdate,
+    ListingBulkStatusUpdate,
+    ListingBulkDelete,
     ListingResponse,
     ListingDetailResponse,
+    ListingPage,
+    BulkListingResponse,
+    BulkActionResponse,
 )
-from app.services.slug import get_unique_slug
+from app.services.facet_index import facet_index
+from app.services.search import ranked_matches
+from app.services.slug import insert_with_unique_slugs, save_with_unique_slug
+from app.services.stats import adjust_stats, get_stats
+from app.services.storage_gc import queue_listing_photos
 
 router = APIRouter(prefix="/listings", tags=["listings"])
 
 FREE_TIER_LIMIT = 5
+BULK_IMPORT_MAX_ROWS = 5000
+BULK_ACTION_MAX_IDS = 1000
+
+LISTING_PAGE = TypeAdapter(ListingPage)
+LISTING_LIST = TypeAdapter(list[ListingResponse])
+LISTING_DETAIL = TypeAdapter(ListingDetailResponse)
+
+SORT_COLUMNS = {
+    "created_at": Listing.created_at,
+    "price": Listing.price,
+    "address": Listing.address,
+}
 
 
 def _listing_to_response(listing: Listing) -> dict:
     """Convert a Listing ORM object to a response dict with computed URLs."""
-    # Get first photo by position for the card thumbnail
-    first_photo = None
-    if listing.photos:
-        sorted_photos = sorted(listing.photos, key=lambda p: p.position)
-        first_photo = sorted_photos[0].thumbnail_url if sorted_photos else None
+    # photos relationship is ordered by position, so the first is the card thumbnail
+    photos = listing.ready_photos
+    first_photo = photos[0].thumbnail_url if photos else None
 
     return {
         "id": listing.id,
@@ -47,6 +82,51 @@ def _listing_to_response(listing: Listing) -> dict:
     }
 
 
+def _listing_list_query(db: Session):
+    """Query selecting only the columns ListingResponse needs.
+
+    The agent name comes from an outer join and the card thumbnail from a
+    correlated subquery on (listing_id, position), so listing N rows costs one
+    query instead of 2N+1 lazy loads.
+    """
+    first_photo = (
+        select(ListingPhoto.thumbnail_url)
+        .where(ListingPhoto.listing_id == Listing.id, ListingPhoto.status == "ready")
+        .order_by(ListingPhoto.position)
+        .limit(1)
+        .correlate(Listing)
+        .scalar_subquery()
+    )
+    return db.query(
+        Listing.id,
+        Listing.agent_id,
+        Listing.slug,
+        Listing.address,
+        Listing.price,
+        Listing.beds,
+        Listing.baths,
+        Listing.sqft,
+        Listing.description,
+        Listing.mls_number,
+        Listing.status,
+        Agent.name.label("agent_name"),
+        first_photo.label("first_photo_url"),
+    ).outerjoin(Agent, Agent.id == Listing.agent_id)
+
+
+def _row_to_response(row) -> dict:
+    """Convert a row from _listing_list_query to a response dict."""
+    data = row._asdict()
+    data["branded_url"] = f"/p/{row.slug}"
+    data["unbranded_url"] = f"/p/{row.slug}/mls"
+    return data
+
+
+def _get_listing_response(listing_id: str, db: Session) -> dict:
+    """Load a single listing through the list projection."""
+    return _row_to_response(_listing_list_query(db).filter(Listing.id == listing_id).one())
+
+
 def _listing_to_detail_response(listing: Listing) -> dict:
     """Convert a Listing ORM object to a detail response dict including photos, videos, and agent name."""
     data = _listing_to_response(listing)
@@ -56,8 +136,12 @@ def _listing_to_detail_response(listing: Listing) -> dict:
             "url": p.url,
             "thumbnail_url": p.thumbnail_url,
             "position": p.position,
+            "width": p.width,
+            "height": p.height,
+            "blur_data_url": p.blur_data_url,
+            "variants": p.variants,
         }
-        for p in sorted(listing.photos, key=lambda p: p.position)
+        for p in listing.ready_photos
     ]
     data["videos"] = [
         {
@@ -73,32 +157,141 @@ def _listing_to_detail_response(listing: Listing) -> dict:
     return data
 
 
+def _active_listing_count(user: User, db: Session) -> int:
+    """Active listings from the user's stats row, locked until commit."""
+    return get_stats(db, user.id, for_update=True).active_listings
+
+
+def _free_tier_error() -> str:
+    return f"Free tier limited to {FREE_TIER_LIMIT} active listings. Upgrade to add more."
+
+
 def _check_free_tier_limit(user: User, db: Session) -> None:
     """Raise 403 if user is on free tier and has reached the active listing limit."""
     if user.subscription_tier == "free":
-        active_count = (
-            db.query(Listing)
-            .filter(Listing.photographer_id == user.id, Listing.status == "active")
-            .count()
-        )
+        active_count = _active_listing_count(user, db)
         if active_count >= FREE_TIER_LIMIT:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Free tier limited to {FREE_TIER_LIMIT} active listings. Upgrade to add more.",
-            )
+            raise HTTPException(status_code=403, detail=_free_tier_error())
+
+
+def _encode_cursor(sort: str, order: str, value, listing_id: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, order, value, listing_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str, order: str) -> tuple:
+    """Return the (sort value, listing id) a page ends at. Raises 400 if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, listing_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort == "created_at":
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    return value, listing_id
+
+
+def _status_facets(user: User, db: Session) -> dict[str, int]:
+    """Count the user's listings per status with a single GROUP BY.
+
+    Deliberately ignores list_listings' `status` filter: the counts always
+    cover all of the user's listings, so the dashboard reads the free-tier
+    active count (and the tab badges) from any page, whichever tab is open.
+    """
+    rows = (
+        db.query(Listing.status, func.count(Listing.id))
+        .filter(Listing.photographer_id == user.id)
+        .group_by(Listing.status)
+        .all()
+    )
+    return {status: count for status, count in rows}
 
 
-@router.get("", response_model=list[ListingResponse])
+@router.get("", response_model=ListingPage)
 def list_listings(
     status: str | None = Query(None),
+    sort: Literal["created_at", "price", "address"] = Query("created_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+    include: str | None = Query(None, description="Comma-separated extras, e.g. 'facets'"),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Listing).filter(Listing.photographer_id == user.id)
+    """Keyset-paginated listings, ordered by (sort column, id).
+
+    include=facets adds per-status counts of all the user's listings,
+    unaffected by `status`.
+    """
+    column = SORT_COLUMNS[sort]
+    query = _listing_list_query(db).filter(Listing.photographer_id == user.id)
     if status:
         query = query.filter(Listing.status == status)
-    listings = query.all()
-    return [_listing_to_response(l) for l in listings]
+
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort, order)
+        if order == "desc":
+            query = query.filter(or_(column < value, and_(column == value, Listing.id < last_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, Listing.id > last_id)))
+
+    if order == "desc":
+        query = query.order_by(column.desc(), Listing.id.desc())
+    else:
+        query = query.order_by(column.asc(), Listing.id.asc())
+
+    # Fetch one extra row to know whether another page exists
+    if sort == "created_at":
+        query = query.add_columns(Listing.created_at.label("sort_value"))
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        last_value = last.sort_value if sort == "created_at" else getattr(last, sort)
+        next_cursor = _encode_cursor(sort, order, last_value, last.id)
+
+    items = []
+    for row in rows:
+        data = _row_to_response(row)
+        data.pop("sort_value", None)
+        items.append(data)
+
+    includes = set(include.split(",")) if include else set()
+    return adapter_response(LISTING_PAGE, {
+        "items": items,
+        "next_cursor": next_cursor,
+        "facets": _status_facets(user, db) if "facets" in includes else None,
+    })
+
+
+@router.get("/search", response_model=list[ListingResponse])
+def search_listings(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Full-text search over address, description and MLS number, best match first."""
+    matches = ranked_matches(Listing, q, db, Listing.photographer_id == user.id)
+    if matches is None:
+        return []
+    rows = (
+        _listing_list_query(db)
+        .join(matches, matches.c.id == Listing.id)
+        .order_by(matches.c.rank.desc(), Listing.id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    return adapter_response(LISTING_LIST, [_row_to_response(row) for row in rows])
 
 
 @router.post("", response_model=ListingResponse, status_code=201)
@@ -117,13 +310,9 @@ def create_listing(
     # Enforce free tier limit
     _check_free_tier_limit(user, db)
 
-    # Generate unique slug
-    slug = get_unique_slug(req.address, db)
-
     listing = Listing(
         photographer_id=user.id,
         agent_id=req.agent_id,
-        slug=slug,
         address=req.address,
         price=req.price,
         beds=req.beds,
@@ -133,10 +322,209 @@ def create_listing(
         mls_number=req.mls_number,
         status="active",
     )
-    db.add(listing)
+    save_with_unique_slug(db, listing, req.address)
+    adjust_stats(db, user.id, total_listings=1, active_listings=1)
+    db.commit()
+    facet_index.apply(listing)
+    return _get_listing_response(listing.id, db)
+
+
+def _parse_bulk_rows(body: bytes, content_type: str) -> list[dict]:
+    """Parse a bulk import body: a JSON array of objects, or CSV with a header row."""
+    if content_type.startswith("text/csv"):
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # Empty CSV cells mean "not provided" for optional fields
+            return [{k: v for k, v in row.items() if k and v != ""} for row in reader]
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="Invalid CSV")
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of listings")
+    return rows
+
+
+@router.post("/bulk", response_model=BulkListingResponse)
+async def bulk_create_listings(
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create many listings from a JSON array or a CSV upload (Content-Type: text/csv).
+
+    Rows are validated independently and reported per row; valid rows are
+    inserted together in one transaction.
+    """
+    rows = _parse_bulk_rows(await request.body(), request.headers.get("content-type", ""))
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_IMPORT_MAX_ROWS} listings per import")
+    return await run_in_threadpool(_import_listings, rows, user, db)
+
+
+def _import_listings(rows: list, user: User, db: Session) -> dict:
+    results: list[dict] = []
+    valid: list[tuple[int, ListingCreate]] = []
+    for i, row in enumerate(rows):
+        try:
+            valid.append((i, ListingCreate.model_validate(row)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            results.append({"row": i, "status": "error", "error": f"{field}: {error['msg']}" if field else error["msg"]})
+
+    # Validate all referenced agents in one query
+    agent_ids = {req.agent_id for _, req in valid}
+    owned_agents = {
+        agent_id for (agent_id,) in
+        db.query(Agent.id).filter(Agent.id.in_(agent_ids), Agent.photographer_id == user.id)
+    } if agent_ids else set()
+    accepted = []
+    for i, req in valid:
+        if req.agent_id in owned_agents:
+            accepted.append((i, req))
+        else:
+            results.append({"row": i, "status": "error", "error": "Agent not found"})
+
+    # Enforce the free tier once for the whole batch
+    if user.subscription_tier == "free":
+        remaining = max(FREE_TIER_LIMIT - _active_listing_count(user, db), 0)
+        for i, _ in accepted[remaining:]:
+            results.append({"row": i, "status": "error", "error": _free_tier_error()})
+        accepted = accepted[:remaining]
+
+    if accepted:
+        now = datetime.now(timezone.utc)
+        values = [
+            {
+                **req.model_dump(),
+                "id": str(uuid.uuid4()),
+                "photographer_id": user.id,
+                "status": "active",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for _, req in accepted
+        ]
+        insert_with_unique_slugs(db, values, [req.address for _, req in accepted])
+        adjust_stats(db, user.id, total_listings=len(values), active_listings=len(values))
+        db.commit()
+        facet_index.apply_rows(values)
+        results.extend(
+            {"row": i, "status": "created", "id": v["id"], "slug": v["slug"]}
+            for (i, _), v in zip(accepted, values)
+        )
+
+    results.sort(key=lambda r: r["row"])
+    return {"created": len(accepted), "failed": len(results) - len(accepted), "results": results}
+
+
+def _bulk_ids(ids: list[str]) -> list[str]:
+    """De-duplicate requested ids, keeping their order. Raises 413 past the cap."""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BULK_ACTION_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_ACTION_MAX_IDS} listings per request")
+    return ids
+
+
+def _owned_rows(ids: list[str], user: User, db: Session) -> dict:
+    """The user's listings among `ids`, by id, fetched in one query."""
+    if not ids:
+        return {}
+    rows = (
+        db.query(Listing.id, Listing.status, Listing.price, Listing.beds, Listing.baths, Listing.sqft)
+        .filter(Listing.id.in_(ids), Listing.photographer_id == user.id)
+        .all()
+    )
+    return {row.id: row for row in rows}
+
+
+def _bulk_response(ids: list[str], results: dict[str, dict]) -> dict:
+    ordered = [results[listing_id] for listing_id in ids]
+    failed = sum(1 for r in ordered if r["status"] == "error")
+    return {"succeeded": len(ordered) - failed, "failed": failed, "results": ordered}
+
+
+@router.post("/bulk-status", response_model=BulkActionResponse)
+def bulk_update_listing_status(
+    req: ListingBulkStatusUpdate,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Set the status of many listings with one UPDATE; results are reported per id."""
+    if req.status not in ("active", "archived"):
+        raise HTTPException(status_code=400, detail="Status must be 'active' or 'archived'")
+    ids = _bulk_ids(req.ids)
+    owned = _owned_rows(ids, user, db)
+
+    results: dict[str, dict] = {}
+    to_change = []
+    for listing_id in ids:
+        row = owned.get(listing_id)
+        if row is None:
+            results[listing_id] = {"id": listing_id, "status": "error", "error": "Listing not found"}
+        elif row.status == req.status:
+            results[listing_id] = {"id": listing_id, "status": "updated"}
+        else:
+            to_change.append(row)
+
+    # Enforce the free tier once for the whole batch
+    if req.status == "active" and to_change and user.subscription_tier == "free":
+        remaining = max(FREE_TIER_LIMIT - _active_listing_count(user, db), 0)
+        for row in to_change[remaining:]:
+            results[row.id] = {"id": row.id, "status": "error", "error": _free_tier_error()}
+        to_change = to_change[:remaining]
+
+    if to_change:
+        db.query(Listing).filter(Listing.id.in_([row.id for row in to_change])).update(
+            {Listing.status: req.status}, synchronize_session=False
+        )
+        sign = 1 if req.status == "active" else -1
+        adjust_stats(db, user.id, active_listings=sign * len(to_change))
     db.commit()
-    db.refresh(listing)
-    return _listing_to_response(listing)
+
+    facet_index.apply_rows([{**row._asdict(), "status": req.status} for row in to_change])
+    for row in to_change:
+        results[row.id] = {"id": row.id, "status": "updated"}
+    return _bulk_response(ids, results)
+
+
+@router.post("/bulk-delete", response_model=BulkActionResponse)
+def bulk_delete_listings(
+    req: ListingBulkDelete,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Delete many listings and their leads, photos and videos with set-based DELETEs."""
+    ids = _bulk_ids(req.ids)
+    owned = _owned_rows(ids, user, db)
+    to_delete = [listing_id for listing_id in ids if listing_id in owned]
+
+    if to_delete:
+        lead_count = db.query(func.count(Lead.id)).filter(Lead.listing_id.in_(to_delete)).scalar()
+        queue_listing_photos(db, to_delete)
+        # Children first: the ORM cascade isn't involved in bulk deletes
+        for model in (Lead, ListingPhoto, ListingVideo, PhotoUpload):
+            db.query(model).filter(model.listing_id.in_(to_delete)).delete(synchronize_session=False)
+        db.query(Listing).filter(Listing.id.in_(to_delete)).delete(synchronize_session=False)
+        adjust_stats(
+            db, user.id,
+            total_listings=-len(to_delete),
+            active_listings=-sum(1 for listing_id in to_delete if owned[listing_id].status == "active"),
+            total_leads=-lead_count,
+        )
+        db.commit()
+        for listing_id in to_delete:
+            facet_index.remove(listing_id)
+
+    results = {
+        listing_id: {"id": listing_id, "status": "deleted"} if listing_id in owned
+        else {"id": listing_id, "status": "error", "error": "Listing not found"}
+        for listing_id in ids
+    }
+    return _bulk_response(ids, results)
 
 
 @router.get("/{listing_id}", response_model=ListingDetailResponse)
@@ -145,12 +533,16 @@ def get_listing(
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    listing = db.query(Listing).filter(
+    listing = db.query(Listing).options(
+        joinedload(Listing.agent),
+        selectinload(Listing.photos),
+        selectinload(Listing.videos),
+    ).filter(
         Listing.id == listing_id, Listing.photographer_id == user.id
     ).first()
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    return _listing_to_detail_response(listing)
+    return adapter_response(LISTING_DETAIL, _listing_to_detail_response(listing))
 
 
 @router.put("/{listing_id}", response_model=ListingResponse)
@@ -170,14 +562,14 @@ def update_listing(
 
     # Re-generate slug if address changed
     if "address" in update_data:
-        listing.slug = get_unique_slug(update_data["address"], db)
-
-    for key, value in update_data.items():
-        setattr(listing, key, value)
+        save_with_unique_slug(db, listing, update_data["address"], update_data)
+    else:
+        for key, value in update_data.items():
+            setattr(listing, key, value)
 
     db.commit()
-    db.refresh(listing)
-    return _listing_to_response(listing)
+    facet_index.apply(listing)
+    return _get_listing_response(listing.id, db)
 
 
 @router.delete("/{listing_id}", status_code=204)
@@ -191,8 +583,17 @@ def delete_listing(
     ).first()
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
+    deltas = {
+        "total_listings": -1,
+        "active_listings": -1 if listing.status == "active" else 0,
+        "total_leads": -db.query(func.count(Lead.id)).filter(Lead.listing_id == listing_id).scalar(),
+    }
+    queue_listing_photos(db, [listing_id])
     db.delete(listing)
+    db.flush()
+    adjust_stats(db, user.id, **deltas)
     db.commit()
+    facet_index.remove(listing_id)
 
 
 @router.patch("/{listing_id}/status", response_model=ListingResponse)
@@ -215,7 +616,9 @@ def update_listing_status(
     if req.status == "active" and listing.status != "active":
         _check_free_tier_limit(user, db)
 
-    listing.status = req.status
+    if req.status != listing.status:
+        listing.status = req.status
+        adjust_stats(db, user.id, active_listings=1 if req.status == "active" else -1)
     db.commit()
-    db.refresh(listing)
-    return _listing_to_response(listing)
+    facet_index.apply(listing)
+    return _get_listing_response(listing.id, db)
@@ -1,22 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+import asyncio
+import contextlib
+import logging
+import os
+import uuid
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, UploadFile, File
+from sqlalchemy.orm import Query as OrmQuery, Session
 from pydantic import BaseModel
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.models.user import User
 from app.models.listing import Listing
 from app.models.photo import ListingPhoto
-from app.services.cloudflare import upload_image, delete_image
+from app.models.upload import PhotoUpload
+from app.schemas.listing import PhotoVariant
+from app.services.image_pipeline import process_staged, remove_variants, stage_upload, variants_key
+from app.services.images import SNIFF_BYTES, sniff_image_type
+from app.services.photo_dedup import (
+    dedup_enabled, find_duplicate, hash_upload, image_in_use, record_lookup, shared_values,
+)
+from app.services.photo_order import move_photo, photo_slots, set_order
+from app.services.photo_similarity import near_duplicate_clusters
+from app.services.resumable import (
+    OffsetMismatch, UploadBusy, UploadTooLarge, append_part, create_upload, current_offset, discard_upload,
+    locked_part,
+)
+from app.services.storage import create_upload_url, delete_image, get_storage, get_uploaded_image, upload_image
+from app.services.storage_gc import queue_photo_deletions
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["photos"])
 
+MAX_PHOTOS_PER_LISTING = 50
+
 
 class PhotoResponse(BaseModel):
     id: str
     url: str
     thumbnail_url: str
-    position: int
+    position: float
+    width: int | None = None
+    height: int | None = None
+    blur_data_url: str | None = None
+    variants: list[PhotoVariant] | None = None
     model_config = {"from_attributes": True}
 
 
@@ -24,6 +54,153 @@ class PhotoOrderRequest(BaseModel):
     photo_ids: list[str]
 
 
+class PhotoMoveRequest(BaseModel):
+    # Exactly one of these: the photo to place this one directly before/after
+    before: str | None = None
+    after: str | None = None
+
+
+class DirectUploadRequest(BaseModel):
+    count: int = 1
+
+
+class DirectUploadTicket(BaseModel):
+    photo_id: str
+    upload_url: str  # POST the file here as multipart field "file"
+
+
+class SimilarPhoto(PhotoResponse):
+    listing_id: str
+
+
+class PhotoCluster(BaseModel):
+    photos: list[SimilarPhoto]
+
+
+class ResumableUploadRequest(BaseModel):
+    filename: str
+    size: int  # total bytes
+
+
+class ResumableUploadResponse(BaseModel):
+    upload_id: str
+    offset: int
+    size: int
+    expires_at: datetime
+
+
+class PhotoBatchResult(BaseModel):
+    filename: str
+    status: str  # "created" or "error"
+    photo: PhotoResponse | None = None
+    error: str | None = None
+
+
+class PhotoBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[PhotoBatchResult]
+
+
+def _check_image(file: UploadFile) -> str:
+    """Check size and magic bytes of a spooled upload; returns its content type.
+
+    Raises 413/415 before anything is sent upstream. Leaves the file rewound.
+    """
+    size = file.size
+    if size is None:
+        file.file.seek(0, 2)
+        size = file.file.tell()
+    if size > settings.MAX_PHOTO_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Photos must be at most {settings.MAX_PHOTO_UPLOAD_BYTES // (1024 * 1024)} MB",
+        )
+    file.file.seek(0)
+    content_type = sniff_image_type(file.file.read(SNIFF_BYTES))
+    file.file.seek(0)
+    if content_type is None:
+        raise HTTPException(status_code=415, detail="Photos must be JPEG, PNG, WebP or HEIC images")
+    return content_type
+
+
+async def _transfer(file: UploadFile, content_type: str, photo_id: str) -> dict:
+    """Send the upload to the storage backend while the image pipeline renders variants.
+
+    Returns the ListingPhoto column values.
+    """
+    staged = await stage_upload(file.file)
+    result, processed = await asyncio.gather(
+        # Stream the spooled file upstream instead of reading it into memory
+        upload_image(file.file, file.filename or "photo.jpg", content_type),
+        process_staged(staged, photo_id),
+        return_exceptions=True,
+    )
+    if isinstance(result, BaseException):
+        remove_variants(photo_id)
+        raise result
+    values = {
+        "id": photo_id,
+        "cloudflare_image_id": result["id"],
+        "storage_backend": get_storage().name,
+        "url": result["url"],
+        "thumbnail_url": result["thumbnail_url"],
+    }
+    if isinstance(processed, dict):
+        values.update(processed)
+    return values
+
+
+async def _store(
+    file: UploadFile,
+    content_type: str,
+    listing: Listing,
+    db: Session,
+    inflight: dict[str, asyncio.Future],
+    limit: asyncio.Semaphore | None = None,
+) -> dict:
+    """Column values for a new photo, transferring the file only if it's new.
+
+    Identical bytes already stored in the dedup scope, or claimed earlier in
+    the same batch (`inflight`, keyed by hash), reuse that image. A file
+    claims its hash as soon as it is hashed, before anything else can yield,
+    so identical files in one batch are transferred once. `limit` bounds
+    concurrent transfers.
+    """
+    digest = await hash_upload(file.file)
+    photo_id = str(uuid.uuid4())
+
+    async def transfer() -> dict:
+        async with limit or contextlib.nullcontext():
+            return await _transfer(file, content_type, photo_id)
+
+    if not dedup_enabled():
+        return {**await transfer(), "content_sha256": digest}
+
+    claimed = inflight.get(digest)
+    if claimed is not None:
+        source = await claimed
+        if source is not None:
+            record_lookup(True, file.size or 0)
+            return {"id": photo_id, "content_sha256": digest, **source}
+        # The claiming file failed; store this one ourselves
+    claim = asyncio.get_running_loop().create_future()
+    inflight[digest] = claim
+    try:
+        duplicate = find_duplicate(digest, listing, db)
+        record_lookup(duplicate is not None, file.size or 0)
+        if duplicate is not None:
+            values = {"id": photo_id, **shared_values(duplicate)}
+        else:
+            values = await transfer()
+    except BaseException:
+        # Let files waiting on this hash try on their own
+        claim.set_result(None)
+        raise
+    claim.set_result(shared_values(values))
+    return {**values, "content_sha256": digest}
+
+
 def _get_listing(listing_id: str, user: User, db: Session) -> Listing:
     listing = db.query(Listing).filter(
         Listing.id == listing_id, Listing.photographer_id == user.id
@@ -33,6 +210,21 @@ def _get_listing(listing_id: str, user: User, db: Session) -> Listing:
     return listing
 
 
+def _similar_clusters(query: OrmQuery, max_distance: int, db: Session) -> list[dict]:
+    """Cluster the photos selected by `query` (in its order) by perceptual hash.
+
+    Only ids and hashes are loaded for the comparison; full rows are fetched
+    for the photos that end up in a cluster.
+    """
+    rows = query.filter(
+        ListingPhoto.status == "ready", ListingPhoto.perceptual_hash.isnot(None)
+    ).with_entities(ListingPhoto.id, ListingPhoto.perceptual_hash).all()
+    groups = near_duplicate_clusters([phash for _, phash in rows], max_distance)
+    ids = [rows[i][0] for group in groups for i in group]
+    photos = {photo.id: photo for photo in db.query(ListingPhoto).filter(ListingPhoto.id.in_(ids))} if ids else {}
+    return [{"photos": [photos[rows[i][0]] for i in group]} for group in groups]
+
+
 @router.post("/listings/{listing_id}/photos", response_model=PhotoResponse, status_code=201)
 async def upload_photo(
     listing_id: str,
@@ -43,19 +235,17 @@ async def upload_photo(
     listing = _get_listing(listing_id, user, db)
 
     # Check max 50 photos
-    count = db.query(ListingPhoto).filter(ListingPhoto.listing_id == listing_id).count()
-    if count >= 50:
-        raise HTTPException(status_code=400, detail="Maximum 50 photos per listing")
+    count, next_position = photo_slots(listing_id, db)
+    if count >= MAX_PHOTOS_PER_LISTING:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_PHOTOS_PER_LISTING} photos per listing")
 
-    file_bytes = await file.read()
-    result = await upload_image(file_bytes, file.filename or "photo.jpg")
+    content_type = _check_image(file)
+    values = await _store(file, content_type, listing, db, {})
 
     photo = ListingPhoto(
         listing_id=listing_id,
-        cloudflare_image_id=result["id"],
-        url=result["url"],
-        thumbnail_url=result["thumbnail_url"],
-        position=count,  # append to end
+        position=next_position,  # append to end
+        **values,
     )
     db.add(photo)
     db.commit()
@@ -63,6 +253,309 @@ async def upload_photo(
     return photo
 
 
+@router.post("/listings/{listing_id}/photos/batch", response_model=PhotoBatchResponse)
+async def upload_photos(
+    listing_id: str,
+    files: list[UploadFile] = File(...),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Upload many photos in one request.
+
+    Transfers to Cloudflare run concurrently (at most PHOTO_UPLOAD_CONCURRENCY
+    at a time), and files with identical bytes are transferred once;
+    successful uploads are appended in submission order and inserted in one
+    transaction. Results are reported per file.
+    """
+    listing = _get_listing(listing_id, user, db)
+    count, next_position = photo_slots(listing_id, db)
+    accepted = files[:max(MAX_PHOTOS_PER_LISTING - count, 0)]
+    semaphore = asyncio.Semaphore(settings.PHOTO_UPLOAD_CONCURRENCY)
+    inflight: dict[str, asyncio.Future] = {}
+
+    async def transfer(file: UploadFile) -> dict:
+        content_type = _check_image(file)
+        return await _store(file, content_type, listing, db, inflight, semaphore)
+
+    outcomes = await asyncio.gather(*(transfer(f) for f in accepted), return_exceptions=True)
+
+    photos = []
+    results = []
+    for i, file in enumerate(files):
+        filename = file.filename or "photo.jpg"
+        if i >= len(accepted):
+            results.append({"filename": filename, "status": "error",
+                            "error": f"Maximum {MAX_PHOTOS_PER_LISTING} photos per listing"})
+            continue
+        outcome = outcomes[i]
+        if isinstance(outcome, HTTPException):
+            results.append({"filename": filename, "status": "error", "error": outcome.detail})
+            continue
+        if isinstance(outcome, BaseException):
+            logger.warning(f"Photo upload failed for listing {listing_id}: {outcome!r}")
+            results.append({"filename": filename, "status": "error", "error": "Upload failed"})
+            continue
+        photo = ListingPhoto(
+            listing_id=listing_id,
+            position=next_position + len(photos),
+            **outcome,
+        )
+        photos.append(photo)
+        results.append({"filename": filename, "status": "created", "photo": photo})
+
+    if photos:
+        try:
+            db.add_all(photos)
+            db.flush()
+            # Serialize before commit expires the rows, to avoid a refresh per photo
+            for result in results:
+                if result["status"] == "created":
+                    result["photo"] = PhotoResponse.model_validate(result["photo"])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Don't leave the transferred images orphaned upstream; duplicates
+            # of photos that were already stored still point at theirs
+            orphaned = {(p.cloudflare_image_id, p.storage_backend): variants_key(p.id, p.variants) for p in photos}
+            orphaned = {image: key for image, key in orphaned.items() if not image_in_use(image[0], db)}
+            await asyncio.gather(*(delete_image(*image) for image in orphaned), return_exceptions=True)
+            for key in orphaned.values():
+                remove_variants(key)
+            raise
+
+    return {"created": len(photos), "failed": len(results) - len(photos), "results": results}
+
+
+@router.post("/listings/{listing_id}/photos/direct-upload", response_model=list[DirectUploadTicket], status_code=201)
+async def create_direct_uploads(
+    listing_id: str,
+    req: DirectUploadRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Issue one-time Cloudflare upload URLs so photo bytes skip the API.
+
+    Only the Cloudflare storage backend supports this.
+
+    Each URL comes with a pending ListingPhoto appended at the end; the
+    browser POSTs the file to the URL, then calls
+    POST /listings/{id}/photos/{photo_id}/complete.
+    """
+    _get_listing(listing_id, user, db)
+    storage = get_storage()
+    if not storage.direct_uploads:
+        raise HTTPException(status_code=400, detail=f"Direct uploads aren't supported by the {storage.name} storage backend")
+    if req.count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1")
+    count, next_position = photo_slots(listing_id, db)
+    if count + req.count > MAX_PHOTOS_PER_LISTING:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_PHOTOS_PER_LISTING} photos per listing")
+
+    semaphore = asyncio.Semaphore(settings.PHOTO_UPLOAD_CONCURRENCY)
+
+    async def reserve() -> dict:
+        async with semaphore:
+            return await create_upload_url({"listing_id": listing_id})
+
+    uploads = await asyncio.gather(*(reserve() for _ in range(req.count)))
+    photos = [
+        ListingPhoto(
+            listing_id=listing_id,
+            cloudflare_image_id=upload["id"],
+            storage_backend=storage.name,
+            url="",
+            thumbnail_url="",
+            position=next_position + i,
+            status="pending",
+        )
+        for i, upload in enumerate(uploads)
+    ]
+    db.add_all(photos)
+    db.flush()
+    tickets = [{"photo_id": photo.id, "upload_url": upload["upload_url"]} for photo, upload in zip(photos, uploads)]
+    db.commit()
+    return tickets
+
+
+@router.post("/listings/{listing_id}/photos/{photo_id}/complete", response_model=PhotoResponse)
+async def complete_direct_upload(
+    listing_id: str,
+    photo_id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Finalize a pending photo once its direct upload has reached Cloudflare."""
+    _get_listing(listing_id, user, db)
+    photo = db.query(ListingPhoto).filter(
+        ListingPhoto.id == photo_id, ListingPhoto.listing_id == listing_id
+    ).first()
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    if photo.status == "ready":
+        return photo
+
+    result = await get_uploaded_image(photo.cloudflare_image_id, photo.storage_backend)
+    if result is None:
+        raise HTTPException(status_code=409, detail="Upload has not finished")
+    photo.url = result["url"]
+    photo.thumbnail_url = result["thumbnail_url"]
+    photo.status = "ready"
+    db.commit()
+    db.refresh(photo)
+    return photo
+
+
+@router.get("/listings/{listing_id}/photos/similar", response_model=list[PhotoCluster])
+def similar_listing_photos(
+    listing_id: str,
+    max_distance: int = Query(settings.NEAR_DUPLICATE_MAX_DISTANCE, ge=0, le=64),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Groups of near-identical photos (e.g. bracketed frames) in a listing, in display order.
+
+    Photos without a perceptual hash (direct uploads) are not compared.
+    """
+    _get_listing(listing_id, user, db)
+    query = db.query(ListingPhoto).filter(ListingPhoto.listing_id == listing_id).order_by(ListingPhoto.position)
+    return _similar_clusters(query, max_distance, db)
+
+
+@router.get("/photos/similar", response_model=list[PhotoCluster])
+def similar_library_photos(
+    max_distance: int = Query(settings.NEAR_DUPLICATE_MAX_DISTANCE, ge=0, le=64),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Near-identical photos across all of the photographer's listings."""
+    query = db.query(ListingPhoto).join(Listing, Listing.id == ListingPhoto.listing_id).filter(
+        Listing.photographer_id == user.id
+    ).order_by(ListingPhoto.listing_id, ListingPhoto.position)
+    return _similar_clusters(query, max_distance, db)
+
+
+def _get_upload(upload_id: str, listing_id: str, db: Session) -> PhotoUpload:
+    upload = db.query(PhotoUpload).filter(
+        PhotoUpload.id == upload_id, PhotoUpload.listing_id == listing_id
+    ).first()
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.post("/listings/{listing_id}/photos/uploads", response_model=ResumableUploadResponse, status_code=201)
+def create_resumable_upload(
+    listing_id: str,
+    req: ResumableUploadRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Start a resumable upload (see app/services/resumable.py for the protocol)."""
+    _get_listing(listing_id, user, db)
+    if req.size < 1:
+        raise HTTPException(status_code=400, detail="size must be at least 1")
+    if req.size > settings.MAX_PHOTO_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Photos must be at most {settings.MAX_PHOTO_UPLOAD_BYTES // (1024 * 1024)} MB",
+        )
+    count, _ = photo_slots(listing_id, db)
+    if count >= MAX_PHOTOS_PER_LISTING:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_PHOTOS_PER_LISTING} photos per listing")
+    upload = create_upload(db, listing_id, req.filename, req.size)
+    db.commit()
+    return {"upload_id": upload.id, "offset": 0, "size": upload.size, "expires_at": upload.expires_at}
+
+
+@router.head("/listings/{listing_id}/photos/uploads/{upload_id}")
+def get_resumable_upload_offset(
+    listing_id: str,
+    upload_id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Where to resume: the Upload-Offset header is the number of bytes stored."""
+    _get_listing(listing_id, user, db)
+    upload = _get_upload(upload_id, listing_id, db)
+    return Response(headers={
+        "Upload-Offset": str(current_offset(upload.id)),
+        "Upload-Length": str(upload.size),
+        "Cache-Control": "no-store",
+    })
+
+
+@router.patch("/listings/{listing_id}/photos/uploads/{upload_id}", status_code=204)
+async def append_resumable_upload(
+    listing_id: str,
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Append the request body, which must start at Upload-Offset. Responds with the new offset."""
+    _get_listing(listing_id, user, db)
+    upload = _get_upload(upload_id, listing_id, db)
+    try:
+        offset = await append_part(upload.id, upload_offset, upload.size, request.stream())
+    except OffsetMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Upload-Offset": str(e.offset)})
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"Upload is limited to {upload.size} bytes")
+    except UploadBusy:
+        raise HTTPException(status_code=409, detail="Another request is writing to this upload")
+    except FileNotFoundError:  # expired and removed by the collector mid-request
+        raise HTTPException(status_code=410, detail="Upload expired")
+    return Response(status_code=204, headers={"Upload-Offset": str(offset)})
+
+
+@router.post("/listings/{listing_id}/photos/uploads/{upload_id}/complete", response_model=PhotoResponse, status_code=201)
+async def complete_resumable_upload(
+    listing_id: str,
+    upload_id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Hand a fully received upload to the storage backend and add it to the listing."""
+    listing = _get_listing(listing_id, user, db)
+    upload = _get_upload(upload_id, listing_id, db)
+    count, next_position = photo_slots(listing_id, db)
+    if count >= MAX_PHOTOS_PER_LISTING:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_PHOTOS_PER_LISTING} photos per listing")
+
+    try:
+        async with locked_part(upload.id) as part:
+            size = os.fstat(part.fileno()).st_size
+            if size != upload.size:
+                raise HTTPException(status_code=409, detail=f"Upload is incomplete ({size} of {upload.size} bytes)")
+            file = UploadFile(part, size=size, filename=upload.filename)
+            content_type = _check_image(file)
+            values = await _store(file, content_type, listing, db, {})
+    except UploadBusy:
+        raise HTTPException(status_code=409, detail="Another request is writing to this upload")
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Upload expired")
+
+    photo = ListingPhoto(listing_id=listing_id, position=next_position, **values)
+    db.add(photo)
+    discard_upload(db, upload)
+    db.commit()
+    db.refresh(photo)
+    return photo
+
+
+@router.delete("/listings/{listing_id}/photos/uploads/{upload_id}", status_code=204)
+def cancel_resumable_upload(
+    listing_id: str,
+    upload_id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _get_listing(listing_id, user, db)
+    discard_upload(db, _get_upload(upload_id, listing_id, db))
+    db.commit()
+
+
 @router.put("/listings/{listing_id}/photos/order", response_model=list[PhotoResponse])
 def reorder_photos(
     listing_id: str,
@@ -71,20 +564,46 @@ def reorder_photos(
     db: Session = Depends(get_db),
 ):
     _get_listing(listing_id, user, db)
-    for position, photo_id in enumerate(req.photo_ids):
-        photo = db.query(ListingPhoto).filter(
-            ListingPhoto.id == photo_id, ListingPhoto.listing_id == listing_id
-        ).first()
-        if photo:
-            photo.position = position
+    set_order(listing_id, req.photo_ids, db)
     db.commit()
     return db.query(ListingPhoto).filter(
-        ListingPhoto.listing_id == listing_id
+        ListingPhoto.listing_id == listing_id, ListingPhoto.status == "ready"
     ).order_by(ListingPhoto.position).all()
 
 
+@router.post("/listings/{listing_id}/photos/{photo_id}/move", response_model=PhotoResponse)
+def move_listing_photo(
+    listing_id: str,
+    photo_id: str,
+    req: PhotoMoveRequest,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Place one photo directly before or after another, updating only that photo."""
+    _get_listing(listing_id, user, db)
+    if (req.before is None) == (req.after is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of 'before' or 'after'")
+    anchor_id = req.before or req.after
+    if anchor_id == photo_id:
+        raise HTTPException(status_code=400, detail="Cannot move a photo relative to itself")
+
+    photos = {
+        photo.id: photo
+        for photo in db.query(ListingPhoto).filter(
+            ListingPhoto.listing_id == listing_id, ListingPhoto.id.in_([photo_id, anchor_id])
+        )
+    }
+    if len(photos) != 2:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    photo = photos[photo_id]
+    move_photo(photo, photos[anchor_id], "before" if req.before else "after", db)
+    db.commit()
+    db.refresh(photo)
+    return photo
+
+
 @router.delete("/listings/{listing_id}/photos/{photo_id}", status_code=204)
-async def delete_photo(
+def delete_photo(
     listing_id: str,
     photo_id: str,
     user: User = Depends(get_current_user),
@@ -96,6 +615,7 @@ async def delete_photo(
     ).first()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
-    await delete_image(photo.cloudflare_image_id)
+    # The storage collector deletes the image once no other photo shares it
+    queue_photo_deletions(db, [(photo.id, photo.cloudflare_image_id, photo.storage_backend, photo.variants)])
     db.delete(photo)
     db.commit()
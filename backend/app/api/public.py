@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.database import get_db
+from app.core.responses import model_response
 from app.models.listing import Listing
 from app.schemas.public import PublicListingResponse, PublicListingMLSResponse
 
@@ -24,7 +25,7 @@ def _get_active_listing(slug: str, db: Session) -> Listing:
 def get_branded_listing(slug: str, db: Session = Depends(get_db)):
     """Public branded listing page data — includes agent info"""
     listing = _get_active_listing(slug, db)
-    return PublicListingResponse(
+    return model_response(PublicListingResponse(
         slug=listing.slug,
         address=listing.address,
         price=listing.price,
@@ -33,17 +34,17 @@ def get_branded_listing(slug: str, db: Session = Depends(get_db)):
         sqft=listing.sqft,
         description=listing.description,
         mls_number=listing.mls_number,
-        photos=sorted(listing.photos, key=lambda p: p.position),
+        photos=sorted(listing.ready_photos, key=lambda p: p.position),
         videos=[v for v in listing.videos if v.status == "ready"],
         agent=listing.agent,
-    )
+    ))
 
 
 @router.get("/{slug}/mls", response_model=PublicListingMLSResponse)
 def get_unbranded_listing(slug: str, db: Session = Depends(get_db)):
     """Public unbranded/MLS listing page data — NO agent info"""
     listing = _get_active_listing(slug, db)
-    return PublicListingMLSResponse(
+    return model_response(PublicListingMLSResponse(
         slug=listing.slug,
         address=listing.address,
         price=listing.price,
@@ -52,6 +53,6 @@ def get_unbranded_listing(slug: str, db: Session = Depends(get_db)):
         sqft=listing.sqft,
         description=listing.description,
         mls_number=listing.mls_number,
-        photos=sorted(listing.photos, key=lambda p: p.position),
+        photos=sorted(listing.ready_photos, key=lambda p: p.position),
         videos=[v for v in listing.videos if v.status == "ready"],
-    )
+    ))
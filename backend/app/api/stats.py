@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.auth import get_current_user
+from app.models.user import User
+from app.schemas.stats import StatsResponse
+from app.services.stats import get_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("", response_model=StatsResponse)
+def read_stats(
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Dashboard counters, read from the maintained photographer_stats row."""
+    stats = get_stats(db, user.id)
+    db.commit()
+    return stats
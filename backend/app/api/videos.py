@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
@@ -8,6 +10,8 @@ from app.models.user import User
 from app.models.listing import Listing
 from app.models.video import ListingVideo
 from app.services.mux_service import create_direct_upload
+from app.services.mux_upload_pool import claim_upload, refill_soon
+from app.services.video_events import stream_video_status
 
 router = APIRouter(tags=["videos"])
 
@@ -31,12 +35,29 @@ class VideoCreateRequest(BaseModel):
 
 
 @router.post("/listings/{listing_id}/videos", response_model=VideoUploadResponse, status_code=201)
-def create_video_upload(
+async def create_video_upload(
     listing_id: str,
     req: VideoCreateRequest = VideoCreateRequest(),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    # Database steps run in the threadpool; only the Mux call is awaited on the loop
+    pooled = await run_in_threadpool(_claim_for_listing, listing_id, user, db)
+    if pooled:
+        upload_id, upload_url = pooled
+    else:
+        upload = await create_direct_upload()
+        upload_id, upload_url = upload["upload_id"], upload["upload_url"]
+
+    video = await run_in_threadpool(_add_video, listing_id, req.title, upload_id, db)
+    if pooled:
+        refill_soon()
+
+    return VideoUploadResponse(video_id=video.id, upload_url=upload_url)
+
+
+def _claim_for_listing(listing_id: str, user: User, db: Session) -> tuple[str, str] | None:
+    """Check the listing can take a video and claim a pooled upload, if there is one."""
     listing = db.query(Listing).filter(
         Listing.id == listing_id, Listing.photographer_id == user.id
     ).first()
@@ -48,18 +69,43 @@ def create_video_upload(
     if count >= 2:
         raise HTTPException(status_code=400, detail="Maximum 2 videos per listing")
 
-    upload = create_direct_upload()
+    pooled = claim_upload(db)
+    if pooled is None:
+        db.rollback()  # no transaction stays open during the Mux call
+    return pooled
+
 
+def _add_video(listing_id: str, title: str | None, upload_id: str, db: Session) -> ListingVideo:
     video = ListingVideo(
         listing_id=listing_id,
-        title=req.title,
+        mux_upload_id=upload_id,
+        title=title,
         status="waiting",  # waiting for upload
     )
     db.add(video)
-    db.commit()
+    db.commit()  # also commits the pooled upload's claim
     db.refresh(video)
+    return video
 
-    return VideoUploadResponse(video_id=video.id, upload_url=upload["upload_url"])
+
+@router.get("/listings/{listing_id}/videos/events")
+def stream_video_events(
+    listing_id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Server-sent events with the listing's video statuses, until none is still processing"""
+    listing = db.query(Listing).filter(
+        Listing.id == listing_id, Listing.photographer_id == user.id
+    ).first()
+    if not listing:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    return StreamingResponse(
+        stream_video_status(listing_id),
+        media_type="text/event-stream",
+        # Stop nginx and similar proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/listings/{listing_id}/videos/{video_id}", response_model=VideoResponse)
@@ -7,14 +7,93 @@ class Settings(BaseSettings):
 
     CLOUDFLARE_ACCOUNT_ID: str = ""
     CLOUDFLARE_API_TOKEN: str = ""
+    CLOUDFLARE_API_BASE: str = "https://api.cloudflare.com/client/v4"
 
     MUX_TOKEN_ID: str = ""
     MUX_TOKEN_SECRET: str = ""
+    # Threads (and pooled connections) for blocking Mux SDK calls (app/services/mux_service.py)
+    MUX_WORKERS: int = 4
+    MUX_TIMEOUT_SECONDS: float = 15
+    # Unused direct uploads kept ready for new videos (app/services/mux_upload_pool.py); 0 disables
+    MUX_UPLOAD_POOL_SIZE: int = 5
+    MUX_UPLOAD_POOL_INTERVAL_SECONDS: float = 60
+    MUX_UPLOAD_TIMEOUT_SECONDS: int = 3600  # Mux cancels unused direct uploads after this
+    # A pooled upload is handed out only while it has at least this long left
+    MUX_UPLOAD_MIN_REMAINING_SECONDS: int = 900
+    # Queued webhooks (app/services/mux_webhooks.py): applied per batch, polled for events other workers received
+    MUX_WEBHOOK_BATCH_SIZE: int = 200
+    MUX_WEBHOOK_INTERVAL_SECONDS: float = 5
+    MUX_WEBHOOK_MAX_ATTEMPTS: int = 5
+    MUX_WEBHOOK_RETENTION_SECONDS: float = 7 * 24 * 3600
+    MUX_WEBHOOK_PRUNE_INTERVAL_SECONDS: float = 3600
+    # Video status streams (app/services/video_events.py)
+    VIDEO_EVENTS_HEARTBEAT_SECONDS: float = 15
+    VIDEO_EVENTS_RESYNC_SECONDS: float = 60
+    # Videos still waiting/processing after this long are re-checked with Mux (app/services/video_reconciler.py)
+    VIDEO_RECONCILE_STALE_SECONDS: float = 15 * 60
+    VIDEO_RECONCILE_INTERVAL_SECONDS: float = 300
+    VIDEO_RECONCILE_BATCH_SIZE: int = 500
+    VIDEO_RECONCILE_CONCURRENCY: int = 4
+    VIDEO_RECONCILE_REQUESTS_PER_SECOND: float = 5
 
     RESEND_API_KEY: str = ""
 
+    # Where photo originals go (app/services/storage.py): "cloudflare", "local" or "s3"
+    PHOTO_STORAGE_BACKEND: str = "cloudflare"
+    STORAGE_LOCAL_ROOT: str = "storage"
+    STORAGE_LOCAL_URL: str = "/files"  # public base URL of GET /files/{id}
+    S3_BUCKET: str = ""
+    S3_REGION: str = ""
+    S3_ENDPOINT_URL: str = ""  # for S3-compatible services (R2, MinIO, ...)
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_PUBLIC_URL: str = ""  # bucket or CDN base URL the photos are served from
+    S3_KEY_PREFIX: str = "photos/"
+
     FRONTEND_URL: str = "http://localhost:3000"
 
+    # Shared outbound HTTP client (app/core/http.py)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5
+    HTTP_TIMEOUT_SECONDS: float = 60  # read/write; photo uploads can be large
+
+    # Concurrent Cloudflare transfers per batch photo upload request
+    PHOTO_UPLOAD_CONCURRENCY: int = 4
+    MAX_PHOTO_UPLOAD_BYTES: int = 50 * 1024 * 1024
+    # Resumable uploads keep their bytes so far here; abandoned ones are removed after the expiry
+    UPLOAD_TMP_DIR: str = "uploads"
+    RESUMABLE_UPLOAD_EXPIRY_SECONDS: float = 24 * 3600
+    # Reuse the stored image for re-uploads of identical bytes: "listing", "photographer" or "off"
+    PHOTO_DEDUP_SCOPE: str = "listing"
+
+    # Local photo processing (app/services/image_pipeline.py); 0 workers = one per core
+    IMAGE_PIPELINE_ENABLED: bool = True
+    IMAGE_WORKERS: int = 0
+    IMAGE_VARIANT_WIDTHS: list[int] = [640, 1280, 1920]
+    MEDIA_ROOT: str = "media"
+    MEDIA_URL: str = "/media"
+    # Photos whose 64-bit perceptual hashes differ in at most this many bits count as near-duplicates
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 10
+
+    # Background deletion of stored images (app/services/storage_gc.py)
+    STORAGE_GC_ENABLED: bool = True
+    STORAGE_GC_INTERVAL_SECONDS: float = 30
+    STORAGE_GC_BATCH_SIZE: int = 100
+    STORAGE_GC_CONCURRENCY: int = 8
+    STORAGE_GC_MAX_BACKOFF_SECONDS: float = 3600
+    # Unreferenced images younger than this may belong to an upload still in progress
+    STORAGE_GC_ORPHAN_GRACE_SECONDS: float = 24 * 3600
+    # Direct-upload photos never completed within this are deleted (Cloudflare's upload URLs last 30 minutes)
+    DIRECT_UPLOAD_EXPIRY_SECONDS: float = 2 * 3600
+
+    # Public browse index, refreshed by a background task: pull changed listings this often, and
+    # rebuild from scratch (dropping listings deleted by other workers) this often
+    FACET_INDEX_SYNC_SECONDS: float = 5
+    FACET_INDEX_REBUILD_SECONDS: float = 300
+
     model_config = {"env_file": ".env"}
 
 settings = Settings()
@@ -0,0 +1,130 @@
+"""
+Serving stored files straight from disk: local photo storage and image variants.
+
+Both are written once under a unique name and never change, so responses
+are cacheable for a year (`immutable`). Starlette's FileResponse has no
+Range support, which video-style seeking and resumed downloads need;
+RangedFileResponse adds single byte ranges, If-Range and 304s. When the
+ASGI server offers the `http.response.zerocopy` extension the body is
+handed over as a file descriptor (sendfile); otherwise it is streamed in
+chunks from a worker thread, never read whole into memory.
+"""
+import os
+import re
+import typing
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(value: str | None, size: int) -> tuple[int, int] | None | bool:
+    """(start, end inclusive) for a single satisfiable range; None to send the
+    whole file (no/unsupported header); False if unsatisfiable."""
+    if not value:
+        return None
+    match = _RANGE.match(value.strip())
+    if not match:
+        return None  # multiple or malformed ranges: a full 200 is a valid answer
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class RangedFileResponse(FileResponse):
+    """A FileResponse that honours Range / If-Range and conditional requests."""
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str | os.PathLike[str], request_headers: Headers, stat_result: os.stat_result,
+                 headers: typing.Mapping[str, str] | None = None, media_type: str | None = None):
+        super().__init__(path, headers=headers, media_type=media_type, stat_result=stat_result)
+        self.headers["accept-ranges"] = "bytes"
+        self.headers.setdefault("cache-control", IMMUTABLE_CACHE_CONTROL)
+        size = stat_result.st_size
+        self.offset, self.count = 0, size
+
+        if_range = request_headers.get("if-range")
+        requested = request_headers.get("range") if if_range in (None, self.headers["etag"]) else None
+        span = _parse_range(requested, size)
+        if span is False:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            self.count = 0
+        elif span is not None:
+            start, end = span
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.headers["content-length"] = str(end - start + 1)
+            self.offset, self.count = start, end - start + 1
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:  # file shrank underneath us
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _etag_matches(response_headers: typing.Mapping[str, str], request_headers: Headers) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return response_headers["etag"] in [tag.strip(" W/") for tag in if_none_match.split(",")]
+
+
+def file_response(path: str, request_headers: Headers, media_type: str | None = None) -> Response:
+    """Serve a stored file, or 304 if the client's copy is current. Raises FileNotFoundError."""
+    stat_result = os.stat(path)
+    response = RangedFileResponse(path, request_headers, stat_result, media_type=media_type)
+    if response.status_code == 200 and _etag_matches(response.headers, request_headers):
+        return NotModifiedResponse(response.headers)
+    return response
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for write-once files: long cache lifetime and byte ranges."""
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        response = RangedFileResponse(full_path, request_headers, stat_result)
+        if response.status_code == 200 and self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
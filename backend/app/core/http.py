@@ -0,0 +1,96 @@
+"""
+The app-wide outbound HTTP client.
+
+One httpx.AsyncClient is opened in the FastAPI lifespan and shared by every
+request, so calls to upstream APIs reuse pooled keep-alive (and, with h2
+installed, HTTP/2) connections instead of paying TCP + TLS setup each time.
+Outside the lifespan (scripts, tests) a client is created on first use.
+"""
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+upstream_requests = registry.counter(
+    "upstream_requests_total", "Requests sent to upstream APIs."
+)
+upstream_connections = registry.counter(
+    "upstream_connections_opened_total", "New TCP connections opened to upstream APIs."
+)
+upstream_latency = registry.histogram(
+    "upstream_request_duration_seconds", "Upstream API request latency, including the response body."
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    options = {
+        "http2": settings.HTTP2_ENABLED and _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "timeout": httpx.Timeout(
+            settings.HTTP_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            pool=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+def set_http_client(client: httpx.AsyncClient | None) -> None:
+    """Replace the shared client (tests point it at a stub transport)."""
+    global _client
+    _client = client
+
+
+async def start_http_client() -> None:
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def upstream_request(service: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the shared client, recording latency and connection reuse."""
+    host = urlsplit(url).hostname or ""
+
+    async def trace(event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            upstream_connections.inc(service=service, host=host)
+
+    start = time.perf_counter()
+    status = "error"
+    try:
+        response = await get_http_client().request(method, url, extensions={"trace": trace}, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        upstream_latency.observe(time.perf_counter() - start, service=service, method=method)
+        upstream_requests.inc(service=service, method=method, status=status)
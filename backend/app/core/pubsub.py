@@ -0,0 +1,85 @@
+"""
+In-process publish/subscribe.
+
+Subscribers are asyncio queues on the event loop they subscribed from.
+publish() can be called from any thread (the event loop, a threadpool
+endpoint or a background worker): messages are handed to each
+subscriber's loop with call_soon_threadsafe.
+
+Messages only reach subscribers in the same process. Consumers that must
+see changes made by other workers should also re-read their source now and
+then.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from app.core.metrics import registry
+
+pubsub_dropped = registry.counter(
+    "pubsub_messages_dropped_total", "Messages dropped because a subscriber's queue was full."
+)
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", topic: str, maxsize: int):
+        self.broker = broker
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        # Set when a message was dropped: the consumer should resynchronise
+        self.overflowed = False
+
+    def _put(self, message) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            pubsub_dropped.inc(topic=self.topic.split(":", 1)[0])
+
+    async def get(self, timeout: float | None = None):
+        """The next message, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self._topics: dict[str, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Subscribe from a running event loop. Close the subscription when done."""
+        subscription = Subscription(self, topic, self.maxsize)
+        with self._lock:
+            self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._topics.get(topic, ()))
+
+    def publish(self, topic: str, message) -> int:
+        """Send to every subscriber of `topic`. Returns how many there were."""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, message)
+            except RuntimeError:  # its loop has closed
+                self.unsubscribe(subscription)
+        return len(subscribers)
@@ -0,0 +1,24 @@
+"""
+JSON responses that are validated and serialized exactly once.
+
+When a handler returns a dict or model, FastAPI dumps it, validates it again
+against `response_model`, runs jsonable_encoder and only then encodes it.
+Hot read endpoints instead return one of these helpers: pydantic-core builds
+the JSON bytes directly. Keep `response_model` on the route for the OpenAPI
+schema; it isn't applied to a returned Response.
+"""
+from typing import Any
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize an already-validated model."""
+    return Response(model.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+def adapter_response(adapter: TypeAdapter, data: Any, status_code: int = 200) -> Response:
+    """Validate plain data (dicts, ORM objects) once against `adapter`, then serialize."""
+    value = adapter.validate_python(data, from_attributes=True)
+    return Response(adapter.dump_json(value), status_code=status_code, media_type="application/json")
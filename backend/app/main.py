@@ -1,7 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.files import ImmutableStaticFiles
+from app.core.http import close_http_client, start_http_client
+from app.core.metrics import registry
+from app.services.facet_index import start_facet_refresher, stop_facet_refresher
+from app.services.image_pipeline import shutdown_pool
+from app.services.mux_service import close_mux_client, start_mux_client
+from app.services.mux_upload_pool import start_filler, stop_filler
+from app.services.mux_webhooks import start_webhook_worker, stop_webhook_worker
+from app.services.video_reconciler import start_reconciler, stop_reconciler
+from app.services.storage_gc import start_collector, stop_collector
 from app.api.auth import router as auth_router
 from app.api.agents import router as agents_router
 from app.api.listings import router as listings_router
@@ -10,8 +23,37 @@ from app.api.videos import router as videos_router
 from app.api.webhooks import router as webhooks_router
 from app.api.public import router as public_router
 from app.api.leads import router as leads_router
+from app.api.browse import router as browse_router
+from app.api.stats import router as stats_router
+from app.api.files import router as files_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    start_mux_client()
+    start_collector()
+    start_filler()
+    start_webhook_worker()
+    start_reconciler()
+    start_facet_refresher()
+    yield
+    await stop_facet_refresher()
+    await stop_reconciler()
+    await stop_webhook_worker()
+    await stop_filler()
+    await stop_collector()
+    await close_http_client()
+    close_mux_client()
+    shutdown_pool()
 
-app = FastAPI(title="PropertyFlow API", version="0.1.0")
+
+app = FastAPI(
+    title="PropertyFlow API",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 cors_origins = [settings.FRONTEND_URL]
 if settings.FRONTEND_URL not in ("http://localhost:3000", "http://localhost:3001"):
@@ -36,7 +78,16 @@ app.include_router(videos_router)
 app.include_router(webhooks_router)
 app.include_router(public_router)
 app.include_router(leads_router)
+app.include_router(browse_router)
+app.include_router(stats_router)
+app.include_router(files_router)
+# Photo variants written by the image pipeline
+app.mount(settings.MEDIA_URL, ImmutableStaticFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return registry.render()
@@ -2,7 +2,12 @@ from app.models.user import User
 from app.models.agent import Agent
 from app.models.listing import Listing
 from app.models.photo import ListingPhoto
-from app.models.video import ListingVideo
+from app.models.video import ListingVideo, MuxUpload
 from app.models.lead import Lead
+from app.models.slug_counter import SlugCounter
+from app.models.stats import PhotographerStats
+from app.models.storage import PendingStorageDeletion
+from app.models.upload import PhotoUpload
+from app.models.webhook import MuxWebhookEvent
 
-__all__ = ["User", "Agent", "Listing", "ListingPhoto", "ListingVideo", "Lead"]
+__all__ = ["User", "Agent", "Listing", "ListingPhoto", "ListingVideo", "MuxUpload", "Lead", "SlugCounter", "PhotographerStats", "PendingStorageDeletion", "PhotoUpload", "MuxWebhookEvent"]
@@ -1,14 +1,21 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import String, Integer, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        Index("ix_listings_photographer_id_created_at", "photographer_id", "created_at"),
+        # Lets slug prefix lookups (slug LIKE 'base-%') use an index under any collation
+        Index(
+            "ix_listings_slug_pattern", "slug", postgresql_ops={"slug": "varchar_pattern_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    photographer_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
+    photographer_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False, index=True)
     agent_id: Mapped[str] = mapped_column(String(36), ForeignKey("agents.id"), nullable=False)
     slug: Mapped[str] = mapped_column(String(300), unique=True, nullable=False, index=True)
     address: Mapped[str] = mapped_column(String(500), nullable=False)
@@ -27,3 +34,9 @@ class Listing(Base):
     photos = relationship("ListingPhoto", back_populates="listing", cascade="all, delete-orphan", order_by="ListingPhoto.position")
     videos = relationship("ListingVideo", back_populates="listing", cascade="all, delete-orphan")
     leads = relationship("Lead", back_populates="listing", cascade="all, delete-orphan")
+    uploads = relationship("PhotoUpload", back_populates="listing", cascade="all, delete-orphan")
+
+    @property
+    def ready_photos(self) -> list:
+        """Photos in position order, without direct uploads still pending."""
+        return [p for p in self.photos if p.status == "ready"]
@@ -1,18 +1,43 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, Integer, ForeignKey, DateTime
+from sqlalchemy import String, BigInteger, Float, Integer, Text, JSON, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 class ListingPhoto(Base):
     __tablename__ = "listing_photos"
+    __table_args__ = (
+        Index("ix_listing_photos_listing_id_position", "listing_id", "position"),
+        Index("ix_listing_photos_content_sha256", "content_sha256"),
+        Index("ix_listing_photos_cloudflare_image_id", "cloudflare_image_id"),
+        # Expiry of abandoned direct uploads (app/services/storage_gc.py); only pending rows are indexed
+        Index(
+            "ix_listing_photos_pending_created_at", "created_at",
+            postgresql_where=text("status = 'pending'"), sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     listing_id: Mapped[str] = mapped_column(String(36), ForeignKey("listings.id"), nullable=False)
+    # Image id in `storage_backend` (named from when Cloudflare was the only one)
     cloudflare_image_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    storage_backend: Mapped[str] = mapped_column(String(20), nullable=False, default="cloudflare", server_default="cloudflare")
+    # Hex SHA-256 of the uploaded bytes; rows with the same hash share cloudflare_image_id
+    content_sha256: Mapped[str | None] = mapped_column(String(64))
     url: Mapped[str] = mapped_column(String(500), nullable=False)
     thumbnail_url: Mapped[str] = mapped_column(String(500), nullable=False)
-    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Fractional rank (see app/services/photo_order.py); lower comes first
+    position: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    # "pending" while a direct creator upload is outstanding; url and
+    # thumbnail_url are empty until the upload is completed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="ready", server_default="ready")
+    # Filled by the local image pipeline for photos uploaded through the API
+    width: Mapped[int | None] = mapped_column(Integer)
+    height: Mapped[int | None] = mapped_column(Integer)
+    blur_data_url: Mapped[str | None] = mapped_column(Text)
+    # 64-bit dHash as a signed BIGINT, for near-duplicate clusters (app/services/photo_similarity.py)
+    perceptual_hash: Mapped[int | None] = mapped_column(BigInteger)
+    variants: Mapped[list | None] = mapped_column(JSON)  # [{width, format, url}]
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     listing = relationship("Listing", back_populates="photos")
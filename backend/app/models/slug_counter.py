@@ -0,0 +1,10 @@
+from sqlalchemy import String, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+class SlugCounter(Base):
+    """Highest suffix handed out per slug base: 1 is the bare base, n is `base-n`."""
+    __tablename__ = "slug_counters"
+
+    base: Mapped[str] = mapped_column(String(300), primary_key=True)
+    last_suffix: Mapped[int] = mapped_column(Integer, nullable=False)
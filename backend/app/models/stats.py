@@ -0,0 +1,15 @@
+from datetime import datetime, timezone
+from sqlalchemy import String, Integer, ForeignKey, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+class PhotographerStats(Base):
+    """Per-photographer usage counters, updated in the same transaction as the rows they count."""
+    __tablename__ = "photographer_stats"
+
+    photographer_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), primary_key=True)
+    active_listings: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_listings: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_leads: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_agents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
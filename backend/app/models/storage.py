@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, Integer, Text, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+class PendingStorageDeletion(Base):
+    """A stored image (and its local variants) to delete once nothing references it.
+
+    Written in the same transaction as the rows that pointed at it; the
+    collector in app/services/storage_gc.py does the actual deletes.
+    """
+    __tablename__ = "pending_storage_deletions"
+    __table_args__ = (
+        Index("ix_pending_storage_deletions_next_attempt_at", "next_attempt_at"),
+        Index("ix_pending_storage_deletions_cloudflare_image_id", "cloudflare_image_id"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    cloudflare_image_id: Mapped[str | None] = mapped_column(String(255))
+    storage_backend: Mapped[str] = mapped_column(String(20), nullable=False, default="cloudflare", server_default="cloudflare")
+    # Directory under MEDIA_ROOT/photos/ holding the image pipeline's variants
+    media_key: Mapped[str | None] = mapped_column(String(255))
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
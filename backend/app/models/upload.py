@@ -0,0 +1,18 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, BigInteger, ForeignKey, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.core.database import Base
+
+class PhotoUpload(Base):
+    """A resumable photo upload in progress; its bytes so far are in UPLOAD_TMP_DIR/<id>.part."""
+    __tablename__ = "photo_uploads"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    listing_id: Mapped[str] = mapped_column(String(36), ForeignKey("listings.id"), nullable=False, index=True)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    listing = relationship("Listing", back_populates="uploads")
@@ -1,18 +1,37 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import String, ForeignKey, DateTime
+from sqlalchemy import String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
 
 class ListingVideo(Base):
     __tablename__ = "listing_videos"
+    __table_args__ = (
+        # Stale-video reconciliation (app/services/video_reconciler.py)
+        Index("ix_listing_videos_status_created_at", "status", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     listing_id: Mapped[str] = mapped_column(String(36), ForeignKey("listings.id"), nullable=False)
-    mux_asset_id: Mapped[str | None] = mapped_column(String(255))
+    mux_upload_id: Mapped[str | None] = mapped_column(String(255), index=True)
+    mux_asset_id: Mapped[str | None] = mapped_column(String(255), index=True)
     mux_playback_id: Mapped[str | None] = mapped_column(String(255))
     title: Mapped[str | None] = mapped_column(String(255))
     status: Mapped[str] = mapped_column(String(20), default="processing")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     listing = relationship("Listing", back_populates="videos")
+
+
+class MuxUpload(Base):
+    """An unused Mux direct upload, created ahead of time by app/services/mux_upload_pool.py.
+
+    Claiming one deletes the row. Rows past expires_at are left for the
+    filler to remove; Mux cancels the upload itself at its timeout.
+    """
+    __tablename__ = "mux_upload_pool"
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)  # the Mux upload id
+    upload_url: Mapped[str] = mapped_column(Text, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from sqlalchemy import String, Integer, Text, JSON, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+class MuxWebhookEvent(Base):
+    """A received Mux webhook, applied later by app/services/mux_webhooks.py.
+
+    Keyed by Mux's event id, so a redelivered event is stored once. An event
+    that fails to apply is retried up to MUX_WEBHOOK_MAX_ATTEMPTS times, then
+    marked processed with its last_error kept.
+    """
+    __tablename__ = "mux_webhook_events"
+    __table_args__ = (
+        Index("ix_mux_webhook_events_pending", "processed_at", "occurred_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    type: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)  # the event's `data` object
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text)
@@ -12,6 +12,20 @@ class ListingCreate(BaseModel):
     mls_number: str | None = None
 
 
+class BulkListingResult(BaseModel):
+    row: int  # 0-based index in the submitted array / CSV data rows
+    status: str  # "created" or "error"
+    id: str | None = None
+    slug: str | None = None
+    error: str | None = None
+
+
+class BulkListingResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkListingResult]
+
+
 class ListingUpdate(BaseModel):
     address: str | None = None
     price: int | None = None
@@ -26,6 +40,27 @@ class ListingStatusUpdate(BaseModel):
     status: str  # "active" or "archived"
 
 
+class ListingBulkStatusUpdate(BaseModel):
+    ids: list[str]
+    status: str  # "active" or "archived"
+
+
+class ListingBulkDelete(BaseModel):
+    ids: list[str]
+
+
+class BulkActionResult(BaseModel):
+    id: str
+    status: str  # "updated", "deleted" or "error"
+    error: str | None = None
+
+
+class BulkActionResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BulkActionResult]
+
+
 class ListingResponse(BaseModel):
     id: str
     agent_id: str
@@ -46,11 +81,27 @@ class ListingResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ListingPage(BaseModel):
+    items: list[ListingResponse]
+    next_cursor: str | None = None
+    facets: dict[str, int] | None = None  # listing count per status, when include=facets
+
+
+class PhotoVariant(BaseModel):
+    width: int
+    format: str  # "webp" or "avif"
+    url: str
+
+
 class PhotoInListing(BaseModel):
     id: str
     url: str
     thumbnail_url: str
-    position: int
+    position: float
+    width: int | None = None
+    height: int | None = None
+    blur_data_url: str | None = None
+    variants: list[PhotoVariant] | None = None
 
     model_config = {"from_attributes": True}
 
@@ -1,11 +1,17 @@
 from pydantic import BaseModel
 
+from app.schemas.listing import PhotoVariant
+
 
 class PublicPhotoResponse(BaseModel):
     id: str
     url: str
     thumbnail_url: str
-    position: int
+    position: float
+    width: int | None = None
+    height: int | None = None
+    blur_data_url: str | None = None
+    variants: list[PhotoVariant] | None = None
     model_config = {"from_attributes": True}
 
 
@@ -55,3 +61,19 @@ class PublicListingMLSResponse(BaseModel):
     photos: list[PublicPhotoResponse]
     videos: list[PublicVideoResponse]
     # Note: NO agent field
+
+
+class BrowseListingResponse(BaseModel):
+    """Card data for the public browse page"""
+    slug: str
+    address: str
+    price: int
+    beds: int
+    baths: int
+    sqft: int
+    first_photo_url: str | None = None
+
+
+class BrowsePage(BaseModel):
+    total: int
+    items: list[BrowseListingResponse]
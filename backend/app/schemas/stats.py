@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class StatsResponse(BaseModel):
+    active_listings: int
+    total_listings: int
+    total_leads: int
+    total_agents: int
+
+    model_config = {"from_attributes": True}
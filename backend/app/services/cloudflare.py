@@ -1,33 +1,92 @@
-import httpx
+import json
+from typing import AsyncIterator, BinaryIO
+
 from app.core.config import settings
+from app.core.http import upstream_request
 
-CLOUDFLARE_BASE = f"https://api.cloudflare.com/client/v4/accounts/{settings.CLOUDFLARE_ACCOUNT_ID}/images/v1"
 
+def _images_url(version: str = "v1") -> str:
+    return f"{settings.CLOUDFLARE_API_BASE}/accounts/{settings.CLOUDFLARE_ACCOUNT_ID}/images/{version}"
 
-async def upload_image(file_bytes: bytes, filename: str) -> dict:
-    """Upload image to Cloudflare Images. Returns {id, url, thumbnail_url}"""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            CLOUDFLARE_BASE,
-            headers={"Authorization": f"Bearer {settings.CLOUDFLARE_API_TOKEN}"},
-            files={"file": (filename, file_bytes)},
-        )
-        response.raise_for_status()
-        result = response.json()["result"]
-        image_id = result["id"]
-        # Cloudflare Images variant URLs
-        base_url = result["variants"][0].rsplit("/", 1)[0]
-        return {
-            "id": image_id,
-            "url": f"{base_url}/public",
-            "thumbnail_url": f"{base_url}/thumbnail",
-        }
+
+def _headers() -> dict:
+    return {"Authorization": f"Bearer {settings.CLOUDFLARE_API_TOKEN}"}
+
+
+async def upload_image(file: BinaryIO | bytes, filename: str, content_type: str | None = None) -> dict:
+    """Upload image to Cloudflare Images. Returns {id, url, thumbnail_url}
+
+    A file object is streamed from the start in 64 KB chunks rather than
+    read into memory first.
+    """
+    response = await upstream_request(
+        "cloudflare", "POST", _images_url(),
+        headers=_headers(),
+        files={"file": (filename, file, content_type)},
+    )
+    response.raise_for_status()
+    return _image_urls(response.json()["result"])
+
+
+def _image_urls(result: dict) -> dict:
+    # Cloudflare Images variant URLs
+    base_url = result["variants"][0].rsplit("/", 1)[0]
+    return {
+        "id": result["id"],
+        "url": f"{base_url}/public",
+        "thumbnail_url": f"{base_url}/thumbnail",
+    }
+
+
+async def create_upload_url(metadata: dict | None = None) -> dict:
+    """Reserve an image id and a one-time URL the browser can POST the file to.
+
+    Returns {id, upload_url}. The image stays a draft until the file arrives.
+    """
+    fields = {"requireSignedURLs": "false"}
+    if metadata:
+        fields["metadata"] = json.dumps(metadata)
+    response = await upstream_request(
+        "cloudflare", "POST", f"{_images_url(version='v2')}/direct_upload",
+        headers=_headers(),
+        # The endpoint only accepts multipart/form-data
+        files={key: (None, value) for key, value in fields.items()},
+    )
+    response.raise_for_status()
+    result = response.json()["result"]
+    return {"id": result["id"], "upload_url": result["uploadURL"]}
+
+
+async def get_uploaded_image(image_id: str) -> dict | None:
+    """{id, url, thumbnail_url} once a direct upload has finished, else None."""
+    response = await upstream_request("cloudflare", "GET", f"{_images_url()}/{image_id}", headers=_headers())
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    result = response.json()["result"]
+    if result.get("draft"):
+        return None
+    return _image_urls(result)
 
 
 async def delete_image(image_id: str):
-    """Delete image from Cloudflare Images"""
-    async with httpx.AsyncClient() as client:
-        await client.delete(
-            f"{CLOUDFLARE_BASE}/{image_id}",
-            headers={"Authorization": f"Bearer {settings.CLOUDFLARE_API_TOKEN}"},
+    """Delete image from Cloudflare Images. An image that is already gone counts as deleted."""
+    response = await upstream_request("cloudflare", "DELETE", f"{_images_url()}/{image_id}", headers=_headers())
+    if response.status_code != 404:
+        response.raise_for_status()
+
+
+async def list_images(per_page: int = 1000) -> AsyncIterator[dict]:
+    """Every image in the account, oldest first, as {id, uploaded, ...} dicts."""
+    params = {"per_page": per_page, "sort_order": "asc"}
+    while True:
+        response = await upstream_request(
+            "cloudflare", "GET", _images_url(version="v2"), headers=_headers(), params=params
         )
+        response.raise_for_status()
+        result = response.json()["result"]
+        for image in result["images"]:
+            yield image
+        if not result.get("continuation_token"):
+            return
+        params["continuation_token"] = result["continuation_token"]
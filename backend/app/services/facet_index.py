@@ -0,0 +1,293 @@
+"""
+In-memory, column-oriented index of active listings for public browsing.
+
+Each filterable attribute lives in its own NumPy array indexed by slot, so a
+range filter is a handful of vectorized comparisons instead of a SQL query.
+The index is loaded from the database on first use and then kept current
+incrementally: write endpoints in this worker push changes directly, and a
+background task syncs every FACET_INDEX_SYNC_SECONDS, pulling rows whose
+`updated_at` moved since the last sync (changes made by other workers). A
+full rebuild every FACET_INDEX_REBUILD_SECONDS drops listings deleted
+elsewhere. Requests never sync or rebuild; they only wait for the first load.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.listing import Listing
+
+logger = logging.getLogger(__name__)
+
+_refresher: asyncio.Task | None = None
+
+
+def _timestamp(value: datetime | None) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ListingFacetIndex:
+    """Slot-based column arrays for price, beds, baths and sqft of active listings."""
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        # Held by whoever is syncing; others serve the index as it is
+        self._refreshing = threading.Lock()
+        self._capacity = capacity
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all entries; the next sync() reloads from the database."""
+        with self._lock:
+            self._allocate(self._capacity)
+            self.loaded = False
+            self._synced_at = 0.0
+            self._rebuilt_at = 0.0
+            self._watermark: datetime | None = None
+
+    def _allocate(self, capacity: int) -> None:
+        self._ids: list[str | None] = [None] * capacity
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._size = 0
+        self.price = np.zeros(capacity, dtype=np.int64)
+        self.beds = np.zeros(capacity, dtype=np.int32)
+        self.baths = np.zeros(capacity, dtype=np.int32)
+        self.sqft = np.zeros(capacity, dtype=np.int32)
+        self.price_per_sqft = np.zeros(capacity, dtype=np.float64)
+        self.live = np.zeros(capacity, dtype=bool)
+
+    def _grow(self) -> None:
+        capacity = len(self._ids) * 2
+        self._ids.extend([None] * (capacity - len(self._ids)))
+        for name in ("price", "beds", "baths", "sqft", "price_per_sqft", "live"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # --- maintenance -------------------------------------------------------
+
+    def _put(self, listing_id: str, price: int, beds: int, baths: int, sqft: int) -> None:
+        slot = self._slots.get(listing_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self._ids):
+                    self._grow()
+                slot = self._size
+                self._size += 1
+            self._slots[listing_id] = slot
+            self._ids[slot] = listing_id
+        self.price[slot] = price
+        self.beds[slot] = beds
+        self.baths[slot] = baths
+        self.sqft[slot] = sqft
+        self.price_per_sqft[slot] = price / sqft if sqft > 0 else np.inf
+        self.live[slot] = True
+
+    def _drop(self, listing_id: str) -> None:
+        slot = self._slots.pop(listing_id, None)
+        if slot is not None:
+            self.live[slot] = False
+            self._ids[slot] = None
+            self._free.append(slot)
+
+    def apply(self, listing: Listing) -> None:
+        """Reflect a created/updated listing. Archived listings are removed."""
+        if not self.loaded:
+            return
+        with self._lock:
+            if listing.status == "active":
+                self._put(listing.id, listing.price, listing.beds, listing.baths, listing.sqft)
+            else:
+                self._drop(listing.id)
+
+    def apply_rows(self, rows: list[dict]) -> None:
+        """Reflect listings written with bulk statements, given as column dicts."""
+        if not self.loaded:
+            return
+        with self._lock:
+            for row in rows:
+                if row["status"] == "active":
+                    self._put(row["id"], row["price"], row["beds"], row["baths"], row["sqft"])
+                else:
+                    self._drop(row["id"])
+
+    def remove(self, listing_id: str) -> None:
+        if not self.loaded:
+            return
+        with self._lock:
+            self._drop(listing_id)
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every active listing in one query."""
+        rows = db.query(
+            Listing.id, Listing.price, Listing.beds, Listing.baths, Listing.sqft, Listing.updated_at
+        ).filter(Listing.status == "active").all()
+        capacity = max(self._capacity, 1 << max(len(rows) - 1, 0).bit_length())
+        with self._lock:
+            self._allocate(capacity)
+            n = len(rows)
+            if n:
+                ids, price, beds, baths, sqft, updated = zip(*rows)
+                self._ids[:n] = ids
+                self._slots = {listing_id: slot for slot, listing_id in enumerate(ids)}
+                self._size = n
+                self.price[:n] = price
+                self.beds[:n] = beds
+                self.baths[:n] = baths
+                self.sqft[:n] = sqft
+                with np.errstate(divide="ignore"):
+                    self.price_per_sqft[:n] = np.where(
+                        self.sqft[:n] > 0, self.price[:n] / np.maximum(self.sqft[:n], 1), np.inf
+                    )
+                self.live[:n] = True
+                self._watermark = max(updated, key=_timestamp)
+            now = time.monotonic()
+            self._synced_at = self._rebuilt_at = now
+            self.loaded = True
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load the index if it hasn't been yet."""
+        if not self.loaded:
+            self.sync(db)
+
+    def sync(self, db: Session) -> None:
+        """Pull listings changed since the last sync, or rebuild when due.
+
+        Returns at once if another thread is already syncing a loaded index.
+        """
+        if not self._refreshing.acquire(blocking=not self.loaded):
+            return
+        try:
+            self._sync(db)
+        finally:
+            self._refreshing.release()
+
+    def _sync(self, db: Session) -> None:
+        now = time.monotonic()
+        if not self.loaded or now - self._rebuilt_at >= settings.FACET_INDEX_REBUILD_SECONDS:
+            self.rebuild(db)
+            return
+        if now - self._synced_at < settings.FACET_INDEX_SYNC_SECONDS:
+            return
+        query = db.query(
+            Listing.id, Listing.status, Listing.price, Listing.beds, Listing.baths, Listing.sqft,
+            Listing.updated_at,
+        )
+        if self._watermark is not None:
+            query = query.filter(Listing.updated_at >= self._watermark)
+        rows = query.all()
+        with self._lock:
+            for listing_id, status, price, beds, baths, sqft, updated_at in rows:
+                if status == "active":
+                    self._put(listing_id, price, beds, baths, sqft)
+                else:
+                    self._drop(listing_id)
+                if self._watermark is None or _timestamp(updated_at) > _timestamp(self._watermark):
+                    self._watermark = updated_at
+            self._synced_at = now
+
+    # --- queries -----------------------------------------------------------
+
+    def query(
+        self,
+        *,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        min_beds: int | None = None,
+        max_beds: int | None = None,
+        min_baths: int | None = None,
+        max_baths: int | None = None,
+        min_sqft: int | None = None,
+        max_sqft: int | None = None,
+        sort: str = "price",
+        order: str = "asc",
+        limit: int = 24,
+        offset: int = 0,
+    ) -> tuple[int, list[str]]:
+        """Return (total matches, listing ids for the requested page).
+
+        Ties on the sort key are broken by slot, so paging is deterministic
+        as long as the index doesn't change between requests.
+        """
+        with self._lock:
+            n = self._size
+            mask = self.live[:n].copy()
+            for column, low, high in (
+                (self.price, min_price, max_price),
+                (self.beds, min_beds, max_beds),
+                (self.baths, min_baths, max_baths),
+                (self.sqft, min_sqft, max_sqft),
+            ):
+                if low is not None:
+                    mask &= column[:n] >= low
+                if high is not None:
+                    mask &= column[:n] <= high
+
+            slots = np.flatnonzero(mask)
+            total = len(slots)
+            keys = (self.price if sort == "price" else self.price_per_sqft)[slots]
+            if order == "desc":
+                keys = -keys.astype(np.float64)
+
+            # Only the first offset+limit rows need ordering: partition first
+            k = offset + limit
+            if k < total:
+                kth = np.partition(keys, k - 1)[k - 1]
+                keep = keys <= kth
+                slots, keys = slots[keep], keys[keep]
+            page = np.lexsort((slots, keys))[offset:k]
+            return total, [self._ids[slot] for slot in slots[page]]
+
+
+facet_index = ListingFacetIndex()
+
+
+def _refresh() -> None:
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        facet_index.sync(db)
+    except Exception as e:
+        logger.warning(f"Facet index sync failed: {e!r}")
+    finally:
+        db.close()
+
+
+async def _run_refresher() -> None:
+    while True:
+        await asyncio.to_thread(_refresh)
+        await asyncio.sleep(settings.FACET_INDEX_SYNC_SECONDS)
+
+
+def start_facet_refresher() -> None:
+    global _refresher
+    if _refresher is None:
+        _refresher = asyncio.create_task(_run_refresher())
+
+
+async def stop_facet_refresher() -> None:
+    global _refresher
+    if _refresher is not None:
+        _refresher.cancel()
+        try:
+            await _refresher
+        except asyncio.CancelledError:
+            pass
+        _refresher = None
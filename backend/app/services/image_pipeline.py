@@ -0,0 +1,207 @@
+"""
+Local processing for uploaded photos: dimensions, responsive variants and a
+blur placeholder.
+
+Decoding and encoding a 20-40 MB camera JPEG is CPU-bound, so it runs in a
+process pool, never on the event loop or a request thread. The upload copies
+the spooled file to a temp path (in chunks) and the worker reads it from
+there; the image itself never crosses the process boundary. Variants are
+written under MEDIA_ROOT/photos/<key>/ and served at MEDIA_URL.
+
+Pillow is optional: without it (or with IMAGE_PIPELINE_ENABLED off) uploads
+simply skip processing and the fields stay empty.
+"""
+import asyncio
+import base64
+import io
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO
+
+from app.core.config import settings
+from app.services.photo_similarity import signed_hash
+
+logger = logging.getLogger(__name__)
+
+BLUR_WIDTH = 16
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _open_rgb(path: str, max_width: int):
+    from PIL import Image, ImageOps
+
+    image = Image.open(path)
+    # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding when
+    # the largest variant is much smaller than the original
+    image.draft("RGB", (max_width, max_width))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    return image
+
+
+def _resized(image, width: int):
+    from PIL import Image
+
+    if image.width <= width:
+        return image
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+
+def _avif_supported() -> bool:
+    from PIL import features
+
+    # Image.SAVE is only filled in once the plugins are imported, so ask features
+    return bool(features.check("avif"))
+
+
+def dhash(image) -> int:
+    """64-bit difference hash: does brightness fall left to right, on a 9x8 grayscale thumbnail.
+
+    Returned in the signed BIGINT range (see app/services/photo_similarity.py).
+    """
+    from PIL import Image
+
+    pixels = image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return signed_hash(bits)
+
+
+def render_photo(source_path: str, out_dir: str, widths: list[int], avif: bool = True) -> dict:
+    """Worker entry point. Returns {width, height, blur_data_url, perceptual_hash, variants}.
+
+    `variants` lists {width, format, filename}; file names are relative to
+    out_dir. Widths above the original are skipped (the original width is
+    used instead if every width is larger).
+    """
+    from PIL import Image
+
+    with Image.open(source_path) as probe:
+        width, height = probe.size
+        if probe.getexif().get(0x0112) in (5, 6, 7, 8):  # EXIF orientation rotates 90°
+            width, height = height, width
+
+    targets = sorted({min(w, width) for w in widths}, reverse=True)
+    image = _open_rgb(source_path, targets[0])
+    os.makedirs(out_dir, exist_ok=True)
+
+    formats = [("webp", "WEBP", {"quality": 80, "method": 4})]
+    if avif and _avif_supported():
+        formats.append(("avif", "AVIF", {"quality": 55, "speed": 8}))
+
+    variants = []
+    current = image
+    for target in targets:
+        # Each size is scaled down from the previous one, not from the original
+        current = _resized(current, target)
+        for extension, format_name, options in formats:
+            filename = f"{target}.{extension}"
+            current.save(os.path.join(out_dir, filename), format_name, **options)
+            variants.append({"width": target, "format": extension, "filename": filename})
+
+    tiny = _resized(current, BLUR_WIDTH)
+    buffer = io.BytesIO()
+    tiny.save(buffer, "WEBP", quality=30)
+    blur_data_url = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    return {
+        "width": width,
+        "height": height,
+        "blur_data_url": blur_data_url,
+        "perceptual_hash": dhash(current),
+        "variants": variants,
+    }
+
+
+def pipeline_available() -> bool:
+    if not settings.IMAGE_PIPELINE_ENABLED:
+        return False
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the server process has threads (and locks) by now
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _copy_to_temp(file: BinaryIO) -> str:
+    file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".upload") as tmp:
+        shutil.copyfileobj(file, tmp, 1024 * 1024)
+    file.seek(0)
+    return tmp.name
+
+
+async def stage_upload(file: BinaryIO) -> str | None:
+    """Copy an upload to a temp file the workers can open. None if the pipeline is off.
+
+    Done before the upstream transfer starts, since both read the same file object.
+    """
+    if not pipeline_available():
+        return None
+    return await asyncio.get_running_loop().run_in_executor(None, _copy_to_temp, file)
+
+
+async def process_staged(path: str | None, key: str) -> dict | None:
+    """Render a staged upload in the process pool and delete the temp file.
+
+    Returns the ListingPhoto fields (width, height, blur_data_url,
+    perceptual_hash, variants with URLs), or None if nothing was staged or the image can't be decoded.
+    """
+    if path is None:
+        return None
+    out_dir = os.path.join(settings.MEDIA_ROOT, "photos", key)
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            get_pool(), render_photo, path, out_dir, settings.IMAGE_VARIANT_WIDTHS
+        )
+    except Exception as e:
+        logger.warning(f"Image processing failed for {key}: {e!r}")
+        shutil.rmtree(out_dir, ignore_errors=True)
+        return None
+    finally:
+        os.unlink(path)
+
+    base_url = f"{settings.MEDIA_URL.rstrip('/')}/photos/{key}"
+    result["variants"] = [
+        {"width": v["width"], "format": v["format"], "url": f"{base_url}/{v['filename']}"}
+        for v in result["variants"]
+    ]
+    return result
+
+
+def variants_key(photo_id: str, variants: list | None) -> str:
+    """Directory key of a photo's variants. Deduplicated photos share the original's."""
+    if variants:
+        return variants[0]["url"].rsplit("/", 2)[-2]
+    return photo_id
+
+
+def remove_variants(key: str) -> None:
+    shutil.rmtree(os.path.join(settings.MEDIA_ROOT, "photos", key), ignore_errors=True)
@@ -0,0 +1,19 @@
+"""Image file helpers shared by the photo upload paths."""
+
+# Enough leading bytes to recognise every format below
+SNIFF_BYTES = 16
+
+HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"mif1", b"msf1"}
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """Content type from the file's magic bytes, or None if it isn't a supported image."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in HEIF_BRANDS:
+        return "image/heic"
+    return None
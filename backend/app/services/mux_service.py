@@ -1,39 +1,121 @@
+"""
+Mux video API.
+
+The Mux SDK is synchronous (urllib3). One ApiClient, and so one pool of
+keep-alive connections, is created on first use and shared by every call.
+Calls run on a small dedicated thread pool, so a slow Mux round trip
+neither blocks the event loop nor takes a thread from FastAPI's shared
+threadpool. Each call is timed into the upstream_* metrics (service="mux").
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import mux_python
+
 from app.core.config import settings
+from app.core.http import upstream_latency, upstream_requests
 
+_client: mux_python.ApiClient | None = None
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
 
-def _get_config():
+
+def _get_config() -> mux_python.Configuration:
     configuration = mux_python.Configuration()
     configuration.username = settings.MUX_TOKEN_ID
     configuration.password = settings.MUX_TOKEN_SECRET
+    # One connection per worker thread
+    configuration.connection_pool_maxsize = settings.MUX_WORKERS
     return configuration
 
 
-def create_direct_upload(cors_origin: str | None = None) -> dict:
-    """Create Mux direct upload URL. Returns {upload_id, upload_url}"""
-    config = _get_config()
-    uploads_api = mux_python.DirectUploadsApi(mux_python.ApiClient(config))
+def get_mux_client() -> mux_python.ApiClient:
+    global _client, _executor
+    with _lock:
+        if _client is None:
+            _client = mux_python.ApiClient(_get_config())
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.MUX_WORKERS, thread_name_prefix="mux")
+        return _client
+
+
+def start_mux_client() -> None:
+    get_mux_client()
+
+
+def close_mux_client() -> None:
+    global _client, _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+        if _client is not None:
+            _client.rest_client.pool_manager.clear()
+            _client.close()
+            _client = None
+
+
+def _timed(method: str, call, *args):
+    start = time.perf_counter()
+    status = "error"
+    try:
+        data, status_code, _ = call(
+            *args,
+            _return_http_data_only=False,
+            _request_timeout=(settings.HTTP_CONNECT_TIMEOUT_SECONDS, settings.MUX_TIMEOUT_SECONDS),
+        )
+        status = str(status_code)
+        return data
+    except mux_python.ApiException as e:
+        status = str(e.status)
+        raise
+    finally:
+        upstream_latency.observe(time.perf_counter() - start, service="mux", method=method)
+        upstream_requests.inc(service="mux", method=method, status=status)
+
+
+async def _run(method: str, call, *args):
+    get_mux_client()
+    return await asyncio.get_running_loop().run_in_executor(_executor, _timed, method, call, *args)
+
+
+async def create_direct_upload(cors_origin: str | None = None) -> dict:
+    """Create Mux direct upload URL, valid for MUX_UPLOAD_TIMEOUT_SECONDS. Returns {upload_id, upload_url}"""
+    uploads_api = mux_python.DirectUploadsApi(get_mux_client())
     request = mux_python.CreateUploadRequest(
         new_asset_settings=mux_python.CreateAssetRequest(
             playback_policy=[mux_python.PlaybackPolicy.PUBLIC],
         ),
         cors_origin=cors_origin or settings.FRONTEND_URL,
+        timeout=settings.MUX_UPLOAD_TIMEOUT_SECONDS,
     )
-    upload = uploads_api.create_direct_upload(request)
+    upload = await _run("POST", uploads_api.create_direct_upload_with_http_info, request)
     return {
         "upload_id": upload.data.id,
         "upload_url": upload.data.url,
     }
 
 
-def get_asset(asset_id: str) -> dict:
+async def get_asset(asset_id: str) -> dict:
     """Get Mux asset details"""
-    config = _get_config()
-    assets_api = mux_python.AssetsApi(mux_python.ApiClient(config))
-    asset = assets_api.get_asset(asset_id)
+    assets_api = mux_python.AssetsApi(get_mux_client())
+    asset = await _run("GET", assets_api.get_asset_with_http_info, asset_id)
     playback_id = asset.data.playback_ids[0].id if asset.data.playback_ids else None
     return {
         "asset_id": asset.data.id,
         "playback_id": playback_id,
         "status": asset.data.status,
     }
+
+
+async def get_direct_upload(upload_id: str) -> dict:
+    """Get Mux direct upload details. Returns {upload_id, status, asset_id}"""
+    uploads_api = mux_python.DirectUploadsApi(get_mux_client())
+    upload = await _run("GET", uploads_api.get_direct_upload_with_http_info, upload_id)
+    return {
+        "upload_id": upload.data.id,
+        "status": upload.data.status,
+        "asset_id": upload.data.asset_id,
+    }
@@ -0,0 +1,150 @@
+"""
+A pool of Mux direct uploads created ahead of time.
+
+Creating a direct upload is a Mux API round trip, and POST
+/listings/{id}/videos can't answer without one. So a filler in each app
+worker keeps up to MUX_UPLOAD_POOL_SIZE unused uploads in `mux_upload_pool`.
+The endpoint claims one in the transaction that creates the video (a local
+row delete) and then wakes the filler to replace it. It only makes a live
+Mux call when the pool is empty.
+
+An upload is handed out only while it has at least
+MUX_UPLOAD_MIN_REMAINING_SECONDS left before Mux's timeout; the filler
+drops rows past that point. Workers fill independently, so the pool can
+briefly overshoot its size; the surplus ages out.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.video import MuxUpload
+from app.services.mux_service import create_direct_upload
+
+logger = logging.getLogger(__name__)
+
+pool_depth = registry.gauge(
+    "mux_upload_pool_depth", "Unused Mux direct uploads in the pool, as of this worker's last fill or claim."
+)
+pool_claims = registry.counter(
+    "mux_upload_pool_claims_total", "Video uploads served from the pool (hit) or by a live Mux call (miss)."
+)
+pool_created = registry.counter(
+    "mux_upload_pool_created_total", "Mux direct uploads created for the pool, by result (ok/failed)."
+)
+pool_expired = registry.counter(
+    "mux_upload_pool_expired_total", "Pooled uploads dropped unused because they were close to expiring."
+)
+
+_filler: asyncio.Task | None = None
+_wake: asyncio.Event | None = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def claim_upload(db: Session) -> tuple[str, str] | None:
+    """Take a pooled upload as (upload_id, upload_url), or None if the pool is empty.
+
+    Doesn't commit: call it in the transaction that records the video.
+    """
+    cutoff = _now() + timedelta(seconds=settings.MUX_UPLOAD_MIN_REMAINING_SECONDS)
+    upload = db.query(MuxUpload).filter(
+        MuxUpload.expires_at > cutoff
+    ).order_by(MuxUpload.expires_at).limit(1).with_for_update(skip_locked=True).first()
+    if upload is None:
+        pool_claims.inc(result="miss")
+        return None
+    db.delete(upload)
+    pool_claims.inc(result="hit")
+    pool_depth.set(max(pool_depth.value() - 1, 0))
+    return upload.id, upload.upload_url
+
+
+def _prune(db: Session) -> int:
+    """Drop uploads too close to expiring to hand out. Returns how many are left."""
+    cutoff = _now() + timedelta(seconds=settings.MUX_UPLOAD_MIN_REMAINING_SECONDS)
+    expired = db.query(MuxUpload).filter(MuxUpload.expires_at <= cutoff).delete(synchronize_session=False)
+    depth = db.query(MuxUpload).count()
+    db.commit()
+    pool_expired.inc(expired)
+    return depth
+
+
+def _add(db: Session, uploads: list[dict], expires_at: datetime) -> None:
+    for upload in uploads:
+        db.add(MuxUpload(id=upload["upload_id"], upload_url=upload["upload_url"], expires_at=expires_at))
+    db.commit()
+
+
+async def fill(db: Session) -> int:
+    """Drop expiring uploads and top the pool up to MUX_UPLOAD_POOL_SIZE. Returns how many were created.
+
+    The database steps run in a worker thread; no transaction is open during the Mux calls.
+    """
+    depth = await asyncio.to_thread(_prune, db)
+    missing = settings.MUX_UPLOAD_POOL_SIZE - depth
+    created = []
+    if missing > 0:
+        # Counted from before the request, so expires_at is never later than Mux's own timeout
+        expires_at = _now() + timedelta(seconds=settings.MUX_UPLOAD_TIMEOUT_SECONDS)
+        results = await asyncio.gather(*(create_direct_upload() for _ in range(missing)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                pool_created.inc(result="failed")
+                logger.warning(f"Creating a pooled Mux upload failed: {result!r}")
+            else:
+                created.append(result)
+        if created:
+            await asyncio.to_thread(_add, db, created, expires_at)
+        pool_created.inc(len(created), result="ok")
+    pool_depth.set(depth + len(created))
+    return len(created)
+
+
+def refill_soon() -> None:
+    """Wake this worker's filler (after a claim); a no-op when it isn't running."""
+    if _wake is not None:
+        _wake.set()
+
+
+async def _run_filler() -> None:
+    from app.core.database import SessionLocal
+
+    while True:
+        db = SessionLocal()
+        try:
+            await fill(db)
+        except Exception as e:
+            logger.warning(f"Mux upload pool fill failed: {e!r}")
+            db.rollback()
+        finally:
+            db.close()
+        try:
+            await asyncio.wait_for(_wake.wait(), settings.MUX_UPLOAD_POOL_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_filler() -> None:
+    global _filler, _wake
+    if settings.MUX_UPLOAD_POOL_SIZE > 0 and settings.MUX_TOKEN_ID and _filler is None:
+        _wake = asyncio.Event()
+        _filler = asyncio.create_task(_run_filler())
+
+
+async def stop_filler() -> None:
+    global _filler, _wake
+    if _filler is not None:
+        _filler.cancel()
+        try:
+            await _filler
+        except asyncio.CancelledError:
+            pass
+        _filler = None
+        _wake = None
@@ -0,0 +1,274 @@
+"""
+Mux webhook inbox.
+
+POST /webhooks/mux only stores the event in `mux_webhook_events` (keyed by
+Mux's event id, so redeliveries are stored once) and answers. A worker in
+each app process applies stored events to `listing_videos` in batches:
+- events are taken oldest first (by Mux's created_at), so each asset's
+  events apply in order
+- the videos a batch touches are loaded in one query
+- each event is applied in its own savepoint; one that fails is rolled
+  back and retried in a later batch (up to MUX_WEBHOOK_MAX_ATTEMPTS, with
+  `attempts` and `last_error` kept on the row); later events for the same
+  asset or upload wait for it, the rest of the batch doesn't
+- the whole batch commits once
+On PostgreSQL an advisory lock lets only one process drain the inbox at a
+time, which keeps that order across workers. The worker does its database
+work in a thread, on a session of its own, and prunes old events every
+MUX_WEBHOOK_PRUNE_INTERVAL_SECONDS.
+
+Direct uploads are linked to their asset by `video.upload.asset_created`
+(mux_upload_id -> mux_asset_id). Asset events also carry the upload id, so a
+ready event that overtakes the link still finds its video. Applying an event
+twice leaves the same state. After each batch, the new states are published
+to open status streams (app/services/video_events.py).
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.video import ListingVideo
+from app.models.webhook import MuxWebhookEvent
+from app.services.video_events import publish_video_status, video_status
+
+logger = logging.getLogger(__name__)
+
+HANDLED_EVENTS = {"video.upload.asset_created", "video.asset.ready", "video.asset.errored"}
+# pg_try_advisory_xact_lock key for draining the inbox
+_INBOX_LOCK = 0x6D757877
+
+webhooks_received = registry.counter(
+    "mux_webhooks_received_total", "Mux webhooks received, by result (queued/duplicate/ignored)."
+)
+webhooks_applied = registry.counter(
+    "mux_webhooks_applied_total", "Queued Mux webhooks applied, by whether they matched a video."
+)
+webhooks_failed = registry.counter(
+    "mux_webhooks_failed_total", "Attempts to apply a queued Mux webhook that raised, by whether it will be retried."
+)
+
+_worker: asyncio.Task | None = None
+_wake: asyncio.Event | None = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def record_event(db: Session, body: dict, raw: bytes) -> bool:
+    """Store a webhook for the worker. Returns False for ignored types and redeliveries."""
+    event_type = body.get("type", "")
+    if event_type not in HANDLED_EVENTS:
+        webhooks_received.inc(result="ignored")
+        return False
+    # Events without an id (hand-sent, old API versions) are deduplicated by content
+    event_id = body.get("id") or hashlib.sha256(raw).hexdigest()
+    if db.get(MuxWebhookEvent, event_id) is not None:
+        webhooks_received.inc(result="duplicate")
+        return False
+    try:
+        with db.begin_nested():
+            db.add(MuxWebhookEvent(
+                id=event_id,
+                type=event_type,
+                payload=body.get("data") or {},
+                occurred_at=_parse_time(body.get("created_at")) or _now(),
+            ))
+    except IntegrityError:  # the same event, delivered concurrently
+        webhooks_received.inc(result="duplicate")
+        return False
+    db.commit()
+    webhooks_received.inc(result="queued")
+    return True
+
+
+def _try_lock(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _INBOX_LOCK}).scalar()
+
+
+def _keys(event: MuxWebhookEvent) -> tuple[str | None, str | None]:
+    """(asset id, upload id) an event refers to."""
+    data = event.payload
+    if event.type == "video.upload.asset_created":
+        return data.get("asset_id"), data.get("id")
+    return data.get("id"), data.get("upload_id")
+
+
+def _apply(event: MuxWebhookEvent, by_asset: dict, by_upload: dict) -> ListingVideo | None:
+    data = event.payload
+    if event.type == "video.upload.asset_created":
+        video = by_upload.get(data.get("id"))
+        if video is None or not data.get("asset_id"):
+            return None
+        video.mux_asset_id = data["asset_id"]
+        by_asset[video.mux_asset_id] = video
+        if video.status == "waiting":
+            video.status = "processing"
+        return video
+
+    video = by_asset.get(data.get("id")) or by_upload.get(data.get("upload_id"))
+    if video is None:
+        return None
+    video.mux_asset_id = data.get("id")
+    by_asset[video.mux_asset_id] = video
+    if event.type == "video.asset.ready":
+        playback_ids = data.get("playback_ids") or []
+        video.mux_playback_id = playback_ids[0]["id"] if playback_ids else None
+        video.status = "ready"
+    elif event.type == "video.asset.errored":
+        video.status = "error"
+    return video
+
+
+def process_events(db: Session) -> int:
+    """Apply one batch of queued webhooks. Returns how many were processed."""
+    if not _try_lock(db):
+        db.rollback()
+        return 0
+    events = db.query(MuxWebhookEvent).filter(
+        MuxWebhookEvent.processed_at.is_(None)
+    ).order_by(MuxWebhookEvent.occurred_at, MuxWebhookEvent.received_at).limit(
+        settings.MUX_WEBHOOK_BATCH_SIZE
+    ).all()
+    if not events:
+        db.rollback()
+        return 0
+
+    asset_ids, upload_ids = set(), set()
+    for event in events:
+        asset_id, upload_id = _keys(event)
+        asset_ids.add(asset_id)
+        upload_ids.add(upload_id)
+    asset_ids.discard(None)
+    upload_ids.discard(None)
+    videos = db.query(ListingVideo).filter(or_(
+        ListingVideo.mux_asset_id.in_(asset_ids), ListingVideo.mux_upload_id.in_(upload_ids)
+    )).all()
+    by_asset = {video.mux_asset_id: video for video in videos if video.mux_asset_id}
+    by_upload = {video.mux_upload_id: video for video in videos if video.mux_upload_id}
+
+    now = _now()
+    touched = {}
+    # Keys of events that failed: their later events wait for the retry, to stay in order
+    held = set()
+    for event in events:
+        keys = {key for key in _keys(event) if key}
+        if keys & held:
+            held |= keys
+            continue
+        try:
+            with db.begin_nested():
+                video = _apply(event, by_asset, by_upload)
+                event.processed_at = now
+        except Exception as e:
+            # The savepoint's changes are gone; keep the failure on the row and move on
+            event.attempts += 1
+            event.last_error = repr(e)[:1000]
+            if event.attempts >= settings.MUX_WEBHOOK_MAX_ATTEMPTS:
+                event.processed_at = now
+            webhooks_failed.inc(retry="no" if event.processed_at else "yes")
+            logger.warning(f"Applying Mux webhook {event.id} failed (attempt {event.attempts}): {e!r}")
+            if event.processed_at is None:
+                held |= keys
+            continue
+        webhooks_applied.inc(matched="yes" if video else "no")
+        if video is not None:
+            touched[video.id] = video
+    updates = [video_status(video) for video in touched.values()]
+    db.commit()
+    publish_video_status(updates)
+    return len(events)
+
+
+def process_pending(db: Session) -> int:
+    """Run batches until the inbox is empty. Returns the number of events processed."""
+    total = 0
+    while (count := process_events(db)) > 0:
+        total += count
+        if count < settings.MUX_WEBHOOK_BATCH_SIZE:
+            break
+    return total
+
+
+def prune_events(db: Session) -> int:
+    """Forget processed events older than MUX_WEBHOOK_RETENTION_SECONDS (longer than Mux retries for)."""
+    cutoff = _now() - timedelta(seconds=settings.MUX_WEBHOOK_RETENTION_SECONDS)
+    removed = db.query(MuxWebhookEvent).filter(
+        MuxWebhookEvent.processed_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+
+def process_soon() -> None:
+    """Wake this worker's inbox processor; a no-op when it isn't running."""
+    if _wake is not None:
+        _wake.set()
+
+
+def _drain(prune: bool) -> None:
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        process_pending(db)
+        if prune:
+            prune_events(db)
+    except Exception as e:
+        logger.warning(f"Mux webhook processing failed: {e!r}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+async def _run_worker() -> None:
+    pruned_at = None
+    while True:
+        prune = pruned_at is None or time.monotonic() - pruned_at >= settings.MUX_WEBHOOK_PRUNE_INTERVAL_SECONDS
+        await asyncio.to_thread(_drain, prune)
+        if prune:
+            pruned_at = time.monotonic()
+        try:
+            await asyncio.wait_for(_wake.wait(), settings.MUX_WEBHOOK_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_webhook_worker() -> None:
+    global _worker, _wake
+    if _worker is None:
+        _wake = asyncio.Event()
+        _worker = asyncio.create_task(_run_worker())
+
+
+async def stop_webhook_worker() -> None:
+    global _worker, _wake
+    if _worker is not None:
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+        _worker = None
+        _wake = None
@@ -0,0 +1,93 @@
+"""
+Content-hash deduplication of uploaded photos.
+
+Every upload through the API is hashed (SHA-256) before it is sent
+upstream. If a ready photo with the same digest already exists in scope
+(PHOTO_DEDUP_SCOPE: "listing", "photographer" or "off"), the new row reuses
+its Cloudflare image and local variants instead of transferring the bytes
+again. Photos sharing an image are reference counted on delete: the image
+is only removed upstream once the last row pointing at it is gone.
+"""
+import asyncio
+import hashlib
+from typing import BinaryIO
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.listing import Listing
+from app.models.photo import ListingPhoto
+from app.models.storage import PendingStorageDeletion
+
+dedup_lookups = registry.counter(
+    "photo_dedup_lookups_total", "Photo uploads checked for an existing copy, by result (hit/miss)."
+)
+dedup_bytes_saved = registry.counter(
+    "photo_dedup_bytes_saved_total", "Upload bytes not sent upstream because the photo was a duplicate."
+)
+
+# Columns copied from the photo a duplicate is matched against
+SHARED_COLUMNS = (
+    "cloudflare_image_id", "storage_backend", "url", "thumbnail_url", "width", "height", "blur_data_url", "perceptual_hash", "variants",
+)
+
+
+def _digest(file: BinaryIO) -> str:
+    file.seek(0)
+    digest = hashlib.file_digest(file, "sha256").hexdigest()
+    file.seek(0)
+    return digest
+
+
+async def hash_upload(file: BinaryIO) -> str:
+    """Hex SHA-256 of a spooled upload, read in a thread. Leaves the file rewound."""
+    return await asyncio.get_running_loop().run_in_executor(None, _digest, file)
+
+
+def dedup_enabled() -> bool:
+    return settings.PHOTO_DEDUP_SCOPE in ("listing", "photographer")
+
+
+def find_duplicate(digest: str, listing: Listing, db: Session) -> ListingPhoto | None:
+    """A ready photo with this content hash in the configured scope, if any.
+
+    Images queued for deletion are skipped: the collector may delete one
+    before a new row pointing at it commits.
+    """
+    if not dedup_enabled():
+        return None
+    query = db.query(ListingPhoto).filter(
+        ListingPhoto.content_sha256 == digest,
+        ListingPhoto.status == "ready",
+        ~exists().where(PendingStorageDeletion.cloudflare_image_id == ListingPhoto.cloudflare_image_id),
+    )
+    if settings.PHOTO_DEDUP_SCOPE == "listing":
+        query = query.filter(ListingPhoto.listing_id == listing.id)
+    else:
+        query = query.join(Listing, Listing.id == ListingPhoto.listing_id).filter(
+            Listing.photographer_id == listing.photographer_id
+        )
+    return query.order_by(ListingPhoto.created_at).first()
+
+
+def shared_values(source: ListingPhoto | dict) -> dict:
+    """The image columns a duplicate takes over from `source` (a row or column dict)."""
+    if isinstance(source, dict):
+        return {column: source.get(column) for column in SHARED_COLUMNS}
+    return {column: getattr(source, column) for column in SHARED_COLUMNS}
+
+
+def record_lookup(hit: bool, size: int = 0) -> None:
+    dedup_lookups.inc(result="hit" if hit else "miss", scope=settings.PHOTO_DEDUP_SCOPE)
+    if hit:
+        dedup_bytes_saved.inc(size)
+
+
+def image_in_use(cloudflare_image_id: str, db: Session, exclude: list[str] | None = None) -> bool:
+    """Whether any photo (other than those in `exclude`) still points at this image."""
+    query = db.query(ListingPhoto.id).filter(ListingPhoto.cloudflare_image_id == cloudflare_image_id)
+    if exclude:
+        query = query.filter(ListingPhoto.id.notin_(exclude))
+    return query.first() is not None
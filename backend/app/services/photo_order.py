@@ -0,0 +1,71 @@
+"""
+Fractional photo positions.
+
+ListingPhoto.position is a float, so moving one photo between two others
+only rewrites that photo's row (it takes the midpoint). Repeated moves into
+the same gap halve it each time; once it falls below MIN_GAP the listing's
+photos are renumbered 0..n-1 in one UPDATE.
+"""
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from app.models.photo import ListingPhoto
+
+MIN_GAP = 1e-6
+
+
+def photo_slots(listing_id: str, db: Session) -> tuple[int, float]:
+    """(photo count, position that appends after the last photo) in one query."""
+    count, last = db.query(func.count(ListingPhoto.id), func.max(ListingPhoto.position)).filter(
+        ListingPhoto.listing_id == listing_id
+    ).one()
+    return count, (last + 1 if last is not None else 0)
+
+
+def _assign_positions(listing_id: str, positions: dict[str, float], db: Session) -> None:
+    if not positions:
+        return
+    db.execute(
+        update(ListingPhoto)
+        .where(ListingPhoto.listing_id == listing_id, ListingPhoto.id.in_(list(positions)))
+        .values(position=case(positions, value=ListingPhoto.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def set_order(listing_id: str, photo_ids: list[str], db: Session) -> None:
+    """Give `photo_ids` positions 0..n-1 in one UPDATE; other photos keep theirs."""
+    _assign_positions(listing_id, {photo_id: i for i, photo_id in enumerate(dict.fromkeys(photo_ids))}, db)
+
+
+def rebalance(listing_id: str, db: Session) -> None:
+    """Renumber every photo of the listing 0..n-1, keeping the current order."""
+    ids = [photo_id for (photo_id,) in db.query(ListingPhoto.id).filter(
+        ListingPhoto.listing_id == listing_id
+    ).order_by(ListingPhoto.position, ListingPhoto.id)]
+    set_order(listing_id, ids, db)
+
+
+def _neighbour(photo: ListingPhoto, anchor: ListingPhoto, place: str, db: Session) -> float | None:
+    """Position of the photo on the other side of the gap next to `anchor`."""
+    query = db.query(ListingPhoto.position).filter(
+        ListingPhoto.listing_id == anchor.listing_id, ListingPhoto.id != photo.id
+    )
+    if place == "before":
+        return query.filter(ListingPhoto.position < anchor.position).order_by(ListingPhoto.position.desc()).limit(1).scalar()
+    return query.filter(ListingPhoto.position > anchor.position).order_by(ListingPhoto.position).limit(1).scalar()
+
+
+def move_photo(photo: ListingPhoto, anchor: ListingPhoto, place: str, db: Session) -> None:
+    """Move `photo` directly before or after `anchor` (place is "before"/"after")."""
+    for attempt in range(2):
+        neighbour = _neighbour(photo, anchor, place, db)
+        if neighbour is None:
+            position = anchor.position - 1 if place == "before" else anchor.position + 1
+        else:
+            position = (anchor.position + neighbour) / 2
+        if neighbour is None or abs(anchor.position - neighbour) >= MIN_GAP or attempt:
+            break
+        rebalance(anchor.listing_id, db)
+        db.refresh(anchor)
+    photo.position = position
@@ -0,0 +1,71 @@
+"""
+Near-duplicate photo detection from perceptual hashes.
+
+The image pipeline stores a 64-bit difference hash (dHash) per photo in
+ListingPhoto.perceptual_hash as a signed BIGINT. Viewed as uint64 in a NumPy
+array, all pairwise Hamming distances are one XOR plus a popcount per pair,
+done a block of rows at a time so a whole photographer library stays within
+a few tens of MB. Photos within max_distance of each other are linked and
+returned as connected clusters (bracketed frames of one shot chain together).
+"""
+from typing import Sequence
+
+import numpy as np
+
+# Rows compared per step: BLOCK_ROWS x N uint64 distances in memory at once
+BLOCK_ROWS = 512
+
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def signed_hash(value: int) -> int:
+    """Fold an unsigned 64-bit hash into the signed BIGINT range."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    return _POPCOUNT_8[values.view(np.uint8)].reshape(*values.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def similar_pairs(hashes: Sequence[int], max_distance: int) -> tuple[np.ndarray, np.ndarray]:
+    """Index pairs (i < j) whose hashes differ in at most max_distance bits."""
+    packed = np.asarray(hashes, dtype=np.int64).view(np.uint64)
+    left, right = [], []
+    for start in range(0, len(packed), BLOCK_ROWS):
+        block = packed[start:start + BLOCK_ROWS]
+        # Only compare against later rows: the upper triangle of the distance matrix
+        distances = _popcount(block[:, None] ^ packed[None, start:])
+        rows, cols = np.nonzero(distances <= max_distance)
+        keep = cols > rows
+        left.append(rows[keep] + start)
+        right.append(cols[keep] + start)
+    if not left:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(left), np.concatenate(right)
+
+
+def near_duplicate_clusters(hashes: Sequence[int], max_distance: int) -> list[list[int]]:
+    """Groups of 2+ indices into `hashes` that are linked by near-duplicate pairs.
+
+    Clusters and their members are ordered by first index, so passing hashes
+    in display order keeps each cluster in display order.
+    """
+    parent = list(range(len(hashes)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*similar_pairs(hashes, max_distance)):
+        a, b = root(int(i)), root(int(j))
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(hashes)):
+        clusters.setdefault(root(i), []).append(i)
+    return [members for members in clusters.values() if len(members) > 1]
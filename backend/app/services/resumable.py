@@ -0,0 +1,165 @@
+"""
+Resumable photo uploads, in the style of the tus protocol.
+
+    POST   /listings/{id}/photos/uploads                {filename, size}
+    PATCH  /listings/{id}/photos/uploads/{upload_id}    Upload-Offset: n; body: the next bytes
+    HEAD   /listings/{id}/photos/uploads/{upload_id}    -> Upload-Offset, Upload-Length
+    POST   /listings/{id}/photos/uploads/{upload_id}/complete
+    DELETE /listings/{id}/photos/uploads/{upload_id}
+
+A session is a `photo_uploads` row plus the file UPLOAD_TMP_DIR/<id>.part,
+and the file's length is the offset. A PATCH streams the request body onto
+the end of the file, so chunks are never held whole in memory. It fsyncs
+before answering, so an acknowledged offset survives a worker restart, and
+the client can resume against any worker. If the client disconnects
+mid-chunk, the bytes that did arrive are kept.
+
+On Unix the part file is locked (flock) while a request writes or
+completes it, so two requests can't interleave their writes.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, BinaryIO
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.upload import PhotoUpload
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+# Request body chunks are small; write to disk in blocks of this size
+WRITE_BYTES = 1024 * 1024
+
+
+class UploadBusy(Exception):
+    """Another request is writing to or completing this upload."""
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadTooLarge(Exception):
+    """The chunk would take the upload past its declared size."""
+
+
+def part_path(upload_id: str) -> str:
+    return os.path.join(settings.UPLOAD_TMP_DIR, f"{upload_id}.part")
+
+
+def current_offset(upload_id: str) -> int:
+    try:
+        return os.path.getsize(part_path(upload_id))
+    except FileNotFoundError:
+        return 0
+
+
+def create_upload(db: Session, listing_id: str, filename: str, size: int) -> PhotoUpload:
+    """Start a session with an empty part file. Doesn't commit."""
+    upload = PhotoUpload(
+        listing_id=listing_id,
+        filename=filename,
+        size=size,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=settings.RESUMABLE_UPLOAD_EXPIRY_SECONDS),
+    )
+    db.add(upload)
+    db.flush()
+    os.makedirs(settings.UPLOAD_TMP_DIR, exist_ok=True)
+    open(part_path(upload.id), "xb").close()
+    return upload
+
+
+def _open_locked(upload_id: str, mode: str) -> BinaryIO:
+    file = open(part_path(upload_id), mode)
+    if fcntl is not None:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            raise UploadBusy()
+    return file
+
+
+@asynccontextmanager
+async def locked_part(upload_id: str, mode: str = "rb") -> AsyncIterator[BinaryIO]:
+    """The part file, held exclusively. Raises UploadBusy or FileNotFoundError."""
+    file = await asyncio.to_thread(_open_locked, upload_id, mode)
+    try:
+        yield file
+    finally:
+        file.close()  # releases the lock
+
+
+def _sync(file: BinaryIO) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+
+
+async def append_part(upload_id: str, offset: int, size: int, chunks: AsyncIterator[bytes]) -> int:
+    """Append a request body at `offset` and return the new offset.
+
+    Raises OffsetMismatch if `offset` isn't the current end of the file,
+    UploadTooLarge (leaving the file as it was) if the body runs past `size`,
+    and FileNotFoundError if the upload has expired.
+    """
+    # Not "ab": that would recreate a part file the collector already removed
+    async with locked_part(upload_id, "r+b") as file:
+        start = os.fstat(file.fileno()).st_size
+        if start != offset:
+            raise OffsetMismatch(start)
+        file.seek(start)
+        written = 0
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                if start + written + len(buffer) + len(chunk) > size:
+                    buffer.clear()
+                    await asyncio.to_thread(file.truncate, start)
+                    raise UploadTooLarge()
+                buffer += chunk
+                if len(buffer) >= WRITE_BYTES:
+                    await asyncio.to_thread(file.write, buffer)
+                    written += len(buffer)
+                    buffer = bytearray()
+        finally:
+            # Keep whatever arrived, even if the client went away mid-chunk
+            if buffer:
+                await asyncio.to_thread(file.write, buffer)
+                written += len(buffer)
+            await asyncio.to_thread(_sync, file)
+        return start + written
+
+
+def discard_upload(db: Session, upload: PhotoUpload) -> None:
+    """Delete a session and its bytes. Doesn't commit."""
+    db.delete(upload)
+    try:
+        os.unlink(part_path(upload.id))
+    except FileNotFoundError:
+        pass
+
+
+def expire_uploads(db: Session) -> int:
+    """Remove expired sessions, and part files left behind by deleted listings. Returns sessions removed."""
+    now = datetime.now(timezone.utc)
+    expired = db.query(PhotoUpload).filter(PhotoUpload.expires_at < now).all()
+    for upload in expired:
+        discard_upload(db, upload)
+    db.commit()
+
+    if os.path.isdir(settings.UPLOAD_TMP_DIR):
+        live = {upload_id for (upload_id,) in db.query(PhotoUpload.id)}
+        cutoff = now.timestamp() - settings.RESUMABLE_UPLOAD_EXPIRY_SECONDS
+        for entry in os.scandir(settings.UPLOAD_TMP_DIR):
+            upload_id = entry.name.removesuffix(".part")
+            if upload_id not in live and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+    return len(expired)
@@ -0,0 +1,90 @@
+"""
+Full-text search over listings and leads.
+
+PostgreSQL keeps a generated `search_vector` tsvector column with a GIN index on
+each table, created by migration b71c4e2d9a05. SQLite (used by the tests) keeps
+an external-content FTS5 table in sync with triggers, created by DDL hooks when
+the tables are created. Either way the index is maintained by the database on
+every write.
+"""
+import re
+
+from sqlalchemy import DDL, column, event, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from app.models.lead import Lead
+from app.models.listing import Listing
+
+SEARCH_COLUMNS = {
+    # table -> (columns weighted 'A', columns weighted 'B')
+    "listings": (["address", "mls_number"], ["description"]),
+    "leads": (["name", "email"], ["message"]),
+}
+
+
+def _sqlite_ddl(table: str) -> list[str]:
+    primary, secondary = SEARCH_COLUMNS[table]
+    cols = primary + secondary
+    col_list = ", ".join(cols)
+    new_values = ", ".join(f"new.{c}" for c in cols)
+    old_values = ", ".join(f"old.{c}" for c in cols)
+    delete_old = (
+        f"INSERT INTO {table}_fts({table}_fts, rowid, {col_list}) "
+        f"VALUES ('delete', old.rowid, {old_values});"
+    )
+    insert_new = f"INSERT INTO {table}_fts(rowid, {col_list}) VALUES (new.rowid, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5({col_list}, "
+        f"content='{table}', content_rowid='rowid', tokenize='porter unicode61')",
+        f"CREATE TRIGGER {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {table}_fts_au AFTER UPDATE OF {col_list} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+for _model in (Listing, Lead):
+    _table = _model.__table__
+    for _stmt in _sqlite_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+    event.listen(
+        _table, "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table.name}_fts").execute_if(dialect="sqlite"),
+    )
+
+
+def _tokens(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def ranked_matches(model, q: str, db: Session, *criteria):
+    """Return a subquery of (id, rank) for rows of `model` matching `q`, or None.
+
+    Every search term must match, as a prefix. Higher rank is a better match.
+    `criteria` (e.g. the caller's ownership filter) are applied inside the
+    subquery, so only the caller's rows are ranked.
+    """
+    tokens = _tokens(q)
+    if not tokens:
+        return None
+    name = model.__table__.name
+
+    if db.get_bind().dialect.name == "postgresql":
+        vector = literal_column(f"{name}.search_vector")
+        tsquery = func.to_tsquery("english", " & ".join(f"{t}:*" for t in tokens))
+        return (
+            select(model.id, func.ts_rank(vector, tsquery).label("rank"))
+            .where(vector.op("@@")(tsquery), *criteria)
+            .subquery()
+        )
+
+    fts = table(f"{name}_fts", column("rowid"))
+    fts_name = literal_column(fts.name)
+    match = " ".join(f'"{t}"*' for t in tokens)
+    return (
+        select(model.id, (-func.bm25(fts_name)).label("rank"))
+        .select_from(model.__table__)
+        .join(fts, fts.c.rowid == literal_column(f"{name}.rowid"))
+        .where(fts_name.op("MATCH")(match), *criteria)
+        .subquery()
+    )
@@ -19,6 +19,7 @@ from app.models.listing import Listing
 from app.models.photo import ListingPhoto
 from app.models.lead import Lead
 from app.models.video import ListingVideo
+from app.models.stats import PhotographerStats
 
 
 def unsplash(photo_id: str, width: int = 1200) -> str:
@@ -80,6 +81,7 @@ def seed(reset: bool = False):
                     db.query(ListingVideo).filter(ListingVideo.listing_id == listing.id).delete()
                 db.query(Listing).filter(Listing.photographer_id == existing.id).delete()
                 db.query(Agent).filter(Agent.photographer_id == existing.id).delete()
+                db.query(PhotographerStats).filter(PhotographerStats.photographer_id == existing.id).delete()
                 db.query(User).filter(User.id == existing.id).delete()
                 db.commit()
                 print("Old demo data deleted.")
@@ -1,6 +1,14 @@
 import re
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.models.listing import Listing
+from app.models.slug_counter import SlugCounter
+
+# A concurrent writer can still take a slug we picked (e.g. an address whose
+# own base is "123-main-st-2"); the unique index rejects it and we allocate again.
+SLUG_ALLOCATION_ATTEMPTS = 5
+CHUNK_SIZE = 200
 
 
 def generate_slug(address: str) -> str:
@@ -11,11 +19,119 @@ def generate_slug(address: str) -> str:
     return slug
 
 
+def _taken_slugs(bases: set[str], db: Session) -> set[str]:
+    """Every existing slug equal to one of `bases` or starting with `base-`."""
+    taken: set[str] = set()
+    bases = sorted(bases)
+    for i in range(0, len(bases), CHUNK_SIZE):
+        conditions = [
+            or_(Listing.slug == base, Listing.slug.like(f"{base}-%"))
+            for base in bases[i:i + CHUNK_SIZE]
+        ]
+        taken.update(slug for (slug,) in db.query(Listing.slug).filter(or_(*conditions)))
+    return taken
+
+
+def _highest_used_suffixes(bases: set[str], db: Session) -> dict[str, int]:
+    """Highest suffix existing listings already use per base (0 if the base is free)."""
+    highest = dict.fromkeys(bases, 0)
+    for slug in _taken_slugs(bases, db):
+        if slug in highest:
+            highest[slug] = max(highest[slug], 1)
+        head, _, tail = slug.rpartition("-")
+        if tail.isdigit() and head in highest:
+            highest[head] = max(highest[head], int(tail))
+    return highest
+
+
+def get_unique_slugs(addresses: list[str], db: Session) -> list[str]:
+    """Allocate a unique slug per address, including against each other.
+
+    Suffixes come from the per-base `slug_counters` row, read FOR UPDATE and
+    advanced in place, so the cost doesn't grow with the number of existing
+    collisions. A base without a counter yet is seeded once from a prefix
+    query over existing slugs. Queries are batched per 200 distinct bases.
+    """
+    bases = [generate_slug(address) for address in addresses]
+    distinct = sorted(set(bases))
+
+    last: dict[str, int] = {}
+    for i in range(0, len(distinct), CHUNK_SIZE):
+        rows = (
+            db.query(SlugCounter.base, SlugCounter.last_suffix)
+            .filter(SlugCounter.base.in_(distinct[i:i + CHUNK_SIZE]))
+            .with_for_update()
+            .all()
+        )
+        last.update(rows)
+    existing = set(last)
+    missing = {base for base in distinct if base not in existing}
+    if missing:
+        last.update(_highest_used_suffixes(missing, db))
+
+    slugs = []
+    for base in bases:
+        last[base] += 1
+        slugs.append(base if last[base] == 1 else f"{base}-{last[base]}")
+
+    if missing:
+        db.execute(insert(SlugCounter), [{"base": b, "last_suffix": last[b]} for b in sorted(missing)])
+    if existing:
+        db.execute(update(SlugCounter), [{"base": b, "last_suffix": last[b]} for b in sorted(existing)])
+    return slugs
+
+
 def get_unique_slug(address: str, db: Session) -> str:
-    base = generate_slug(address)
-    slug = base
-    counter = 2
-    while db.query(Listing).filter(Listing.slug == slug).first():
-        slug = f"{base}-{counter}"
-        counter += 1
-    return slug
+    return get_unique_slugs([address], db)[0]
+
+
+def _reserve_slugs(db: Session, addresses: list[str]) -> list[str] | None:
+    """Reserve slugs in a savepoint. None if a concurrent writer seeded the same counter."""
+    try:
+        with db.begin_nested():
+            return get_unique_slugs(addresses, db)
+    except IntegrityError:
+        return None
+
+
+def save_with_unique_slug(db: Session, listing: Listing, address: str, values: dict | None = None) -> None:
+    """Assign `values` and a fresh slug for `address` to `listing`, then flush.
+
+    The counter advance is kept even if the flush fails, so a retry after a
+    unique violation always moves on to a new suffix.
+    """
+    for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+        slugs = _reserve_slugs(db, [address])
+        if slugs is None:
+            continue
+        # Rolling back a savepoint expires what it changed, so (re)apply everything
+        for key, value in (values or {}).items():
+            setattr(listing, key, value)
+        listing.slug = slugs[0]
+        try:
+            with db.begin_nested():
+                db.add(listing)
+                db.flush()
+            return
+        except IntegrityError:
+            if attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                raise
+    raise RuntimeError(f"Could not allocate a slug for {address!r}")
+
+
+def insert_with_unique_slugs(db: Session, values: list[dict], addresses: list[str]) -> None:
+    """Bulk INSERT listing rows, allocating all their slugs in one pass."""
+    for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+        slugs = _reserve_slugs(db, addresses)
+        if slugs is None:
+            continue
+        for row, slug in zip(values, slugs):
+            row["slug"] = slug
+        try:
+            with db.begin_nested():
+                db.execute(insert(Listing), values)
+            return
+        except IntegrityError:
+            if attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                raise
+    raise RuntimeError("Could not allocate slugs for bulk import")
@@ -0,0 +1,129 @@
+"""
+Per-photographer usage counters.
+
+Write paths call adjust_stats() in the same transaction as the change they
+count, so `photographer_stats` never drifts from the source tables under
+normal operation. If it does (manual SQL, old data), repair it with:
+
+    cd backend
+    python -m app.services.stats --repair
+"""
+import sys
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.agent import Agent
+from app.models.lead import Lead
+from app.models.listing import Listing
+from app.models.stats import PhotographerStats
+from app.models.user import User
+
+COUNTERS = ("active_listings", "total_listings", "total_leads", "total_agents")
+
+
+def _grouped_counts(db: Session, photographer_id: str | None = None) -> dict[str, dict[str, int]]:
+    """Recompute counters from the source tables, one GROUP BY per counter."""
+    queries = [
+        ("active_listings", Listing.photographer_id,
+         db.query(Listing.photographer_id, func.count(Listing.id)).filter(Listing.status == "active")),
+        ("total_listings", Listing.photographer_id,
+         db.query(Listing.photographer_id, func.count(Listing.id))),
+        ("total_leads", Listing.photographer_id,
+         db.query(Listing.photographer_id, func.count(Lead.id)).join(Lead, Lead.listing_id == Listing.id)),
+        ("total_agents", Agent.photographer_id,
+         db.query(Agent.photographer_id, func.count(Agent.id))),
+    ]
+    counts: dict[str, dict[str, int]] = {}
+    for name, owner, query in queries:
+        if photographer_id is not None:
+            query = query.filter(owner == photographer_id)
+        for pid, count in query.group_by(owner):
+            counts.setdefault(pid, dict.fromkeys(COUNTERS, 0))[name] = count
+    return counts
+
+
+def _create_row(db: Session, photographer_id: str) -> PhotographerStats | None:
+    """Insert the counters computed from the source tables.
+
+    Returns None if a concurrent transaction inserted the row first.
+    """
+    db.flush()
+    values = _grouped_counts(db, photographer_id).get(photographer_id, dict.fromkeys(COUNTERS, 0))
+    stats = PhotographerStats(photographer_id=photographer_id, **values)
+    try:
+        with db.begin_nested():
+            db.add(stats)
+    except IntegrityError:
+        return None
+    return stats
+
+
+def _select(db: Session, photographer_id: str, for_update: bool) -> PhotographerStats | None:
+    query = db.query(PhotographerStats).filter(PhotographerStats.photographer_id == photographer_id)
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
+
+
+def get_stats(db: Session, photographer_id: str, for_update: bool = False) -> PhotographerStats:
+    """Load the photographer's counters, computing them if no row exists yet.
+
+    With for_update the row stays locked until commit, so quota checks made
+    against it can't race with concurrent creates.
+    """
+    return (
+        _select(db, photographer_id, for_update)
+        or _create_row(db, photographer_id)
+        # Lost the race to create it: the winner's row is committed now
+        or _select(db, photographer_id, for_update=True)
+    )
+
+
+def adjust_stats(db: Session, photographer_id: str, **deltas: int) -> None:
+    """Add deltas to the photographer's counters, e.g. adjust_stats(db, pid, total_leads=1).
+
+    Call after the counted change is staged in the session: when the row has
+    to be created, it is computed from the source tables including that change.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    statement = (
+        update(PhotographerStats)
+        .where(PhotographerStats.photographer_id == photographer_id)
+        .values({
+            getattr(PhotographerStats, name): getattr(PhotographerStats, name) + delta
+            for name, delta in deltas.items()
+        })
+    )
+    if db.execute(statement).rowcount == 0 and _create_row(db, photographer_id) is None:
+        # Another transaction created the row without our uncommitted change: add it
+        db.execute(statement)
+
+
+def repair_stats(db: Session) -> int:
+    """Rewrite every photographer's counters from the source tables. Returns rows written."""
+    counts = _grouped_counts(db)
+    rows = [
+        {"photographer_id": pid, **counts.get(pid, dict.fromkeys(COUNTERS, 0))}
+        for (pid,) in db.query(User.id)
+    ]
+    db.execute(delete(PhotographerStats))
+    if rows:
+        db.execute(insert(PhotographerStats), rows)
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    if "--repair" not in sys.argv:
+        print("Usage: python -m app.services.stats --repair")
+        sys.exit(1)
+    from app.core.database import SessionLocal
+    session = SessionLocal()
+    try:
+        print(f"Recomputed stats for {repair_stats(session)} photographers.")
+    finally:
+        session.close()
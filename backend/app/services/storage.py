@@ -0,0 +1,236 @@
+"""
+Where photo originals are stored.
+
+PHOTO_STORAGE_BACKEND picks one of:
+- "cloudflare": Cloudflare Images (app/services/cloudflare.py). The default,
+  and the only backend that supports direct browser uploads.
+- "local": files under STORAGE_LOCAL_ROOT, served by GET /files/{id}
+  (app/api/files.py) with byte ranges and immutable cache headers. Needs
+  no external service: use it for self-hosting, offline development, tests
+  and benchmarks.
+- "s3": any S3-compatible bucket. Needs boto3, which is imported on first use.
+
+Each ListingPhoto records the backend that holds its image
+(`storage_backend`), so switching backends doesn't orphan or misroute
+existing photos. The module-level functions below take that name and
+default to the configured backend.
+"""
+import asyncio
+import io
+import mimetypes
+import os
+import shutil
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import AsyncIterator, BinaryIO
+
+from app.core.config import settings
+from app.core.files import IMMUTABLE_CACHE_CONTROL
+from app.services import cloudflare
+
+_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/heic": ".heic"}
+
+
+class StorageBackend(ABC):
+    """Stores photo originals. Images are dicts of {id, url, thumbnail_url}."""
+
+    name: str
+    direct_uploads = False
+
+    @abstractmethod
+    async def upload(self, file: BinaryIO | bytes, filename: str, content_type: str | None = None) -> dict:
+        ...
+
+    @abstractmethod
+    async def delete(self, image_id: str) -> None:
+        """Delete an image; one that is already gone counts as deleted."""
+
+    @abstractmethod
+    def list_images(self) -> AsyncIterator[dict]:
+        """Every stored image as {id, uploaded} (ISO 8601), for reconciliation."""
+
+
+class DirectUploadStorage(StorageBackend):
+    """A backend browsers can upload to directly, with one-time URLs."""
+
+    direct_uploads = True
+
+    @abstractmethod
+    async def create_upload_url(self, metadata: dict | None = None) -> dict:
+        """A one-time upload URL as {id, upload_url}."""
+
+    @abstractmethod
+    async def get_uploaded_image(self, image_id: str) -> dict | None:
+        """The image once its direct upload has finished, else None."""
+
+
+class CloudflareStorage(DirectUploadStorage):
+    name = "cloudflare"
+
+    async def upload(self, file, filename, content_type=None):
+        return await cloudflare.upload_image(file, filename, content_type)
+
+    async def delete(self, image_id):
+        await cloudflare.delete_image(image_id)
+
+    def list_images(self):
+        return cloudflare.list_images()
+
+    async def create_upload_url(self, metadata=None):
+        return await cloudflare.create_upload_url(metadata)
+
+    async def get_uploaded_image(self, image_id):
+        return await cloudflare.get_uploaded_image(image_id)
+
+
+def _new_key(content_type: str | None, filename: str) -> str:
+    extension = _EXTENSIONS.get(content_type or "") or os.path.splitext(filename)[1].lower() or ".bin"
+    return uuid.uuid4().hex + extension
+
+
+def _as_file(file: BinaryIO | bytes) -> BinaryIO:
+    if isinstance(file, bytes):
+        return io.BytesIO(file)
+    file.seek(0)
+    return file
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def path(self, image_id: str) -> str:
+        return os.path.join(settings.STORAGE_LOCAL_ROOT, image_id)
+
+    def _image(self, image_id: str) -> dict:
+        url = f"{settings.STORAGE_LOCAL_URL.rstrip('/')}/{image_id}"
+        # No resizing service: the image pipeline's variants cover smaller sizes
+        return {"id": image_id, "url": url, "thumbnail_url": url}
+
+    def _write(self, file: BinaryIO, image_id: str) -> None:
+        os.makedirs(settings.STORAGE_LOCAL_ROOT, exist_ok=True)
+        # Write to a temp file and rename, so a half-written file is never served
+        with tempfile.NamedTemporaryFile(dir=settings.STORAGE_LOCAL_ROOT, delete=False, suffix=".part") as tmp:
+            shutil.copyfileobj(file, tmp, 1024 * 1024)
+        os.replace(tmp.name, self.path(image_id))
+
+    async def upload(self, file, filename, content_type=None):
+        image_id = _new_key(content_type, filename)
+        await asyncio.to_thread(self._write, _as_file(file), image_id)
+        return self._image(image_id)
+
+    async def delete(self, image_id):
+        try:
+            await asyncio.to_thread(os.unlink, self.path(image_id))
+        except FileNotFoundError:
+            pass
+
+    async def list_images(self):
+        if not os.path.isdir(settings.STORAGE_LOCAL_ROOT):
+            return
+        for entry in os.scandir(settings.STORAGE_LOCAL_ROOT):
+            if entry.is_file() and not entry.name.endswith(".part"):
+                uploaded = datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc)
+                yield {"id": entry.name, "uploaded": uploaded.isoformat()}
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self):
+        self._client = None
+
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("PHOTO_STORAGE_BACKEND=s3 needs boto3 (pip install boto3)")
+            # boto3 clients are thread-safe; one is shared by all requests
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.S3_ENDPOINT_URL or None,
+                region_name=settings.S3_REGION or None,
+                aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+                aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+            )
+        return self._client
+
+    def _key(self, image_id: str) -> str:
+        return settings.S3_KEY_PREFIX + image_id
+
+    def _image(self, image_id: str) -> dict:
+        url = f"{settings.S3_PUBLIC_URL.rstrip('/')}/{self._key(image_id)}"
+        return {"id": image_id, "url": url, "thumbnail_url": url}
+
+    async def upload(self, file, filename, content_type=None):
+        image_id = _new_key(content_type, filename)
+        extra = {
+            "ContentType": content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+        }
+        # upload_fileobj streams in parts from the spooled file
+        await asyncio.to_thread(
+            self.client().upload_fileobj, _as_file(file), settings.S3_BUCKET, self._key(image_id), ExtraArgs=extra
+        )
+        return self._image(image_id)
+
+    async def delete(self, image_id):
+        # S3 DELETE succeeds for missing keys too
+        await asyncio.to_thread(self.client().delete_object, Bucket=settings.S3_BUCKET, Key=self._key(image_id))
+
+    async def list_images(self):
+        pages = self.client().get_paginator("list_objects_v2").paginate(
+            Bucket=settings.S3_BUCKET, Prefix=settings.S3_KEY_PREFIX
+        )
+        iterator = iter(pages)
+        while (page := await asyncio.to_thread(next, iterator, None)) is not None:
+            for item in page.get("Contents", []):
+                yield {"id": item["Key"][len(settings.S3_KEY_PREFIX):], "uploaded": item["LastModified"].isoformat()}
+
+
+_BACKENDS: dict[str, type[StorageBackend]] = {
+    "cloudflare": CloudflareStorage,
+    "local": LocalStorage,
+    "s3": S3Storage,
+}
+_instances: dict[str, StorageBackend] = {}
+
+
+def get_storage(name: str | None = None) -> StorageBackend:
+    """The backend called `name`, or the configured one."""
+    name = name or settings.PHOTO_STORAGE_BACKEND
+    if name not in _instances:
+        if name not in _BACKENDS:
+            raise ValueError(f"Unknown storage backend {name!r}; expected one of {', '.join(_BACKENDS)}")
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
+
+
+async def upload_image(file: BinaryIO | bytes, filename: str, content_type: str | None = None) -> dict:
+    """Store an image with the configured backend. Returns {id, url, thumbnail_url}."""
+    return await get_storage().upload(file, filename, content_type)
+
+
+async def delete_image(image_id: str, backend: str | None = None) -> None:
+    await get_storage(backend).delete(image_id)
+
+
+def list_images(backend: str | None = None) -> AsyncIterator[dict]:
+    return get_storage(backend).list_images()
+
+
+def _direct_upload_storage(name: str | None = None) -> DirectUploadStorage:
+    storage = get_storage(name)
+    if not isinstance(storage, DirectUploadStorage):
+        raise ValueError(f"The {storage.name} storage backend doesn't support direct uploads (direct_uploads = False)")
+    return storage
+
+
+async def create_upload_url(metadata: dict | None = None) -> dict:
+    return await _direct_upload_storage().create_upload_url(metadata)
+
+
+async def get_uploaded_image(image_id: str, backend: str | None = None) -> dict | None:
+    return await _direct_upload_storage(backend).get_uploaded_image(image_id)
@@ -0,0 +1,295 @@
+"""
+Deferred deletion of stored photo images.
+
+Deleting a photo or a listing doesn't call the storage backend. Instead it
+queues the image id and local variants directory in `pending_storage_deletions`,
+in the same transaction that removes the rows. A failed request therefore
+can't leak storage, and users don't wait on a third-party round trip.
+
+The collector runs in the background of each app worker (and also expires
+abandoned resumable uploads, and direct-upload photos that were never
+completed, queueing their images):
+- it claims due rows
+- it drops the ones some photo still references (deduplicated uploads share
+  an image)
+- it deletes the rest from their storage backend concurrently, retrying
+  failures with exponential backoff
+Each pass uses a session of its own, and its database work runs in a worker
+thread, so a slow query doesn't stall the event loop.
+
+reconcile() queues images that nothing references: ones from before this
+table existed, and abandoned direct uploads. It covers both the configured
+storage backend and MEDIA_ROOT. Either pass can also be run by hand:
+
+    cd backend
+    python -m app.services.storage_gc --collect
+    python -m app.services.storage_gc --reconcile
+"""
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.photo import ListingPhoto
+from app.models.storage import PendingStorageDeletion
+from app.services.image_pipeline import remove_variants, variants_key
+from app.services.resumable import expire_uploads
+from app.services.storage import delete_image, get_storage, list_images
+
+logger = logging.getLogger(__name__)
+
+storage_deletions = registry.counter(
+    "storage_gc_deletions_total", "Queued image deletions processed, by result (deleted/in_use/failed)."
+)
+storage_orphans = registry.counter(
+    "storage_gc_orphans_queued_total", "Unreferenced stored images found and queued by reconciliation."
+)
+
+# A claimed row is left alone by other collectors for this long
+CLAIM_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+
+_collector: asyncio.Task | None = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def queue_photo_deletions(db: Session, photos: Iterable[tuple[str, str, str, list | None]]) -> None:
+    """Queue the images of (id, cloudflare_image_id, storage_backend, variants) photo rows being deleted.
+
+    Doesn't commit: call it in the transaction that deletes the rows.
+    """
+    queued = set()
+    for photo_id, image_id, backend, variants in photos:
+        entry = (image_id, backend, variants_key(photo_id, variants) if variants else None)
+        if entry not in queued:
+            queued.add(entry)
+            db.add(PendingStorageDeletion(cloudflare_image_id=image_id, storage_backend=backend, media_key=entry[2]))
+
+
+def queue_listing_photos(db: Session, listing_ids: list[str]) -> None:
+    """Queue the images of every photo of these listings (before they are deleted)."""
+    queue_photo_deletions(db, db.query(
+        ListingPhoto.id, ListingPhoto.cloudflare_image_id, ListingPhoto.storage_backend, ListingPhoto.variants
+    ).filter(ListingPhoto.listing_id.in_(listing_ids)))
+
+
+def expire_pending_photos(db: Session) -> int:
+    """Delete direct-upload photos still pending after DIRECT_UPLOAD_EXPIRY_SECONDS and queue their images.
+
+    Frees the listing's photo slots and lets the drafts be deleted upstream. Returns photos removed.
+    """
+    cutoff = _now() - timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRY_SECONDS)
+    stale = db.query(
+        ListingPhoto.id, ListingPhoto.cloudflare_image_id, ListingPhoto.storage_backend, ListingPhoto.variants
+    ).filter(ListingPhoto.status == "pending", ListingPhoto.created_at < cutoff).all()
+    if stale:
+        queue_photo_deletions(db, stale)
+        db.query(ListingPhoto).filter(
+            ListingPhoto.id.in_([photo_id for photo_id, _, _, _ in stale])
+        ).delete(synchronize_session=False)
+    db.commit()
+    return len(stale)
+
+
+def _claim(db: Session) -> list[tuple[str, str | None, str, str | None, int]]:
+    """Take up to STORAGE_GC_BATCH_SIZE due rows, pushing their next attempt out of other collectors' way."""
+    now = _now()
+    rows = db.query(PendingStorageDeletion).filter(
+        PendingStorageDeletion.next_attempt_at <= now
+    ).order_by(PendingStorageDeletion.next_attempt_at).limit(
+        settings.STORAGE_GC_BATCH_SIZE
+    ).with_for_update(skip_locked=True).all()
+    for row in rows:
+        row.next_attempt_at = now + timedelta(seconds=CLAIM_SECONDS)
+    claimed = [(row.id, row.cloudflare_image_id, row.storage_backend, row.media_key, row.attempts) for row in rows]
+    db.commit()
+    return claimed
+
+
+async def _delete(image_id: str | None, backend: str, media_key: str | None, semaphore: asyncio.Semaphore) -> None:
+    if image_id:
+        async with semaphore:
+            await delete_image(image_id, backend)
+    if media_key:
+        await asyncio.to_thread(remove_variants, media_key)
+
+
+def _in_use(db: Session, claimed: list) -> set[str]:
+    """Image ids of claimed rows that some photo still references."""
+    image_ids = {image_id for _, image_id, _, _, _ in claimed if image_id}
+    if not image_ids:
+        return set()
+    return {image_id for (image_id,) in db.query(ListingPhoto.cloudflare_image_id).filter(
+        ListingPhoto.cloudflare_image_id.in_(image_ids)
+    ).distinct()}
+
+
+def _record(db: Session, done: list[str], failed: list[tuple[str, str | None, int, BaseException]]) -> None:
+    """Drop finished rows and schedule failed ones for a retry with backoff."""
+    now = _now()
+    for row_id, image_id, attempts, error in failed:
+        logger.warning(f"Deleting stored image {image_id} failed (attempt {attempts + 1}): {error!r}")
+        backoff = min(RETRY_BASE_SECONDS * 2 ** attempts, settings.STORAGE_GC_MAX_BACKOFF_SECONDS)
+        db.query(PendingStorageDeletion).filter(PendingStorageDeletion.id == row_id).update({
+            PendingStorageDeletion.attempts: attempts + 1,
+            PendingStorageDeletion.last_error: repr(error)[:1000],
+            PendingStorageDeletion.next_attempt_at: now + timedelta(seconds=backoff),
+        }, synchronize_session=False)
+    if done:
+        db.query(PendingStorageDeletion).filter(
+            PendingStorageDeletion.id.in_(done)
+        ).delete(synchronize_session=False)
+    db.commit()
+
+
+async def collect(db: Session) -> int:
+    """Process one batch of due deletions. Returns how many rows were claimed.
+
+    Database steps run in a worker thread; only the storage deletes run on the event loop.
+    """
+    claimed = await asyncio.to_thread(_claim, db)
+    if not claimed:
+        return 0
+    in_use = await asyncio.to_thread(_in_use, db, claimed)
+
+    pending = [row for row in claimed if row[1] not in in_use]
+    semaphore = asyncio.Semaphore(settings.STORAGE_GC_CONCURRENCY)
+    outcomes = await asyncio.gather(
+        *(_delete(image_id, backend, media_key, semaphore) for _, image_id, backend, media_key, _ in pending),
+        return_exceptions=True,
+    )
+
+    done = [row_id for row_id, image_id, _, _, _ in claimed if image_id in in_use]
+    storage_deletions.inc(len(done), result="in_use")
+    failed = []
+    for (row_id, image_id, _, _, attempts), outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            storage_deletions.inc(result="failed")
+            failed.append((row_id, image_id, attempts, outcome))
+        else:
+            storage_deletions.inc(result="deleted")
+            done.append(row_id)
+    await asyncio.to_thread(_record, db, done, failed)
+    return len(claimed)
+
+
+async def collect_pending(db: Session) -> int:
+    """Run batches until nothing is due. Returns the number of rows processed."""
+    total = 0
+    while (count := await collect(db)) > 0:
+        total += count
+        if count < settings.STORAGE_GC_BATCH_SIZE:
+            break
+    return total
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def reconcile(db: Session) -> int:
+    """Queue images in the configured storage backend and variant directories nothing references.
+
+    Returns how many were queued.
+    """
+    cutoff = _now() - timedelta(seconds=settings.STORAGE_GC_ORPHAN_GRACE_SECONDS)
+    referenced_images = {image_id for (image_id,) in db.query(ListingPhoto.cloudflare_image_id).distinct()}
+    referenced_keys = {
+        variants_key(photo_id, variants)
+        for photo_id, variants in db.query(ListingPhoto.id, ListingPhoto.variants).filter(
+            ListingPhoto.variants.isnot(None)
+        ).yield_per(1000)
+    }
+    for image_id, media_key in db.query(PendingStorageDeletion.cloudflare_image_id, PendingStorageDeletion.media_key):
+        referenced_images.add(image_id)
+        referenced_keys.add(media_key)
+
+    orphans: list[tuple[str | None, str | None]] = []
+    backend = get_storage().name
+    if backend != "cloudflare" or settings.CLOUDFLARE_ACCOUNT_ID:
+        async for image in list_images(backend):
+            uploaded = _parse_time(image.get("uploaded"))
+            if image["id"] not in referenced_images and uploaded is not None and uploaded < cutoff:
+                orphans.append((image["id"], None))
+
+    photos_dir = os.path.join(settings.MEDIA_ROOT, "photos")
+    if os.path.isdir(photos_dir):
+        for entry in os.scandir(photos_dir):
+            modified = datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc)
+            if entry.is_dir() and entry.name not in referenced_keys and modified < cutoff:
+                orphans.append((None, entry.name))
+
+    for image_id, media_key in orphans:
+        db.add(PendingStorageDeletion(cloudflare_image_id=image_id, storage_backend=backend, media_key=media_key))
+    db.commit()
+    storage_orphans.inc(len(orphans))
+    return len(orphans)
+
+
+def _expire(db: Session) -> None:
+    expire_uploads(db)
+    expire_pending_photos(db)
+
+
+async def _run_collector() -> None:
+    from app.core.database import SessionLocal
+
+    while True:
+        db = SessionLocal()
+        try:
+            await asyncio.to_thread(_expire, db)
+            await collect_pending(db)
+        except Exception as e:
+            logger.warning(f"Storage collector pass failed: {e!r}")
+            db.rollback()
+        finally:
+            db.close()
+        await asyncio.sleep(settings.STORAGE_GC_INTERVAL_SECONDS)
+
+
+def start_collector() -> None:
+    global _collector
+    if settings.STORAGE_GC_ENABLED and _collector is None:
+        _collector = asyncio.create_task(_run_collector())
+
+
+async def stop_collector() -> None:
+    global _collector
+    if _collector is not None:
+        _collector.cancel()
+        try:
+            await _collector
+        except asyncio.CancelledError:
+            pass
+        _collector = None
+
+
+if __name__ == "__main__":
+    if not {"--collect", "--reconcile"} & set(sys.argv):
+        print("Usage: python -m app.services.storage_gc [--reconcile] [--collect]")
+        sys.exit(1)
+    from app.core.database import SessionLocal
+
+    async def main():
+        session = SessionLocal()
+        try:
+            if "--reconcile" in sys.argv:
+                print(f"Queued {await reconcile(session)} unreferenced images.")
+            if "--collect" in sys.argv:
+                print(f"Processed {await collect_pending(session)} queued deletions.")
+        finally:
+            session.close()
+
+    asyncio.run(main())
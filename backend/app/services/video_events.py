@@ -0,0 +1,104 @@
+"""
+Video status updates for the dashboard, as server-sent events.
+
+GET /listings/{id}/videos/events holds one connection per tab. It replaces
+polling GET /listings/{id}/videos/{video_id} while Mux encodes. The stream:
+- sends each video's current status once
+- then relays transitions the webhook worker publishes on the in-process
+  broker, reading nothing from the database per event
+- re-reads the listing's videos every VIDEO_EVENTS_RESYNC_SECONDS, to pick
+  up changes applied in another worker process
+- ends when none of the listing's videos are still waiting or processing
+It reads through a session of its own, in a worker thread: the request's
+session is closed before the body is sent.
+
+Each event looks like
+    event: status
+    data: {"id": ..., "status": ..., "mux_playback_id": ...}
+"""
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pubsub import Broker
+from app.models.video import ListingVideo
+
+PENDING_STATUSES = {"waiting", "processing"}
+
+broker = Broker()
+
+
+def _topic(listing_id: str) -> str:
+    return f"videos:{listing_id}"
+
+
+def video_status(video: ListingVideo) -> tuple[str, dict]:
+    """(listing_id, message) for a video's current state. Take it before committing
+    (committing expires the row), and publish it after."""
+    return video.listing_id, {"id": video.id, "status": video.status, "mux_playback_id": video.mux_playback_id}
+
+
+def publish_video_status(updates: Iterable[tuple[str, dict]]) -> None:
+    """Tell open streams about committed video states."""
+    for listing_id, message in updates:
+        broker.publish(_topic(listing_id), message)
+
+
+def _format(message: dict) -> str:
+    return f"event: status\ndata: {json.dumps(message)}\n\n"
+
+
+def _snapshot(db: Session, listing_id: str) -> list[dict]:
+    rows = db.query(ListingVideo.id, ListingVideo.status, ListingVideo.mux_playback_id).filter(
+        ListingVideo.listing_id == listing_id
+    ).all()
+    db.rollback()  # give the connection back between reads; the stream can last minutes
+    return [{"id": id, "status": status, "mux_playback_id": playback_id} for id, status, playback_id in rows]
+
+
+async def stream_video_status(listing_id: str) -> AsyncIterator[str]:
+    """Server-sent events for a listing's videos."""
+    from app.core.database import SessionLocal
+
+    # Subscribe before reading, so a transition between the two isn't lost
+    subscription = broker.subscribe(_topic(listing_id))
+    db = SessionLocal()
+    known: dict[str, dict] = {}
+
+    def changes(messages: list[dict]) -> list[str]:
+        updates = []
+        for message in messages:
+            if known.get(message["id"]) != message:
+                known[message["id"]] = message
+                updates.append(_format(message))
+        return updates
+
+    async def resync() -> list[str]:
+        snapshot = await asyncio.to_thread(_snapshot, db, listing_id)
+        for deleted in known.keys() - {message["id"] for message in snapshot}:
+            del known[deleted]
+        return changes(snapshot)
+
+    try:
+        for event in await resync():
+            yield event
+        synced_at = time.monotonic()
+        while any(message["status"] in PENDING_STATUSES for message in known.values()):
+            message = await subscription.get(settings.VIDEO_EVENTS_HEARTBEAT_SECONDS)
+            if message is not None:
+                for event in changes([message]):
+                    yield event
+            else:
+                yield ": keep-alive\n\n"
+            if subscription.overflowed or time.monotonic() - synced_at >= settings.VIDEO_EVENTS_RESYNC_SECONDS:
+                subscription.overflowed = False
+                synced_at = time.monotonic()
+                for event in await resync():
+                    yield event
+    finally:
+        subscription.close()
+        db.close()
@@ -0,0 +1,203 @@
+"""
+Heal videos whose Mux webhooks never arrived.
+
+A video that is still `waiting` or `processing` VIDEO_RECONCILE_STALE_SECONDS
+after it was created is re-checked with the Mux API. Stale rows come from one
+query on (status, created_at). Mux is asked about them concurrently, at most
+VIDEO_RECONCILE_CONCURRENCY at a time and VIDEO_RECONCILE_REQUESTS_PER_SECOND
+overall. Videos never linked to an asset are looked up by their direct
+upload first. No transaction is open while Mux answers. The changes are then
+written in one UPDATE that only touches videos still waiting or
+processing, so a webhook that settled one in the meantime wins.
+Applied changes are published to open status streams.
+
+Each app worker runs a pass every VIDEO_RECONCILE_INTERVAL_SECONDS. Passes
+in different workers may overlap; the conditional UPDATE makes that
+harmless. A pass can also be run by hand:
+
+    cd backend
+    python -m app.services.video_reconciler
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import case, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import registry
+from app.models.video import ListingVideo
+from app.services.mux_service import get_asset, get_direct_upload
+from app.services.video_events import PENDING_STATUSES, publish_video_status
+
+logger = logging.getLogger(__name__)
+
+# Mux upload statuses after which no asset will come
+_FAILED_UPLOAD_STATUSES = {"errored", "cancelled", "timed_out"}
+
+videos_checked = registry.counter(
+    "video_reconcile_checked_total", "Stale videos re-checked with Mux, by result (healed/advanced/unchanged/failed)."
+)
+
+_reconciler: asyncio.Task | None = None
+
+
+class RateLimiter:
+    """Spaces call starts at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+async def _check(row, limiter: RateLimiter, semaphore: asyncio.Semaphore) -> dict | None:
+    """The video's state according to Mux, as UPDATE values, or None if it hasn't moved on."""
+    video_id, listing_id, status, upload_id, asset_id = row
+    async with semaphore:
+        if asset_id is None:
+            await limiter.wait()
+            upload = await get_direct_upload(upload_id)
+            if upload["status"] in _FAILED_UPLOAD_STATUSES:
+                return {"id": video_id, "status": "error", "mux_asset_id": None, "mux_playback_id": None}
+            asset_id = upload["asset_id"]
+            if asset_id is None:
+                return None  # still waiting for the browser's upload
+        await limiter.wait()
+        asset = await get_asset(asset_id)
+
+    if asset["status"] == "ready":
+        new_status = "ready"
+    elif asset["status"] == "errored":
+        new_status = "error"
+    else:
+        new_status = "processing"
+    if new_status == status and asset_id == row[4]:
+        return None
+    playback_id = asset["playback_id"] if new_status == "ready" else None
+    return {"id": video_id, "status": new_status, "mux_asset_id": asset_id, "mux_playback_id": playback_id}
+
+
+def _stale(db: Session) -> list:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.VIDEO_RECONCILE_STALE_SECONDS)
+    rows = db.query(
+        ListingVideo.id, ListingVideo.listing_id, ListingVideo.status,
+        ListingVideo.mux_upload_id, ListingVideo.mux_asset_id,
+    ).filter(
+        ListingVideo.status.in_(PENDING_STATUSES),
+        ListingVideo.created_at < cutoff,
+        or_(ListingVideo.mux_asset_id.isnot(None), ListingVideo.mux_upload_id.isnot(None)),
+    ).order_by(ListingVideo.created_at).limit(settings.VIDEO_RECONCILE_BATCH_SIZE).all()
+    db.commit()  # no transaction stays open while Mux is asked
+    return rows
+
+
+def _write(db: Session, changes: list[dict]) -> list[dict]:
+    """Apply changes, in one UPDATE, to videos that are still pending. Returns the ones applied."""
+    by_id = {change["id"]: change for change in changes}
+    values = {
+        column: case({video_id: change[column] for video_id, change in by_id.items()}, value=ListingVideo.id)
+        for column in ("status", "mux_asset_id", "mux_playback_id")
+    }
+    # A webhook may have settled a video while Mux was being asked
+    applied = db.execute(
+        update(ListingVideo)
+        .where(ListingVideo.id.in_(list(by_id)), ListingVideo.status.in_(PENDING_STATUSES))
+        .values(**values)
+        .returning(ListingVideo.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return [by_id[video_id] for video_id in applied]
+
+
+async def reconcile(db: Session) -> int:
+    """Re-check stale videos with Mux and apply what changed. Returns how many videos were healed."""
+    rows = await asyncio.to_thread(_stale, db)
+    if not rows:
+        return 0
+
+    limiter = RateLimiter(settings.VIDEO_RECONCILE_REQUESTS_PER_SECOND)
+    semaphore = asyncio.Semaphore(settings.VIDEO_RECONCILE_CONCURRENCY)
+    outcomes = await asyncio.gather(*(_check(row, limiter, semaphore) for row in rows), return_exceptions=True)
+
+    changes = []
+    listing_ids = {}
+    for row, outcome in zip(rows, outcomes):
+        if isinstance(outcome, BaseException):
+            videos_checked.inc(result="failed")
+            logger.warning(f"Checking video {row[0]} with Mux failed: {outcome!r}")
+        elif outcome is None:
+            videos_checked.inc(result="unchanged")
+        else:
+            changes.append(outcome)
+            listing_ids[row[0]] = row[1]
+    applied = await asyncio.to_thread(_write, db, changes) if changes else []
+
+    healed = [change for change in applied if change["status"] not in PENDING_STATUSES]
+    videos_checked.inc(len(healed), result="healed")
+    videos_checked.inc(len(applied) - len(healed), result="advanced")
+    videos_checked.inc(len(changes) - len(applied), result="unchanged")
+    publish_video_status(
+        (listing_ids[change["id"]], {key: change[key] for key in ("id", "status", "mux_playback_id")})
+        for change in applied
+    )
+    if healed:
+        logger.info(f"Reconciled {len(healed)} stale videos with Mux")
+    return len(healed)
+
+
+async def _run_reconciler() -> None:
+    from app.core.database import SessionLocal
+
+    while True:
+        await asyncio.sleep(settings.VIDEO_RECONCILE_INTERVAL_SECONDS)
+        db = SessionLocal()
+        try:
+            await reconcile(db)
+        except Exception as e:
+            logger.warning(f"Video reconciliation failed: {e!r}")
+            db.rollback()
+        finally:
+            db.close()
+
+
+def start_reconciler() -> None:
+    global _reconciler
+    if settings.MUX_TOKEN_ID and _reconciler is None:
+        _reconciler = asyncio.create_task(_run_reconciler())
+
+
+async def stop_reconciler() -> None:
+    global _reconciler
+    if _reconciler is not None:
+        _reconciler.cancel()
+        try:
+            await _reconciler
+        except asyncio.CancelledError:
+            pass
+        _reconciler = None
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+    from app.services.mux_service import close_mux_client
+
+    async def main():
+        session = SessionLocal()
+        try:
+            print(f"Healed {await reconcile(session)} stale videos.")
+        finally:
+            session.close()
+            close_mux_client()
+
+    asyncio.run(main())
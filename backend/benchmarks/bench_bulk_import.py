@@ -0,0 +1,74 @@
+"""
+Throughput benchmark: POST /listings one at a time vs POST /listings/bulk.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_bulk_import
+
+Runs against a throwaway SQLite database. Addresses deliberately collide
+("<n % 50> Main St") so slug allocation has to resolve suffixes.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.database import Base, get_db
+from app.models.user import User
+
+SINGLE_ROWS = 200
+BULK_ROWS = 5000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        def override_get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)
+        client.post("/auth/signup", json={"email": "bench@test.com", "password": "pass123"})
+        with Session() as db:
+            db.query(User).update({User.subscription_tier: "pro"})
+            db.commit()
+        token = client.post("/auth/login", json={"email": "bench@test.com", "password": "pass123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        agent_id = client.post("/agents", json={"name": "Bench Agent"}, headers=headers).json()["id"]
+
+        def row(i):
+            return {"agent_id": agent_id, "address": f"{i % 50} Main St", "price": 100_000 + i,
+                    "beds": 3, "baths": 2, "sqft": 1500}
+
+        start = time.perf_counter()
+        for i in range(SINGLE_ROWS):
+            assert client.post("/listings", json=row(i), headers=headers).status_code == 201
+        single = SINGLE_ROWS / (time.perf_counter() - start)
+
+        rows = [row(i) for i in range(SINGLE_ROWS, SINGLE_ROWS + BULK_ROWS)]
+        start = time.perf_counter()
+        response = client.post("/listings/bulk", json=rows, headers=headers)
+        bulk = BULK_ROWS / (time.perf_counter() - start)
+        assert response.json()["created"] == BULK_ROWS
+
+        print(f"POST /listings       {SINGLE_ROWS:>5} rows: {single:8.0f} rows/s")
+        print(f"POST /listings/bulk  {BULK_ROWS:>5} rows: {bulk:8.0f} rows/s")
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Latency benchmark for the public browse facet index.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_facet_index
+
+Fills a ListingFacetIndex with synthetic listings and times random filter +
+sort + page queries at 10k and 100k listings.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+import numpy as np
+
+from app.services.facet_index import ListingFacetIndex
+
+SIZES = [10_000, 100_000]
+QUERIES = 2_000
+
+
+def build_index(n: int, rng: np.random.Generator) -> ListingFacetIndex:
+    index = ListingFacetIndex()
+    index.loaded = True
+    prices = rng.integers(10_000_000, 300_000_000, n)
+    beds = rng.integers(1, 7, n)
+    baths = rng.integers(1, 5, n)
+    sqft = rng.integers(500, 6_000, n)
+    for i in range(n):
+        index._put(f"listing-{i}", int(prices[i]), int(beds[i]), int(baths[i]), int(sqft[i]))
+    return index
+
+
+def random_query(rng: np.random.Generator) -> dict:
+    low = int(rng.integers(10_000_000, 150_000_000))
+    return {
+        "min_price": low,
+        "max_price": low + int(rng.integers(10_000_000, 150_000_000)),
+        "min_beds": int(rng.integers(1, 4)),
+        "min_baths": int(rng.integers(1, 3)),
+        "min_sqft": int(rng.integers(500, 2_500)) if rng.random() < 0.5 else None,
+        "sort": "price" if rng.random() < 0.5 else "price_per_sqft",
+        "order": "asc" if rng.random() < 0.5 else "desc",
+        "limit": 24,
+        "offset": int(rng.choice([0, 0, 0, 24, 48])),
+    }
+
+
+def main():
+    rng = np.random.default_rng(42)
+    for n in SIZES:
+        index = build_index(n, rng)
+        queries = [random_query(rng) for _ in range(QUERIES)]
+        timings = np.empty(QUERIES)
+        matched = 0
+        for i, q in enumerate(queries):
+            start = time.perf_counter()
+            total, _ = index.query(**q)
+            timings[i] = time.perf_counter() - start
+            matched += total
+        us = timings * 1e6
+        print(
+            f"{n:>7} listings: p50 {np.percentile(us, 50):7.1f} us  "
+            f"p95 {np.percentile(us, 95):7.1f} us  p99 {np.percentile(us, 99):7.1f} us  "
+            f"(avg {matched // QUERIES} matches/query)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Image pipeline throughput: photos per second per core.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_image_pipeline [photos] [width] [height]
+
+Generates synthetic camera-sized JPEGs (default 24 photos at 6000x4000),
+then renders them with app.services.image_pipeline.render_photo (variant
+widths from IMAGE_VARIANT_WIDTHS, WebP + AVIF when supported, blur
+placeholder) first in one process, then in a pool with one worker per core.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageFilter
+
+from app.core.config import settings
+from app.services.image_pipeline import _avif_supported, render_photo
+
+PHOTOS = 24
+WIDTH, HEIGHT = 6000, 4000
+
+
+def make_photo(path: str, width: int, height: int, seed: int) -> None:
+    # Noise blurred into blotches compresses and decodes more like a photo than a flat image
+    noise = Image.effect_noise((width // 8, height // 8), 64 + seed % 32).resize((width, height))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (noise, gradient, noise.filter(ImageFilter.GaussianBlur(3))))
+    image.save(path, "JPEG", quality=92)
+
+
+def main():
+    photos = int(sys.argv[1]) if len(sys.argv) > 1 else PHOTOS
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else WIDTH
+    height = int(sys.argv[3]) if len(sys.argv) > 3 else HEIGHT
+    cores = os.cpu_count() or 1
+    widths = settings.IMAGE_VARIANT_WIDTHS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = []
+        for i in range(photos):
+            path = os.path.join(tmp, f"src-{i}.jpg")
+            make_photo(path, width, height, i)
+            sources.append(path)
+        size_mb = sum(os.path.getsize(p) for p in sources) / photos / 1e6
+        print(f"{photos} photos, {width}x{height}, {size_mb:.1f} MB each; variants {widths}, "
+              f"formats webp{' + avif' if _avif_supported() else ''}")
+
+        jobs = [(path, os.path.join(tmp, "out", f"s{i}"), widths) for i, path in enumerate(sources)]
+        start = time.perf_counter()
+        for job in jobs:
+            render_photo(*job)
+        serial = time.perf_counter() - start
+        print(f"1 process:          {photos / serial:6.2f} photos/s   {photos / serial:6.2f} photos/s/core")
+
+        jobs = [(path, os.path.join(tmp, "out", f"p{i}"), widths) for i, path in enumerate(sources)]
+        with ProcessPoolExecutor(cores, mp_context=multiprocessing.get_context("spawn")) as pool:
+            list(pool.map(int, range(cores)))  # spawn the workers before timing
+            start = time.perf_counter()
+            list(pool.map(render_photo, *zip(*jobs)))
+            pooled = time.perf_counter() - start
+        print(f"pool of {cores:<2} workers:  {photos / pooled:6.2f} photos/s   {photos / pooled / cores:6.2f} photos/s/core")
+
+
+if __name__ == "__main__":
+    main()
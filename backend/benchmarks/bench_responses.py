@@ -0,0 +1,132 @@
+"""
+Response serialization benchmark: FastAPI's default path vs validate-once.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_responses
+
+Builds the payloads of GET /listings (500 listings) and GET /listings/{id}
+(50 photos) from a throwaway SQLite database, then times turning them into
+JSON bytes two ways:
+
+- default: what FastAPI does with a returned dict and a response_model —
+  validate against the model, dump it to JSON-able Python objects, walk
+  them again with jsonable_encoder, then stdlib json.dumps
+- adapter: app.core.responses.adapter_response — one validation, bytes
+  from pydantic-core
+
+Finally times the real endpoints end to end through the TestClient.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.database import Base, get_db
+from app.core.responses import adapter_response
+from app.models.photo import ListingPhoto
+from app.models.user import User
+from app.api.listings import LISTING_DETAIL, LISTING_PAGE
+
+LISTINGS = 500
+PHOTOS = 50
+ROUNDS = 200
+
+
+def default_render(adapter, data) -> bytes:
+    value = adapter.validate_python(data, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(value, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def adapter_render(adapter, data) -> bytes:
+    return adapter_response(adapter, data).body
+
+
+def time_render(render, adapter, data) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        render(adapter, data)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        def override_get_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        client = TestClient(app)
+        client.post("/auth/signup", json={"email": "bench@test.com", "password": "pass123"})
+        with Session() as db:
+            db.query(User).update({User.subscription_tier: "pro"})
+            db.commit()
+        token = client.post("/auth/login", json={"email": "bench@test.com", "password": "pass123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        agent_id = client.post("/agents", json={"name": "Bench Agent"}, headers=headers).json()["id"]
+
+        rows = [
+            {"agent_id": agent_id, "address": f"{i} Main St", "price": 100_000 + i, "beds": 3, "baths": 2,
+             "sqft": 1500, "description": "Bright corner lot with a renovated kitchen", "mls_number": f"MLS-{i}"}
+            for i in range(LISTINGS)
+        ]
+        listing_id = client.post("/listings/bulk", json=rows, headers=headers).json()["results"][0]["id"]
+        with Session() as db:
+            db.add_all(
+                ListingPhoto(listing_id=listing_id, cloudflare_image_id=f"cf-{i}",
+                             url=f"https://imagedelivery.net/acct/cf-{i}/public",
+                             thumbnail_url=f"https://imagedelivery.net/acct/cf-{i}/thumbnail", position=i)
+                for i in range(PHOTOS)
+            )
+            db.commit()
+
+        # Payloads exactly as the handlers build them
+        items, cursor = [], None
+        while True:
+            path = "/listings?limit=200" + (f"&cursor={cursor}" if cursor else "")
+            page = client.get(path, headers=headers).json()
+            items += page["items"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        page = {"items": items, "next_cursor": None, "facets": None}
+        detail = client.get(f"/listings/{listing_id}", headers=headers).json()
+
+        for name, adapter, data in [
+            (f"/listings ({LISTINGS} items)", LISTING_PAGE, page),
+            (f"/listings/{{id}} ({PHOTOS} photos)", LISTING_DETAIL, detail),
+        ]:
+            assert json.loads(default_render(adapter, data)) == json.loads(adapter_render(adapter, data))
+            default_ms = time_render(default_render, adapter, data)
+            adapter_ms = time_render(adapter_render, adapter, data)
+            print(f"{name:<28} default {default_ms:7.3f} ms   adapter {adapter_ms:7.3f} ms   "
+                  f"{default_ms / adapter_ms:4.1f}x")
+
+        for name, path in [("GET /listings?limit=200", "/listings?limit=200"),
+                           ("GET /listings/{id}", f"/listings/{listing_id}")]:
+            start = time.perf_counter()
+            for _ in range(ROUNDS // 4):
+                client.get(path, headers=headers)
+            print(f"{name:<28} end to end {(time.perf_counter() - start) / (ROUNDS // 4) * 1000:7.3f} ms/request")
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
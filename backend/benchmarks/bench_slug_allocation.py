@@ -0,0 +1,146 @@
+"""
+Slug allocation benchmark: round trips per allocation under heavy collisions.
+
+Usage:
+    cd backend
+    python -m benchmarks.bench_slug_allocation
+
+1. Sequentially allocates 10k slugs for the same address and reports SQL
+   statements per allocation, next to the old probe-per-candidate loop
+   (run for fewer rows, on its own address, since it is quadratic).
+2. Runs concurrent creators (threads with their own sessions) inserting the
+   same address and checks every slug is unique and counts retries.
+
+Uses a throwaway SQLite database. Transactions start with BEGIN IMMEDIATE so
+SQLite's single writer lock stands in for the counter row lock PostgreSQL
+takes with SELECT ... FOR UPDATE (otherwise concurrent writers just fail with
+"database is locked").
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import *  # noqa: F401, F403
+from app.models.listing import Listing
+from app.services.slug import generate_slug, save_with_unique_slug
+
+ADDRESS = "123 Main St"
+SEQUENTIAL = 10_000
+LEGACY_SAMPLE = 500
+THREADS = 8
+PER_THREAD = 250
+
+
+def legacy_get_unique_slug(address, db):
+    """The previous allocator: one query per candidate slug."""
+    base = generate_slug(address)
+    slug = base
+    counter = 2
+    while db.query(Listing).filter(Listing.slug == slug).first():
+        slug = f"{base}-{counter}"
+        counter += 1
+    return slug
+
+
+def new_listing(address=ADDRESS):
+    return Listing(photographer_id="bench", agent_id="bench", address=address,
+                   price=1, beds=1, baths=1, sqft=1, status="active")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False, "timeout": 30})
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        @event.listens_for(engine, "connect")
+        def disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+        statements = [0]
+        lock = threading.Lock()
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            with lock:
+                statements[0] += 1
+
+        # --- sequential: new allocator ---
+        with Session() as db:
+            start = time.perf_counter()
+            for i in range(SEQUENTIAL):
+                save_with_unique_slug(db, new_listing(), ADDRESS)
+                if i % 500 == 499:
+                    db.commit()
+            db.commit()
+            elapsed = time.perf_counter() - start
+        # Each allocation: SAVEPOINT, counter SELECT + UPDATE, RELEASE, SAVEPOINT, INSERT, RELEASE
+        print(f"counter allocator: {SEQUENTIAL} colliding slugs in {elapsed:.2f}s, "
+              f"{statements[0] / SEQUENTIAL:.2f} statements/allocation")
+
+        # --- sequential: legacy probing ---
+        statements[0] = 0
+        with Session() as db:
+            start = time.perf_counter()
+            for _ in range(LEGACY_SAMPLE):
+                listing = new_listing("9 Legacy Ln")
+                listing.slug = legacy_get_unique_slug("9 Legacy Ln", db)
+                db.add(listing)
+                db.flush()
+            db.commit()
+            elapsed = time.perf_counter() - start
+        print(f"legacy probing:    {LEGACY_SAMPLE} colliding slugs in {elapsed:.2f}s, "
+              f"{statements[0] / LEGACY_SAMPLE:.0f} statements/allocation")
+
+        # --- concurrent creators ---
+        statements[0] = 0
+        unique_violations = [0]
+        errors = []
+
+        def creator():
+            with Session() as db:
+                for _ in range(PER_THREAD):
+                    try:
+                        save_with_unique_slug(db, new_listing("77 Race Ave"), "77 Race Ave")
+                        db.commit()
+                    except Exception as e:  # noqa: BLE001 — report and keep going
+                        db.rollback()
+                        errors.append(repr(e))
+
+        @event.listens_for(engine, "handle_error")
+        def count_unique_violations(context):
+            if isinstance(context.sqlalchemy_exception, IntegrityError):
+                with lock:
+                    unique_violations[0] += 1
+
+        threads = [threading.Thread(target=creator) for _ in range(THREADS)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        with Session() as db:
+            slugs = [s for (s,) in db.query(Listing.slug).filter(Listing.address == "77 Race Ave")]
+        total = THREADS * PER_THREAD
+        print(f"concurrent:        {THREADS} threads x {PER_THREAD} creates in {elapsed:.2f}s, "
+              f"{len(slugs)} rows, {len(set(slugs))} unique slugs, {unique_violations[0]} unique violations retried, "
+              f"{len(errors)} failed, {statements[0] / total:.2f} statements/allocation")
+
+
+if __name__ == "__main__":
+    main()
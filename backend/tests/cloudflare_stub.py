@@ -0,0 +1,106 @@
+"""
+A local stand-in for the Cloudflare Images API.
+
+Tests mount it in-process with the `cloudflare_stub` fixture. To develop
+photo uploads offline, serve it and point the backend at it:
+
+    cd backend
+    uvicorn tests.cloudflare_stub:app --port 8787
+    CLOUDFLARE_API_BASE=http://localhost:8787/client/v4 uvicorn app.main:app
+"""
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Cloudflare Images stub")
+
+# image id -> {"filename", "size"}
+images: dict[str, dict] = {}
+# direct upload image id -> account id, until the file is posted
+drafts: dict[str, str] = {}
+# image id -> ISO upload time, for listing
+uploaded: dict[str, str] = {}
+
+
+def _not_found():
+    return JSONResponse(status_code=404, content={"success": False, "errors": [{"code": 5404, "message": "Image not found"}]})
+
+
+def _image_result(account_id: str, image_id: str) -> dict:
+    base = f"https://imagedelivery.net/{account_id}/{image_id}"
+    return {
+        "id": image_id,
+        "filename": images[image_id]["filename"],
+        "draft": False,
+        "variants": [f"{base}/public", f"{base}/thumbnail"],
+    }
+
+
+async def _store(image_id: str, file: UploadFile) -> None:
+    size = 0
+    while chunk := await file.read(64 * 1024):
+        size += len(chunk)
+    images[image_id] = {"filename": file.filename, "size": size}
+    uploaded[image_id] = datetime.now(timezone.utc).isoformat()
+
+
+@app.post("/client/v4/accounts/{account_id}/images/v1")
+async def upload(account_id: str, file: UploadFile = File(...)):
+    image_id = str(uuid.uuid4())
+    await _store(image_id, file)
+    return {"success": True, "errors": [], "result": _image_result(account_id, image_id)}
+
+
+@app.post("/client/v4/accounts/{account_id}/images/v2/direct_upload")
+def direct_upload(account_id: str, request: Request):
+    image_id = str(uuid.uuid4())
+    drafts[image_id] = account_id
+    return {
+        "success": True,
+        "errors": [],
+        "result": {"id": image_id, "uploadURL": f"{request.base_url}upload/{image_id}"},
+    }
+
+
+@app.post("/upload/{image_id}")
+async def creator_upload(image_id: str, file: UploadFile = File(...)):
+    """The one-time URL handed to the browser."""
+    if drafts.pop(image_id, None) is None:
+        return _not_found()
+    await _store(image_id, file)
+    return {"success": True, "errors": [], "result": {"id": image_id}}
+
+
+@app.get("/client/v4/accounts/{account_id}/images/v2")
+def list_images(account_id: str, per_page: int = 1000, continuation_token: str | None = None):
+    ids = sorted(images, key=lambda image_id: uploaded[image_id])
+    start = int(continuation_token or 0)
+    page = ids[start:start + per_page]
+    more = start + per_page < len(ids)
+    return {
+        "success": True,
+        "errors": [],
+        "result": {
+            "images": [{"id": image_id, "uploaded": uploaded[image_id]} for image_id in page],
+            "continuation_token": str(start + per_page) if more else None,
+        },
+    }
+
+
+@app.get("/client/v4/accounts/{account_id}/images/v1/{image_id}")
+def get_image(account_id: str, image_id: str):
+    if image_id in drafts:
+        return {"success": True, "errors": [], "result": {"id": image_id, "draft": True, "variants": []}}
+    if image_id not in images:
+        return _not_found()
+    return {"success": True, "errors": [], "result": _image_result(account_id, image_id)}
+
+
+@app.delete("/client/v4/accounts/{account_id}/images/v1/{image_id}")
+def delete(account_id: str, image_id: str):
+    uploaded.pop(image_id, None)
+    if images.pop(image_id, None) is None and drafts.pop(image_id, None) is None:
+        return _not_found()
+    return {"success": True, "errors": [], "result": {}}
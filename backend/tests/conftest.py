@@ -1,10 +1,16 @@
+import httpx
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
+from app.core.config import settings
 from app.core.database import Base, get_db
+from app.core.http import set_http_client
+from app.core.metrics import registry
+from app.services.facet_index import facet_index
+from tests import cloudflare_stub as stub
 
 SQLALCHEMY_TEST_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_TEST_URL, connect_args={"check_same_thread": False})
@@ -15,6 +21,22 @@ def setup_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    facet_index.reset()
+    registry.reset()
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, monkeypatch):
+    """Image pipeline output and resumable uploads go to per-test directories."""
+    monkeypatch.setattr(settings, "MEDIA_ROOT", str(tmp_path / "media"))
+    monkeypatch.setattr(settings, "UPLOAD_TMP_DIR", str(tmp_path / "uploads"))
+    return tmp_path / "media"
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    """Store photo originals on disk in a per-test directory instead of Cloudflare."""
+    monkeypatch.setattr(settings, "PHOTO_STORAGE_BACKEND", "local")
+    monkeypatch.setattr(settings, "STORAGE_LOCAL_ROOT", str(tmp_path / "storage"))
+    return tmp_path / "storage"
 
 @pytest.fixture
 def db():
@@ -24,6 +46,13 @@ def db():
     finally:
         db.close()
 
+@pytest.fixture
+def session_local(monkeypatch):
+    """Point code that opens its own sessions (background work, event streams) at the test database."""
+    from app.core import database
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    return TestingSessionLocal
+
 @pytest.fixture
 def client(db):
     def override_get_db():
@@ -31,3 +60,26 @@ def client(db):
     app.dependency_overrides[get_db] = override_get_db
     yield TestClient(app)
     app.dependency_overrides.clear()
+
+@pytest.fixture
+def query_counter():
+    """Collects every SQL statement executed against the test engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture
+def cloudflare_stub(monkeypatch):
+    """Point the shared HTTP client at the in-process Cloudflare Images stub."""
+    monkeypatch.setattr(settings, "CLOUDFLARE_ACCOUNT_ID", "test-account")
+    stub.images.clear()
+    stub.drafts.clear()
+    stub.uploaded.clear()
+    set_http_client(httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app)))
+    yield stub.images
+    set_http_client(None)
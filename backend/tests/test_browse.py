@@ -0,0 +1,88 @@
+from app.services.facet_index import ListingFacetIndex
+
+
+def _create_listings(client, db, specs):
+    """Helper: create a pro user and agent, then one listing per (price, beds, baths, sqft)."""
+    from app.models.user import User
+    client.post("/auth/signup", json={"email": "photo@test.com", "password": "pass123"})
+    login = client.post("/auth/login", json={"email": "photo@test.com", "password": "pass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    db.query(User).update({User.subscription_tier: "pro"})
+    db.commit()
+    agent_id = client.post("/agents", json={"name": "Jane Smith"}, headers=headers).json()["id"]
+    ids = []
+    for i, (price, beds, baths, sqft) in enumerate(specs):
+        r = client.post("/listings", json={
+            "agent_id": agent_id, "address": f"{i} Browse St",
+            "price": price, "beds": beds, "baths": baths, "sqft": sqft,
+        }, headers=headers)
+        ids.append(r.json()["id"])
+    return headers, ids
+
+
+def test_browse_filters_and_sorts(client, db):
+    _create_listings(client, db, [
+        (300000, 3, 2, 1500),
+        (500000, 4, 3, 2000),
+        (200000, 2, 1, 1000),
+        (900000, 5, 4, 4500),
+    ])
+    data = client.get("/browse?min_beds=3&max_price=600000").json()
+    assert data["total"] == 2
+    assert [l["price"] for l in data["items"]] == [300000, 500000]
+    assert data["items"][0]["slug"] == "0-browse-st"
+
+    data = client.get("/browse?sort=price_per_sqft&order=desc").json()
+    # 250, 200, 200, 200 per sqft; ties keep a stable order
+    assert [l["price"] for l in data["items"]][0] == 500000
+    assert data["total"] == 4
+
+
+def test_browse_paginates(client, db):
+    _create_listings(client, db, [(p, 1, 1, 500) for p in (500, 100, 400, 200, 300)])
+    first = client.get("/browse?limit=2").json()
+    second = client.get("/browse?limit=2&offset=2").json()
+    third = client.get("/browse?limit=2&offset=4").json()
+    prices = [l["price"] for page in (first, second, third) for l in page["items"]]
+    assert prices == [100, 200, 300, 400, 500]
+    assert first["total"] == 5
+
+
+def test_browse_tracks_listing_changes(client, db):
+    headers, ids = _create_listings(client, db, [(100, 1, 1, 500), (200, 1, 1, 500)])
+    assert client.get("/browse").json()["total"] == 2
+
+    client.patch(f"/listings/{ids[0]}/status", json={"status": "archived"}, headers=headers)
+    client.put(f"/listings/{ids[1]}", json={"price": 250}, headers=headers)
+    data = client.get("/browse").json()
+    assert [l["price"] for l in data["items"]] == [250]
+
+    client.delete(f"/listings/{ids[1]}", headers=headers)
+    assert client.get("/browse").json() == {"total": 0, "items": []}
+
+
+def test_facet_index_reuses_slots_and_grows():
+    index = ListingFacetIndex(capacity=2)
+    index.loaded = True
+    for i in range(5):
+        index._put(f"l{i}", price=i * 100, beds=i, baths=1, sqft=100)
+    index.remove("l1")
+    index._put("l5", price=50, beds=0, baths=1, sqft=0)
+    assert len(index) == 5
+    total, ids = index.query(max_price=300, sort="price")
+    assert (total, ids) == (4, ["l0", "l5", "l2", "l3"])
+    # Zero sqft sorts last by price per sqft
+    assert index.query(sort="price_per_sqft")[1][-1] == "l5"
+
+
+def test_facet_index_sync_skips_while_another_sync_runs(db):
+    index = ListingFacetIndex()
+    index.sync(db)
+    assert index.loaded
+    index._rebuilt_at = 0.0  # a rebuild is due
+
+    with index._refreshing:  # held by the background refresher
+        index.sync(None)  # returns without touching the database
+    assert index._rebuilt_at == 0.0
+    index.sync(db)
+    assert index._rebuilt_at > 0
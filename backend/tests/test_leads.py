@@ -79,3 +79,17 @@ def test_list_leads_as_photographer(mock_email, client):
 def test_list_leads_requires_auth(client):
     response = client.get("/leads")
     assert response.status_code == 403
+
+
+@patch("app.api.leads.send_lead_notification")
+def test_search_leads(mock_email, client):
+    slug, headers = _create_listing(client)
+    client.post(f"/p/{slug}/leads", json={"name": "Alice Walker", "email": "alice@buyers.com", "message": "Is the garage heated?"})
+    client.post(f"/p/{slug}/leads", json={"name": "Bob Stone", "email": "bob@example.com", "message": "Interested in a showing"})
+
+    results = client.get("/leads/search?q=garage", headers=headers).json()
+    assert [r["name"] for r in results] == ["Alice Walker"]
+    assert results[0]["listing_address"] == "123 Main St, Austin TX"
+
+    results = client.get("/leads/search?q=bob@example", headers=headers).json()
+    assert [r["name"] for r in results] == ["Bob Stone"]
@@ -30,7 +30,124 @@ def test_list_listings(client):
     client.post("/listings", json={"agent_id": agent_id, "address": "1 A St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
     client.post("/listings", json={"agent_id": agent_id, "address": "2 B St", "price": 200, "beds": 2, "baths": 1, "sqft": 600}, headers=headers)
     response = client.get("/listings", headers=headers)
-    assert len(response.json()) == 2
+    assert len(response.json()["items"]) == 2
+    assert response.json()["next_cursor"] is None
+
+
+def _add_photos(db, listing_id, count):
+    from app.models.photo import ListingPhoto
+    for i in range(count):
+        db.add(ListingPhoto(
+            listing_id=listing_id,
+            cloudflare_image_id=f"cf-{listing_id}-{i}",
+            url=f"https://example.com/{listing_id}/{i}/public",
+            thumbnail_url=f"https://example.com/{listing_id}/{i}/thumbnail",
+            position=count - i,
+        ))
+    db.commit()
+
+
+def test_list_listings_includes_agent_and_first_photo(client, db):
+    headers, agent_id = _setup_user_and_agent(client)
+    created = client.post("/listings", json={"agent_id": agent_id, "address": "1 A St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+    lid = created.json()["id"]
+    _add_photos(db, lid, 3)
+    data = client.get("/listings", headers=headers).json()["items"]
+    assert data[0]["agent_name"] == "Jane Smith"
+    # Lowest position wins, regardless of insertion order
+    assert data[0]["first_photo_url"] == f"https://example.com/{lid}/2/thumbnail"
+
+
+def test_list_listings_query_count_is_constant(client, db, query_counter):
+    from app.models.user import User
+    headers, agent_id = _setup_user_and_agent(client)
+    db.query(User).update({User.subscription_tier: "pro"})
+    db.commit()
+
+    def count_list_queries():
+        query_counter.clear()
+        response = client.get("/listings", headers=headers)
+        assert response.status_code == 200
+        return len(response.json()["items"]), len(query_counter)
+
+    for i in range(2):
+        r = client.post("/listings", json={"agent_id": agent_id, "address": f"{i} Count St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+        _add_photos(db, r.json()["id"], 2)
+    small_rows, small_queries = count_list_queries()
+
+    for i in range(2, 12):
+        r = client.post("/listings", json={"agent_id": agent_id, "address": f"{i} Count St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+        _add_photos(db, r.json()["id"], 2)
+    large_rows, large_queries = count_list_queries()
+
+    assert (small_rows, large_rows) == (2, 12)
+    assert small_queries == large_queries == 2  # current user + listings
+
+
+def _create_pro_listings(client, db, prices):
+    from app.models.user import User
+    headers, agent_id = _setup_user_and_agent(client)
+    db.query(User).update({User.subscription_tier: "pro"})
+    db.commit()
+    ids = []
+    for i, price in enumerate(prices):
+        r = client.post("/listings", json={"agent_id": agent_id, "address": f"{i} Page St", "price": price, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+        ids.append(r.json()["id"])
+    return headers, ids
+
+
+def test_list_listings_keyset_pagination(client, db):
+    headers, ids = _create_pro_listings(client, db, [300, 100, 200, 100, 500])
+    seen = []
+    cursor = None
+    while True:
+        url = "/listings?sort=price&order=asc&limit=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        page = client.get(url, headers=headers).json()
+        assert len(page["items"]) <= 2
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [l["price"] for l in seen] == [100, 100, 200, 300, 500]
+    assert sorted(l["id"] for l in seen) == sorted(ids)
+
+
+def test_list_listings_default_sort_newest_first(client, db):
+    headers, ids = _create_pro_listings(client, db, [100, 200, 300])
+    page = client.get("/listings?limit=2", headers=headers).json()
+    assert [l["id"] for l in page["items"]] == [ids[2], ids[1]]
+    page = client.get(f"/listings?limit=2&cursor={page['next_cursor']}", headers=headers).json()
+    assert [l["id"] for l in page["items"]] == [ids[0]]
+    assert page["next_cursor"] is None
+
+
+def test_list_listings_rejects_mismatched_cursor(client, db):
+    headers, _ = _create_pro_listings(client, db, [100, 200])
+    cursor = client.get("/listings?sort=price&limit=1", headers=headers).json()["next_cursor"]
+    response = client.get(f"/listings?sort=address&cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+    response = client.get("/listings?cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+
+
+def test_list_listings_facets(client, db):
+    headers, ids = _create_pro_listings(client, db, [100, 200, 300])
+    client.patch(f"/listings/{ids[0]}/status", json={"status": "archived"}, headers=headers)
+    page = client.get("/listings?status=archived&include=facets", headers=headers).json()
+    assert [l["id"] for l in page["items"]] == [ids[0]]
+    assert page["facets"] == {"active": 2, "archived": 1}
+    assert client.get("/listings", headers=headers).json()["facets"] is None
+
+
+def test_list_listings_facets_ignore_status_filter(client, db):
+    """The dashboard's free-tier banner reads facets["active"] on every tab."""
+    headers, ids = _create_pro_listings(client, db, [100, 200, 300])
+    client.patch(f"/listings/{ids[0]}/status", json={"status": "archived"}, headers=headers)
+    for status in ("archived", "active"):
+        page = client.get(f"/listings?status={status}&include=facets", headers=headers).json()
+        assert page["facets"]["active"] == 2
 
 
 def test_archive_and_activate_listing(client):
@@ -64,3 +181,174 @@ def test_delete_listing(client):
     lid = created.json()["id"]
     response = client.delete(f"/listings/{lid}", headers=headers)
     assert response.status_code == 204
+
+
+def test_search_listings(client, db):
+    from app.models.user import User
+    headers, agent_id = _setup_user_and_agent(client)
+    db.query(User).update({User.subscription_tier: "pro"})
+    db.commit()
+    for address, description, mls in [
+        ("12 Lakeview Drive, Austin TX", "Sunny home with a pool", "TX-1"),
+        ("34 Oak Street, Dallas TX", "Quiet street near the lake", "TX-2"),
+        ("56 Pine Road, Houston TX", "Renovated kitchen", "HOU-77"),
+    ]:
+        client.post("/listings", json={"agent_id": agent_id, "address": address, "price": 100, "beds": 1, "baths": 1, "sqft": 500, "description": description, "mls_number": mls}, headers=headers)
+
+    results = client.get("/listings/search?q=lake", headers=headers).json()
+    # Prefix match on address ranks alongside the description match
+    assert {r["address"] for r in results} == {"12 Lakeview Drive, Austin TX", "34 Oak Street, Dallas TX"}
+
+    results = client.get("/listings/search?q=hou-77", headers=headers).json()
+    assert [r["address"] for r in results] == ["56 Pine Road, Houston TX"]
+
+    results = client.get("/listings/search?q=lake&limit=1&offset=1", headers=headers).json()
+    assert len(results) == 1
+
+
+def test_search_listings_tracks_updates_and_deletes(client):
+    headers, agent_id = _setup_user_and_agent(client)
+    created = client.post("/listings", json={"agent_id": agent_id, "address": "1 Elm St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+    lid = created.json()["id"]
+    assert len(client.get("/listings/search?q=elm", headers=headers).json()) == 1
+
+    client.put(f"/listings/{lid}", json={"address": "1 Birch St"}, headers=headers)
+    assert client.get("/listings/search?q=elm", headers=headers).json() == []
+    assert len(client.get("/listings/search?q=birch", headers=headers).json()) == 1
+
+    client.delete(f"/listings/{lid}", headers=headers)
+    assert client.get("/listings/search?q=birch", headers=headers).json() == []
+
+
+def test_search_listings_scoped_to_user(client):
+    headers, agent_id = _setup_user_and_agent(client)
+    client.post("/listings", json={"agent_id": agent_id, "address": "1 Shared St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+    client.post("/auth/signup", json={"email": "other@test.com", "password": "pass123"})
+    login = client.post("/auth/login", json={"email": "other@test.com", "password": "pass123"})
+    other = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/listings/search?q=shared", headers=other).json() == []
+    # Punctuation-only queries match nothing rather than erroring
+    assert client.get("/listings/search?q=%22*", headers=headers).json() == []
+
+
+def test_bulk_create_listings_json(client, db):
+    from app.models.user import User
+    headers, agent_id = _setup_user_and_agent(client)
+    db.query(User).update({User.subscription_tier: "pro"})
+    db.commit()
+    rows = [
+        {"agent_id": agent_id, "address": "1 Bulk St", "price": 100, "beds": 1, "baths": 1, "sqft": 500},
+        {"agent_id": agent_id, "address": "1 Bulk St", "price": 200, "beds": 2, "baths": 1, "sqft": 600},
+        {"agent_id": "someone-elses-agent", "address": "2 Bulk St", "price": 100, "beds": 1, "baths": 1, "sqft": 500},
+        {"agent_id": agent_id, "address": "3 Bulk St", "price": "lots", "beds": 1, "baths": 1, "sqft": 500},
+    ]
+    response = client.post("/listings/bulk", json=rows, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 2)
+    results = data["results"]
+    assert [r["status"] for r in results] == ["created", "created", "error", "error"]
+    assert [results[0]["slug"], results[1]["slug"]] == ["1-bulk-st", "1-bulk-st-2"]
+    assert results[2]["error"] == "Agent not found"
+    assert results[3]["error"].startswith("price:")
+
+    listings = client.get("/listings", headers=headers).json()["items"]
+    assert {l["id"] for l in listings} == {results[0]["id"], results[1]["id"]}
+    assert all(l["agent_name"] == "Jane Smith" for l in listings)
+
+
+def test_bulk_create_listings_csv(client):
+    headers, agent_id = _setup_user_and_agent(client)
+    body = (
+        "agent_id,address,price,beds,baths,sqft,description,mls_number\n"
+        f"{agent_id},10 Csv Rd,100,1,1,500,,MLS-1\n"
+        f"{agent_id},11 Csv Rd,200,2,2,700,Nice view,\n"
+    )
+    response = client.post("/listings/bulk", content=body, headers={**headers, "Content-Type": "text/csv"})
+    assert response.status_code == 200
+    assert response.json()["created"] == 2
+    listings = client.get("/listings?sort=address&order=asc", headers=headers).json()["items"]
+    assert [(l["mls_number"], l["description"]) for l in listings] == [("MLS-1", None), (None, "Nice view")]
+
+
+def test_bulk_create_listings_free_tier(client):
+    headers, agent_id = _setup_user_and_agent(client)
+    client.post("/listings", json={"agent_id": agent_id, "address": "0 Tier St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers)
+    rows = [
+        {"agent_id": agent_id, "address": f"{i} Tier St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}
+        for i in range(1, 7)
+    ]
+    data = client.post("/listings/bulk", json=rows, headers=headers).json()
+    assert (data["created"], data["failed"]) == (4, 2)
+    assert "Free tier" in data["results"][-1]["error"]
+
+
+def test_bulk_create_listings_rejects_bad_body(client):
+    headers, _ = _setup_user_and_agent(client)
+    assert client.post("/listings/bulk", json={"not": "a list"}, headers=headers).status_code == 400
+    assert client.post("/listings/bulk", content=b"{", headers={**headers, "Content-Type": "application/json"}).status_code == 400
+
+
+def _create_listings(client, headers, agent_id, count):
+    return [
+        client.post("/listings", json={"agent_id": agent_id, "address": f"{i} Batch St", "price": 100, "beds": 1, "baths": 1, "sqft": 500}, headers=headers).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_bulk_status(client, query_counter):
+    headers, agent_id = _setup_user_and_agent(client)
+    ids = _create_listings(client, headers, agent_id, 3)
+
+    query_counter.clear()
+    response = client.post("/listings/bulk-status", json={"ids": [*ids, "missing"], "status": "archived"}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["succeeded"], data["failed"]) == (3, 1)
+    assert [r["id"] for r in data["results"]] == [*ids, "missing"]
+    assert data["results"][-1]["error"] == "Listing not found"
+    assert sum(1 for s in query_counter if s.lstrip().upper().startswith("UPDATE LISTINGS")) == 1
+
+    facets = client.get("/listings?include=facets", headers=headers).json()["facets"]
+    assert facets == {"archived": 3}
+    assert client.get("/stats", headers=headers).json()["active_listings"] == 0
+
+    assert client.post("/listings/bulk-status", json={"ids": ids, "status": "sold"}, headers=headers).status_code == 400
+
+
+def test_bulk_status_free_tier(client):
+    headers, agent_id = _setup_user_and_agent(client)
+    ids = _create_listings(client, headers, agent_id, 5)
+    client.post("/listings/bulk-status", json={"ids": ids, "status": "archived"}, headers=headers)
+    ids += _create_listings(client, headers, agent_id, 2)
+
+    # Two are already active; only three more fit under the limit
+    data = client.post("/listings/bulk-status", json={"ids": ids, "status": "active"}, headers=headers).json()
+    assert (data["succeeded"], data["failed"]) == (5, 2)
+    assert [r["status"] for r in data["results"]] == ["updated"] * 3 + ["error"] * 2 + ["updated"] * 2
+    assert "Free tier" in data["results"][3]["error"]
+
+
+def test_bulk_delete(client, db):
+    from app.models.lead import Lead
+    from app.models.photo import ListingPhoto
+    headers, agent_id = _setup_user_and_agent(client)
+    ids = _create_listings(client, headers, agent_id, 3)
+    _add_photos(db, ids[0], 2)
+    slug = client.get(f"/listings/{ids[0]}", headers=headers).json()["slug"]
+    client.post(f"/p/{slug}/leads", json={"name": "John", "email": "john@email.com"})
+
+    client.post("/auth/signup", json={"email": "other@test.com", "password": "pass123"})
+    login = client.post("/auth/login", json={"email": "other@test.com", "password": "pass123"})
+    other = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    data = client.post("/listings/bulk-delete", json={"ids": ids[:2]}, headers=other).json()
+    assert data["failed"] == 2
+
+    data = client.post("/listings/bulk-delete", json={"ids": ids[:2]}, headers=headers).json()
+    assert (data["succeeded"], data["failed"]) == (2, 0)
+    assert [r["status"] for r in data["results"]] == ["deleted", "deleted"]
+    assert db.query(ListingPhoto).count() == 0
+    assert db.query(Lead).count() == 0
+    assert [l["id"] for l in client.get("/listings", headers=headers).json()["items"]] == [ids[2]]
+    stats = client.get("/stats", headers=headers).json()
+    assert (stats["total_listings"], stats["active_listings"], stats["total_leads"]) == (1, 1, 0)
@@ -1,5 +1,8 @@
+import os
 from unittest.mock import patch, AsyncMock
 
+import pytest
+
 
 def _setup_user_and_listing(client):
     """Helper: create user, login, create agent, create listing, return (headers, listing_id)"""
@@ -17,6 +20,16 @@ def _setup_user_and_listing(client):
     return headers, listing.json()["id"]
 
 
+# Smallest thing the upload path accepts as a JPEG: the magic bytes plus a JFIF header
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00" + b"image-data"
+
+def _collect(db) -> int:
+    """Run the storage collector until nothing is due."""
+    import asyncio
+    from app.services.storage_gc import collect_pending
+    return asyncio.run(collect_pending(db))
+
+
 MOCK_UPLOAD_RESULT = {
     "id": "cf-image-123",
     "url": "https://imagedelivery.net/acct/cf-image-123/public",
@@ -29,7 +42,7 @@ def test_upload_photo(mock_upload, client):
     headers, listing_id = _setup_user_and_listing(client)
     response = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("test.jpg", b"fake-image-data", "image/jpeg")},
+        files={"file": ("test.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     assert response.status_code == 201
@@ -46,12 +59,12 @@ def test_upload_photo_increments_position(mock_upload, client):
     # Upload two photos
     r1 = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("a.jpg", b"data1", "image/jpeg")},
+        files={"file": ("a.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     r2 = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("b.jpg", b"data2", "image/jpeg")},
+        files={"file": ("b.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     assert r1.json()["position"] == 0
@@ -64,12 +77,12 @@ def test_reorder_photos(mock_upload, client):
     # Upload two photos
     r1 = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("a.jpg", b"data1", "image/jpeg")},
+        files={"file": ("a.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     r2 = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("b.jpg", b"data2", "image/jpeg")},
+        files={"file": ("b.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     photo1_id = r1.json()["id"]
@@ -89,13 +102,13 @@ def test_reorder_photos(mock_upload, client):
     assert photos[1]["position"] == 1
 
 
-@patch("app.api.photos.delete_image", new_callable=AsyncMock)
+@patch("app.services.storage_gc.delete_image", new_callable=AsyncMock)
 @patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
-def test_delete_photo(mock_upload, mock_delete, client):
+def test_delete_photo(mock_upload, mock_delete, client, db):
     headers, listing_id = _setup_user_and_listing(client)
     r1 = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("a.jpg", b"data1", "image/jpeg")},
+        files={"file": ("a.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     photo_id = r1.json()["id"]
@@ -105,7 +118,10 @@ def test_delete_photo(mock_upload, mock_delete, client):
         headers=headers,
     )
     assert response.status_code == 204
-    mock_delete.assert_called_once_with("cf-image-123")
+    # Queued, not deleted inline
+    mock_delete.assert_not_called()
+    assert _collect(db) == 1
+    mock_delete.assert_called_once_with("cf-image-123", "cloudflare")
 
 
 def test_delete_photo_not_found(client):
@@ -137,7 +153,7 @@ def test_photo_limit_50(mock_upload, client, db):
     # 51st should fail
     response = client.post(
         f"/listings/{listing_id}/photos",
-        files={"file": ("overflow.jpg", b"data", "image/jpeg")},
+        files={"file": ("overflow.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     assert response.status_code == 400
@@ -152,7 +168,574 @@ def test_upload_photo_listing_not_found(client):
     headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
     response = client.post(
         "/listings/nonexistent-id/photos",
-        files={"file": ("test.jpg", b"data", "image/jpeg")},
+        files={"file": ("test.jpg", JPEG, "image/jpeg")},
         headers=headers,
     )
     assert response.status_code == 404
+
+
+def test_upload_and_delete_photo_through_cloudflare_stub(client, db, cloudflare_stub):
+    headers, listing_id = _setup_user_and_listing(client)
+    response = client.post(
+        f"/listings/{listing_id}/photos",
+        files={"file": ("a.jpg", JPEG, "image/jpeg")},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    image_id, = cloudflare_stub
+    assert response.json()["url"].endswith(f"/{image_id}/public")
+    assert cloudflare_stub[image_id] == {"filename": "a.jpg", "size": len(JPEG)}
+
+    response = client.delete(f"/listings/{listing_id}/photos/{response.json()['id']}", headers=headers)
+    assert response.status_code == 204
+    _collect(db)
+    assert cloudflare_stub == {}
+
+    metrics = client.get("/metrics").text
+    assert 'upstream_requests_total{method="POST",service="cloudflare",status="200"} 1' in metrics
+    assert 'upstream_requests_total{method="DELETE",service="cloudflare",status="200"} 1' in metrics
+    assert 'upstream_request_duration_seconds_count{method="POST",service="cloudflare"} 1' in metrics
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock)
+def test_upload_photos_batch(mock_upload, client):
+    headers, listing_id = _setup_user_and_listing(client)
+
+    async def upload(file, filename, content_type=None):
+        if filename == "bad.jpg":
+            raise RuntimeError("upstream error")
+        return {**MOCK_UPLOAD_RESULT, "id": f"cf-{filename}"}
+
+    mock_upload.side_effect = upload
+    response = client.post(
+        f"/listings/{listing_id}/photos/batch",
+        files=[("files", (name, JPEG + name.encode(), "image/jpeg")) for name in ("a.jpg", "bad.jpg", "b.jpg")],
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 1)
+    assert [r["status"] for r in data["results"]] == ["created", "error", "created"]
+    assert [data["results"][i]["photo"]["position"] for i in (0, 2)] == [0, 1]
+    assert mock_upload.await_count == 3
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_upload_photos_batch_respects_limit(mock_upload, client, db):
+    from app.models.photo import ListingPhoto
+    headers, listing_id = _setup_user_and_listing(client)
+    db.add_all(
+        ListingPhoto(listing_id=listing_id, cloudflare_image_id=f"cf-{i}", url="u", thumbnail_url="t", position=i)
+        for i in range(49)
+    )
+    db.commit()
+
+    response = client.post(
+        f"/listings/{listing_id}/photos/batch",
+        files=[("files", (f"{i}.jpg", JPEG, "image/jpeg")) for i in range(3)],
+        headers=headers,
+    )
+    data = response.json()
+    assert (data["created"], data["failed"]) == (1, 2)
+    assert data["results"][0]["photo"]["position"] == 49
+    assert "Maximum 50" in data["results"][1]["error"]
+    mock_upload.assert_awaited_once()
+
+
+def test_upload_photo_rejects_non_images(client):
+    headers, listing_id = _setup_user_and_listing(client)
+    response = client.post(
+        f"/listings/{listing_id}/photos",
+        files={"file": ("notes.jpg", b"just some text", "image/jpeg")},
+        headers=headers,
+    )
+    assert response.status_code == 415
+
+
+def test_upload_photo_rejects_oversized(client, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "MAX_PHOTO_UPLOAD_BYTES", 1024 * 1024)
+    headers, listing_id = _setup_user_and_listing(client)
+    response = client.post(
+        f"/listings/{listing_id}/photos",
+        files={"file": ("big.jpg", JPEG + bytes(1024 * 1024), "image/jpeg")},
+        headers=headers,
+    )
+    assert response.status_code == 413
+
+
+def test_upload_image_streams_file(cloudflare_stub):
+    import asyncio
+    import tempfile
+    import tracemalloc
+    from app.services.cloudflare import upload_image
+
+    size = 8 * 1024 * 1024
+    with tempfile.TemporaryFile() as f:
+        f.write(JPEG)
+        for _ in range(size // (1024 * 1024)):
+            f.write(bytes(1024 * 1024))
+        tracemalloc.start()
+        try:
+            result = asyncio.run(upload_image(f, "big.jpg", "image/jpeg"))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert cloudflare_stub[result["id"]]["size"] == size + len(JPEG)
+    # The stub spools to disk past 1 MB too, so nothing near the file size is held
+    assert peak < 3 * 1024 * 1024
+
+
+def test_direct_upload_through_cloudflare_stub(client, cloudflare_stub):
+    import asyncio
+    import httpx
+    from tests import cloudflare_stub as stub
+    headers, listing_id = _setup_user_and_listing(client)
+
+    response = client.post(f"/listings/{listing_id}/photos/direct-upload", json={"count": 2}, headers=headers)
+    assert response.status_code == 201
+    tickets = response.json()
+    assert len(tickets) == 2
+
+    # Pending photos aren't shown anywhere yet
+    assert client.get(f"/listings/{listing_id}", headers=headers).json()["photos"] == []
+    photo_id = tickets[0]["photo_id"]
+    response = client.post(f"/listings/{listing_id}/photos/{photo_id}/complete", headers=headers)
+    assert response.status_code == 409
+
+    # The browser posts the file straight to Cloudflare
+    async def browser_upload():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app)) as browser:
+            r = await browser.post(tickets[0]["upload_url"], files={"file": ("a.jpg", JPEG, "image/jpeg")})
+            r.raise_for_status()
+
+    asyncio.run(browser_upload())
+
+    response = client.post(f"/listings/{listing_id}/photos/{photo_id}/complete", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["position"] == 0
+    assert response.json()["url"].endswith("/public")
+    photos = client.get(f"/listings/{listing_id}", headers=headers).json()["photos"]
+    assert [p["id"] for p in photos] == [photo_id]
+
+
+def test_abandoned_direct_uploads_expire(client, db, cloudflare_stub):
+    from datetime import datetime, timedelta, timezone
+    from app.models.photo import ListingPhoto
+    from app.models.storage import PendingStorageDeletion
+    from app.services.storage_gc import expire_pending_photos
+    headers, listing_id = _setup_user_and_listing(client)
+
+    tickets = client.post(f"/listings/{listing_id}/photos/direct-upload", json={"count": 2}, headers=headers).json()
+    abandoned = db.get(ListingPhoto, tickets[0]["photo_id"])
+    abandoned.created_at = datetime.now(timezone.utc) - timedelta(days=1)
+    image_id = abandoned.cloudflare_image_id
+    db.commit()
+
+    assert expire_pending_photos(db) == 1
+    assert [p.id for p in db.query(ListingPhoto)] == [tickets[1]["photo_id"]]
+    assert [d.cloudflare_image_id for d in db.query(PendingStorageDeletion)] == [image_id]
+    # The freed slot can be used again
+    response = client.post(f"/listings/{listing_id}/photos/direct-upload", json={"count": 49}, headers=headers)
+    assert response.status_code == 201
+
+
+def test_direct_upload_respects_limit(client, cloudflare_stub):
+    headers, listing_id = _setup_user_and_listing(client)
+    response = client.post(f"/listings/{listing_id}/photos/direct-upload", json={"count": 51}, headers=headers)
+    assert response.status_code == 400
+
+
+def _insert_photos(db, listing_id, count):
+    from app.models.photo import ListingPhoto
+    photos = [
+        ListingPhoto(listing_id=listing_id, cloudflare_image_id=f"cf-{i}", url="u", thumbnail_url="t", position=i)
+        for i in range(count)
+    ]
+    db.add_all(photos)
+    db.commit()
+    return [p.id for p in photos]
+
+
+def _photo_order(client, listing_id, headers):
+    return [p["id"] for p in client.get(f"/listings/{listing_id}", headers=headers).json()["photos"]]
+
+
+def test_move_photo_updates_one_row(client, db, query_counter):
+    headers, listing_id = _setup_user_and_listing(client)
+    ids = _insert_photos(db, listing_id, 50)
+
+    query_counter.clear()
+    response = client.post(f"/listings/{listing_id}/photos/{ids[40]}/move", json={"before": ids[3]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["position"] == 2.5
+    updates = [s for s in query_counter if s.lstrip().upper().startswith("UPDATE LISTING_PHOTOS")]
+    assert len(updates) == 1
+    assert len(query_counter) < 10
+
+    order = _photo_order(client, listing_id, headers)
+    assert order[:5] == [ids[0], ids[1], ids[2], ids[40], ids[3]]
+
+    client.post(f"/listings/{listing_id}/photos/{ids[0]}/move", json={"after": ids[49]}, headers=headers)
+    assert _photo_order(client, listing_id, headers)[-1] == ids[0]
+
+
+def test_move_photo_rebalances_exhausted_gap(client, db):
+    headers, listing_id = _setup_user_and_listing(client)
+    ids = _insert_photos(db, listing_id, 4)
+    # Keep dropping a photo into the gap after the first one until it's used up
+    for i in range(30):
+        mover = ids[2 + i % 2]
+        response = client.post(f"/listings/{listing_id}/photos/{mover}/move", json={"after": ids[0]}, headers=headers)
+        assert response.status_code == 200
+        assert _photo_order(client, listing_id, headers)[1] == mover
+    positions = [p["position"] for p in client.get(f"/listings/{listing_id}", headers=headers).json()["photos"]]
+    assert positions == sorted(set(positions))
+    assert positions[1] - positions[0] >= 1e-6
+
+
+def test_move_photo_validation(client, db):
+    headers, listing_id = _setup_user_and_listing(client)
+    ids = _insert_photos(db, listing_id, 2)
+    url = f"/listings/{listing_id}/photos/{ids[0]}/move"
+    assert client.post(url, json={}, headers=headers).status_code == 400
+    assert client.post(url, json={"before": ids[1], "after": ids[1]}, headers=headers).status_code == 400
+    assert client.post(url, json={"before": ids[0]}, headers=headers).status_code == 400
+    assert client.post(url, json={"before": "missing"}, headers=headers).status_code == 404
+
+
+def test_reorder_photos_is_one_update(client, db, query_counter):
+    headers, listing_id = _setup_user_and_listing(client)
+    ids = _insert_photos(db, listing_id, 50)
+    query_counter.clear()
+    response = client.put(f"/listings/{listing_id}/photos/order", json={"photo_ids": ids[::-1]}, headers=headers)
+    assert [p["id"] for p in response.json()] == ids[::-1]
+    assert sum(1 for s in query_counter if s.lstrip().upper().startswith("UPDATE")) == 1
+
+
+def _real_jpeg(width, height):
+    import io
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").resize((width, height)).convert("RGB").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@patch("app.services.storage_gc.delete_image", new_callable=AsyncMock)
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_upload_photo_renders_variants(mock_upload, mock_delete, client, db, media_root):
+    pytest.importorskip("PIL")
+    headers, listing_id = _setup_user_and_listing(client)
+    response = client.post(
+        f"/listings/{listing_id}/photos",
+        files={"file": ("big.jpg", _real_jpeg(1600, 1000), "image/jpeg")},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    photo = response.json()
+    assert (photo["width"], photo["height"]) == (1600, 1000)
+    assert photo["blur_data_url"].startswith("data:image/webp;base64,")
+    assert {v["width"] for v in photo["variants"]} == {1600, 1280, 640}
+    assert all(v["url"].startswith(f"/media/photos/{photo['id']}/") for v in photo["variants"])
+    assert (media_root / "photos" / photo["id"] / "640.webp").exists()
+
+    detail = client.get(f"/listings/{listing_id}", headers=headers).json()
+    assert detail["photos"][0]["variants"] == photo["variants"]
+
+    client.delete(f"/listings/{listing_id}/photos/{photo['id']}", headers=headers)
+    _collect(db)
+    assert not (media_root / "photos" / photo["id"]).exists()
+
+
+@patch("app.services.storage_gc.delete_image", new_callable=AsyncMock)
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_reupload_reuses_image(mock_upload, mock_delete, client, db):
+    from app.core.metrics import registry
+    headers, listing_id = _setup_user_and_listing(client)
+    r1 = client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    r2 = client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    assert r2.status_code == 201
+    assert r2.json()["id"] != r1.json()["id"]
+    assert r2.json()["url"] == r1.json()["url"]
+    mock_upload.assert_awaited_once()
+
+    metrics = registry.render()
+    assert 'photo_dedup_lookups_total{result="hit",scope="listing"} 1' in metrics
+    assert 'photo_dedup_lookups_total{result="miss",scope="listing"} 1' in metrics
+
+    # The shared image is only deleted upstream with its last photo
+    client.delete(f"/listings/{listing_id}/photos/{r1.json()['id']}", headers=headers)
+    _collect(db)
+    mock_delete.assert_not_awaited()
+    client.delete(f"/listings/{listing_id}/photos/{r2.json()['id']}", headers=headers)
+    _collect(db)
+    mock_delete.assert_awaited_once_with(MOCK_UPLOAD_RESULT["id"], "cloudflare")
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_batch_transfers_identical_files_once(mock_upload, client):
+    headers, listing_id = _setup_user_and_listing(client)
+    response = client.post(
+        f"/listings/{listing_id}/photos/batch",
+        files=[("files", (f"{i}.jpg", JPEG, "image/jpeg")) for i in range(3)],
+        headers=headers,
+    )
+    data = response.json()
+    assert data["created"] == 3
+    assert len({r["photo"]["id"] for r in data["results"]}) == 3
+    mock_upload.assert_awaited_once()
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_batch_identical_files_hashed_together_transfer_once(mock_upload, client):
+    import asyncio
+    from app.services.photo_dedup import hash_upload
+
+    hashed = []
+    both_hashed = None
+
+    async def hash_in_lockstep(file):
+        # Neither file gets past hashing until both have been hashed
+        nonlocal both_hashed
+        both_hashed = both_hashed or asyncio.Event()
+        digest = await hash_upload(file)
+        hashed.append(digest)
+        if len(hashed) == 2:
+            both_hashed.set()
+        await both_hashed.wait()
+        return digest
+
+    headers, listing_id = _setup_user_and_listing(client)
+    with patch("app.api.photos.hash_upload", side_effect=hash_in_lockstep):
+        response = client.post(
+            f"/listings/{listing_id}/photos/batch",
+            files=[("files", (f"{i}.jpg", JPEG, "image/jpeg")) for i in range(2)],
+            headers=headers,
+        )
+    assert response.json()["created"] == 2
+    mock_upload.assert_awaited_once()
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_dedup_scope(mock_upload, client, monkeypatch):
+    from app.core.config import settings
+    headers, listing_id = _setup_user_and_listing(client)
+    agent_id = client.get("/agents", headers=headers).json()[0]["id"]
+    other_id = client.post("/listings", json={"agent_id": agent_id, "address": "9 Other St", "price": 1,
+                                              "beds": 1, "baths": 1, "sqft": 500},
+                           headers=headers).json()["id"]
+    client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+
+    # Per listing (the default), the same photo on another listing is uploaded again
+    client.post(f"/listings/{other_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    assert mock_upload.await_count == 2
+
+    monkeypatch.setattr(settings, "PHOTO_DEDUP_SCOPE", "photographer")
+    client.post(f"/listings/{other_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    assert mock_upload.await_count == 2
+
+    monkeypatch.setattr(settings, "PHOTO_DEDUP_SCOPE", "off")
+    client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    assert mock_upload.await_count == 3
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_dedup_skips_images_queued_for_deletion(mock_upload, client, db):
+    from app.models.storage import PendingStorageDeletion
+    headers, listing_id = _setup_user_and_listing(client)
+    client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    # Another photo sharing the image was just deleted, queueing it
+    db.add(PendingStorageDeletion(cloudflare_image_id=MOCK_UPLOAD_RESULT["id"]))
+    db.commit()
+
+    client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    assert mock_upload.await_count == 2
+
+
+def test_near_duplicate_clusters():
+    from app.services.photo_similarity import near_duplicate_clusters, signed_hash
+    base = signed_hash(0xF0F0_F0F0_F0F0_F0F0)
+    hashes = [base, 0, base ^ 0b111, signed_hash(0xFFFF_FFFF_FFFF_FFFF), base ^ 0b1111_1111]
+    assert near_duplicate_clusters(hashes, 3) == [[0, 2]]
+    # Links chain: 4 is 8 bits from 0 but 5 from 2
+    assert near_duplicate_clusters(hashes, 5) == [[0, 2, 4]]
+    assert near_duplicate_clusters([], 10) == []
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_similar_photos_groups_bracketed_frames(mock_upload, client):
+    pytest.importorskip("PIL")
+    import io
+    from PIL import Image, ImageEnhance
+
+    def frame(brightness: float, rotate: int = 0) -> bytes:
+        image = Image.radial_gradient("L").resize((800, 600)).rotate(rotate).convert("RGB")
+        image = ImageEnhance.Brightness(image).enhance(brightness)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG")
+        return buffer.getvalue()
+
+    headers, listing_id = _setup_user_and_listing(client)
+    files = [frame(1.0), frame(0.6, rotate=90), frame(0.7), frame(1.3)]
+    response = client.post(
+        f"/listings/{listing_id}/photos/batch",
+        files=[("files", (f"{i}.jpg", data, "image/jpeg")) for i, data in enumerate(files)],
+        headers=headers,
+    )
+    ids = [r["photo"]["id"] for r in response.json()["results"]]
+
+    clusters = client.get(f"/listings/{listing_id}/photos/similar", headers=headers).json()
+    assert [[p["id"] for p in c["photos"]] for c in clusters] == [[ids[0], ids[2], ids[3]]]
+    library = client.get("/photos/similar?max_distance=0", headers=headers).json()
+    assert all(p["listing_id"] == listing_id for c in library for p in c["photos"])
+
+
+def test_deleting_listing_queues_its_images(client, db, cloudflare_stub):
+    headers, listing_id = _setup_user_and_listing(client)
+    for name in ("a.jpg", "b.jpg"):
+        client.post(f"/listings/{listing_id}/photos", files={"file": (name, JPEG + name.encode(), "image/jpeg")},
+                    headers=headers)
+    assert len(cloudflare_stub) == 2
+
+    assert client.delete(f"/listings/{listing_id}", headers=headers).status_code == 204
+    assert _collect(db) == 2
+    assert cloudflare_stub == {}
+
+
+@patch("app.services.storage_gc.delete_image", new_callable=AsyncMock, side_effect=RuntimeError("upstream error"))
+def test_storage_collector_retries_with_backoff(mock_delete, db):
+    from app.models.storage import PendingStorageDeletion
+    db.add(PendingStorageDeletion(cloudflare_image_id="cf-1"))
+    db.commit()
+
+    assert _collect(db) == 1
+    assert _collect(db) == 0  # not due again yet
+    row = db.query(PendingStorageDeletion).one()
+    db.refresh(row)
+    assert row.attempts == 1
+    assert "upstream error" in row.last_error
+
+
+def test_storage_reconcile_finds_orphans(client, db, cloudflare_stub, media_root, monkeypatch):
+    import asyncio
+    from app.core.config import settings
+    from app.services.storage_gc import reconcile
+    from tests import cloudflare_stub as stub
+    headers, listing_id = _setup_user_and_listing(client)
+    client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", JPEG, "image/jpeg")}, headers=headers)
+    cloudflare_stub["orphan"] = {"filename": "x.jpg", "size": 1}
+    stub.uploaded["orphan"] = "2020-01-01T00:00:00+00:00"
+    (media_root / "photos" / "stale").mkdir(parents=True)
+
+    # Too recent: could be an upload whose row isn't committed yet
+    assert asyncio.run(reconcile(db)) == 1
+    monkeypatch.setattr(settings, "STORAGE_GC_ORPHAN_GRACE_SECONDS", -60)
+    assert asyncio.run(reconcile(db)) == 1  # the local directory; the orphan is already queued
+
+    _collect(db)
+    assert "orphan" not in cloudflare_stub
+    assert len(cloudflare_stub) == 1
+    assert not (media_root / "photos" / "stale").exists()
+
+
+def test_direct_upload_helpers_need_a_direct_upload_backend(local_storage):
+    import asyncio
+    from app.services.storage import create_upload_url, get_uploaded_image
+
+    with pytest.raises(ValueError, match="doesn't support direct uploads"):
+        asyncio.run(create_upload_url())
+    with pytest.raises(ValueError, match="doesn't support direct uploads"):
+        asyncio.run(get_uploaded_image("img", "local"))
+
+
+def test_local_storage_backend(client, db, local_storage):
+    headers, listing_id = _setup_user_and_listing(client)
+    data = JPEG + bytes(range(256)) * 4
+    response = client.post(f"/listings/{listing_id}/photos", files={"file": ("a.jpg", data, "image/jpeg")},
+                           headers=headers)
+    assert response.status_code == 201
+    url = response.json()["url"]
+    assert url.startswith("/files/") and url.endswith(".jpg")
+    stored, = local_storage.iterdir()
+    assert stored.read_bytes() == data
+
+    full = client.get(url)
+    assert full.content == data
+    assert full.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert full.headers["accept-ranges"] == "bytes"
+    assert client.get(url, headers={"If-None-Match": full.headers["etag"]}).status_code == 304
+
+    part = client.get(url, headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.content == data[10:20]
+    assert part.headers["content-range"] == f"bytes 10-19/{len(data)}"
+    assert client.get(url, headers={"Range": "bytes=-5"}).content == data[-5:]
+    assert client.get(url, headers={"Range": f"bytes={len(data)}-"}).status_code == 416
+    assert client.get("/files/../conftest.py").status_code == 404
+
+    response = client.post(f"/listings/{listing_id}/photos/direct-upload", json={"count": 1}, headers=headers)
+    assert response.status_code == 400
+
+    photo_id = client.get(f"/listings/{listing_id}", headers=headers).json()["photos"][0]["id"]
+    client.delete(f"/listings/{listing_id}/photos/{photo_id}", headers=headers)
+    _collect(db)
+    assert not stored.exists()
+
+
+@patch("app.api.photos.upload_image", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_resumable_upload(mock_upload, client, db, tmp_path):
+    from app.services.resumable import expire_uploads
+    headers, listing_id = _setup_user_and_listing(client)
+    data = JPEG + bytes(range(256)) * 40
+    created = client.post(f"/listings/{listing_id}/photos/uploads",
+                          json={"filename": "big.jpg", "size": len(data)}, headers=headers)
+    assert created.status_code == 201
+    url = f"/listings/{listing_id}/photos/uploads/{created.json()['upload_id']}"
+
+    response = client.patch(url, content=data[:4000], headers={**headers, "Upload-Offset": "0"})
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == "4000"
+
+    # The connection dropped; ask where to resume. The state is on disk, not in the worker
+    assert client.head(url, headers=headers).headers["Upload-Offset"] == "4000"
+    stale = client.patch(url, content=data[:4000], headers={**headers, "Upload-Offset": "0"})
+    assert stale.status_code == 409
+    assert stale.headers["Upload-Offset"] == "4000"
+    too_long = client.patch(url, content=data[4000:] + b"x", headers={**headers, "Upload-Offset": "4000"})
+    assert too_long.status_code == 413
+    assert client.post(f"{url}/complete", headers=headers).status_code == 409
+
+    client.patch(url, content=data[4000:], headers={**headers, "Upload-Offset": "4000"})
+    response = client.post(f"{url}/complete", headers=headers)
+    assert response.status_code == 201
+    assert response.json()["url"] == MOCK_UPLOAD_RESULT["url"]
+    _, filename, content_type = mock_upload.await_args.args
+    assert (filename, content_type) == ("big.jpg", "image/jpeg")
+    assert client.head(url, headers=headers).status_code == 404
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+    # Abandoned sessions are removed once they expire
+    from datetime import datetime, timedelta, timezone
+    from app.models.upload import PhotoUpload
+    client.post(f"/listings/{listing_id}/photos/uploads", json={"filename": "a.jpg", "size": 10}, headers=headers)
+    assert expire_uploads(db) == 0
+    db.query(PhotoUpload).update({PhotoUpload.expires_at: datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    assert expire_uploads(db) == 1
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+def test_resumable_upload_expired_mid_request(client, tmp_path):
+    from app.services.resumable import part_path
+    headers, listing_id = _setup_user_and_listing(client)
+    created = client.post(f"/listings/{listing_id}/photos/uploads",
+                          json={"filename": "a.jpg", "size": 10}, headers=headers).json()
+    url = f"/listings/{listing_id}/photos/uploads/{created['upload_id']}"
+    # The collector removed the part file after the session row was read
+    os.unlink(part_path(created["upload_id"]))
+
+    response = client.patch(url, content=b"0123456789", headers={**headers, "Upload-Offset": "0"})
+    assert response.status_code == 410
+    assert response.json()["detail"] == "Upload expired"
+    assert client.post(f"{url}/complete", headers=headers).status_code == 410
@@ -15,3 +15,59 @@ def test_lowercases():
 
 def test_trims_dashes():
     assert generate_slug("  123 Main St  ") == "123-main-st"
+
+
+def test_get_unique_slugs_batch(db):
+    from app.models.listing import Listing
+    from app.services.slug import get_unique_slugs
+    db.add(Listing(photographer_id="u", agent_id="a", slug="1-main-st", address="1 Main St",
+                   price=1, beds=1, baths=1, sqft=1))
+    db.add(Listing(photographer_id="u", agent_id="a", slug="1-main-st-2", address="1 Main St",
+                   price=1, beds=1, baths=1, sqft=1))
+    db.commit()
+    slugs = get_unique_slugs(["1 Main St", "1 Main St", "2 Oak Ave", "2 Oak Ave"], db)
+    assert slugs == ["1-main-st-3", "1-main-st-4", "2-oak-ave", "2-oak-ave-2"]
+
+
+def test_get_unique_slug_constant_queries(db, query_counter):
+    from app.models.listing import Listing
+    from app.services.slug import get_unique_slug
+    for i in range(20):
+        slug = "9-elm-st" if i == 0 else f"9-elm-st-{i + 1}"
+        db.add(Listing(photographer_id="u", agent_id="a", slug=slug, address="9 Elm St",
+                       price=1, beds=1, baths=1, sqft=1))
+    db.commit()
+    # The first allocation seeds the counter from existing slugs...
+    assert get_unique_slug("9 Elm St", db) == "9-elm-st-21"
+    # ...after which each allocation reads and advances the counter, regardless of collisions
+    query_counter.clear()
+    assert get_unique_slug("9 Elm St", db) == "9-elm-st-22"
+    assert len(query_counter) == 2
+
+
+def test_save_with_unique_slug_retries_on_conflict(db, monkeypatch):
+    """A slug committed by another writer after our lookup is retried, not raised."""
+    from app.models.listing import Listing
+    from app.services import slug as slug_service
+    db.add(Listing(photographer_id="u", agent_id="a", slug="1-race-st", address="1 Race St",
+                   price=1, beds=1, baths=1, sqft=1))
+    db.commit()
+
+    # Simulate the other writer having committed after our prefix query ran
+    monkeypatch.setattr(slug_service, "_taken_slugs", lambda bases, session: set())
+    listing = Listing(photographer_id="u", agent_id="a", address="1 Race St",
+                      price=2, beds=1, baths=1, sqft=1)
+    slug_service.save_with_unique_slug(db, listing, "1 Race St")
+    db.commit()
+    assert listing.slug == "1-race-st-2"
+
+
+def test_get_unique_slugs_seeds_from_numeric_suffixes_only(db):
+    from app.models.listing import Listing
+    from app.services.slug import get_unique_slug
+    for slug in ["5-main-st-austin-tx", "5-main-st-7"]:
+        db.add(Listing(photographer_id="u", agent_id="a", slug=slug, address=slug,
+                       price=1, beds=1, baths=1, sqft=1))
+    db.commit()
+    assert get_unique_slug("5 Main St", db) == "5-main-st-8"
+    assert get_unique_slug("6 Main St", db) == "6-main-st"
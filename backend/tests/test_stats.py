@@ -0,0 +1,99 @@
+from unittest.mock import patch
+
+from app.models.listing import Listing
+from app.models.stats import PhotographerStats
+from app.services.stats import repair_stats
+
+
+def _setup(client):
+    """Helper: create user and agent, return (auth_headers, agent_id)"""
+    client.post("/auth/signup", json={"email": "photo@test.com", "password": "pass123"})
+    login = client.post("/auth/login", json={"email": "photo@test.com", "password": "pass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    agent = client.post("/agents", json={"name": "Jane Smith"}, headers=headers)
+    return headers, agent.json()["id"]
+
+
+def _create_listing(client, headers, agent_id, address="123 Main St"):
+    return client.post("/listings", json={
+        "agent_id": agent_id, "address": address,
+        "price": 45000000, "beds": 3, "baths": 2, "sqft": 1800,
+    }, headers=headers).json()
+
+
+def test_stats_start_at_zero(client):
+    client.post("/auth/signup", json={"email": "photo@test.com", "password": "pass123"})
+    login = client.post("/auth/login", json={"email": "photo@test.com", "password": "pass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = client.get("/stats", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"active_listings": 0, "total_listings": 0, "total_leads": 0, "total_agents": 0}
+
+
+@patch("app.api.leads.send_lead_notification")
+def test_stats_follow_writes(mock_email, client):
+    headers, agent_id = _setup(client)
+    first = _create_listing(client, headers, agent_id)
+    second = _create_listing(client, headers, agent_id, "456 Oak Ave")
+    client.post(f"/p/{first['slug']}/leads", json={"name": "John", "email": "john@email.com"})
+    client.post(f"/p/{second['slug']}/leads", json={"name": "Mary", "email": "mary@email.com"})
+    client.patch(f"/listings/{second['id']}/status", json={"status": "archived"}, headers=headers)
+
+    stats = client.get("/stats", headers=headers).json()
+    assert stats == {"active_listings": 1, "total_listings": 2, "total_leads": 2, "total_agents": 1}
+
+    client.delete(f"/listings/{first['id']}", headers=headers)
+    stats = client.get("/stats", headers=headers).json()
+    assert stats == {"active_listings": 0, "total_listings": 1, "total_leads": 1, "total_agents": 1}
+
+
+def test_free_tier_limit_reads_counter(client, db, query_counter):
+    headers, agent_id = _setup(client)
+    for i in range(4):
+        _create_listing(client, headers, agent_id, f"{i} Main St")
+
+    query_counter.clear()
+    _create_listing(client, headers, agent_id, "4 Main St")
+    assert not any("count(" in s.lower() for s in query_counter)
+    assert db.query(PhotographerStats).one().active_listings == 5
+
+    response = client.post("/listings", json={
+        "agent_id": agent_id, "address": "5 Main St",
+        "price": 1, "beds": 1, "baths": 1, "sqft": 1,
+    }, headers=headers)
+    assert response.status_code == 403
+
+
+def test_repair_stats(client, db):
+    headers, agent_id = _setup(client)
+    listing = _create_listing(client, headers, agent_id)
+    # Drift the counters behind the API's back
+    db.query(Listing).filter(Listing.id == listing["id"]).update({Listing.status: "archived"})
+    db.query(PhotographerStats).update({PhotographerStats.total_agents: 7})
+    db.commit()
+
+    assert repair_stats(db) == 1
+    stats = client.get("/stats", headers=headers).json()
+    assert stats == {"active_listings": 0, "total_listings": 1, "total_leads": 0, "total_agents": 1}
+
+
+def test_stats_row_created_concurrently(client, db):
+    """Losing the race to create the row re-reads the winner's row instead of failing."""
+    from app.models.user import User
+    from app.services import stats as stats_service
+
+    _setup(client)
+    user_id = db.query(User.id).scalar()
+    real_select = stats_service._select
+    calls = []
+
+    def racing_select(session, photographer_id, for_update):
+        calls.append(for_update)
+        # The first read misses: another transaction is about to commit the row
+        return None if len(calls) == 1 else real_select(session, photographer_id, for_update)
+
+    with patch("app.services.stats._select", side_effect=racing_select):
+        stats = stats_service.get_stats(db, user_id, for_update=True)
+    assert calls == [True, True]
+    assert stats.total_agents == 1
+    assert db.query(PhotographerStats).count() == 1
@@ -1,4 +1,6 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
+
+from app.services.mux_webhooks import process_events
 
 
 MOCK_UPLOAD_RESULT = {
@@ -23,7 +25,7 @@ def _setup_user_and_listing(client):
     return headers, listing.json()["id"]
 
 
-@patch("app.api.videos.create_direct_upload", return_value=MOCK_UPLOAD_RESULT)
+@patch("app.api.videos.create_direct_upload", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
 def test_create_video_upload(mock_mux, client):
     headers, listing_id = _setup_user_and_listing(client)
     response = client.post(
@@ -38,7 +40,7 @@ def test_create_video_upload(mock_mux, client):
     mock_mux.assert_called_once()
 
 
-@patch("app.api.videos.create_direct_upload", return_value=MOCK_UPLOAD_RESULT)
+@patch("app.api.videos.create_direct_upload", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
 def test_create_video_upload_no_title(mock_mux, client):
     headers, listing_id = _setup_user_and_listing(client)
     response = client.post(
@@ -49,7 +51,7 @@ def test_create_video_upload_no_title(mock_mux, client):
     assert response.status_code == 201
 
 
-@patch("app.api.videos.create_direct_upload", return_value=MOCK_UPLOAD_RESULT)
+@patch("app.api.videos.create_direct_upload", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
 def test_video_limit_2(mock_mux, client):
     headers, listing_id = _setup_user_and_listing(client)
     # Create 2 videos
@@ -64,7 +66,7 @@ def test_video_limit_2(mock_mux, client):
     assert "Maximum 2 videos" in r3.json()["detail"]
 
 
-@patch("app.api.videos.create_direct_upload", return_value=MOCK_UPLOAD_RESULT)
+@patch("app.api.videos.create_direct_upload", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
 def test_get_video_status(mock_mux, client):
     headers, listing_id = _setup_user_and_listing(client)
     create = client.post(
@@ -105,6 +107,90 @@ def test_create_video_listing_not_found(client):
     assert response.status_code == 404
 
 
+@patch("app.api.videos.create_direct_upload", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_create_video_upload_claims_pooled_upload(mock_mux, client, db):
+    from datetime import datetime, timedelta, timezone
+    from app.models.video import ListingVideo, MuxUpload
+
+    headers, listing_id = _setup_user_and_listing(client)
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        MuxUpload(id="pooled-fresh", upload_url="https://mux.test/fresh", expires_at=now + timedelta(minutes=50)),
+        MuxUpload(id="pooled-stale", upload_url="https://mux.test/stale", expires_at=now + timedelta(minutes=5)),
+    ])
+    db.commit()
+
+    response = client.post(f"/listings/{listing_id}/videos", json={"title": "Tour"}, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["upload_url"] == "https://mux.test/fresh"
+    mock_mux.assert_not_called()
+    video = db.query(ListingVideo).filter(ListingVideo.id == response.json()["video_id"]).one()
+    assert video.mux_upload_id == "pooled-fresh"
+    # The nearly expired upload isn't handed out; the next request goes to Mux
+    assert [u.id for u in db.query(MuxUpload)] == ["pooled-stale"]
+    response = client.post(f"/listings/{listing_id}/videos", json={}, headers=headers)
+    assert response.json()["upload_url"] == MOCK_UPLOAD_RESULT["upload_url"]
+    mock_mux.assert_called_once()
+
+
+def test_fill_upload_pool(db, monkeypatch):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from app.core.config import settings
+    from app.core.metrics import registry
+    from app.models.video import MuxUpload
+    from app.services.mux_upload_pool import fill
+
+    monkeypatch.setattr(settings, "MUX_UPLOAD_POOL_SIZE", 3)
+    db.add(MuxUpload(id="old", upload_url="https://mux.test/old",
+                     expires_at=datetime.now(timezone.utc) + timedelta(minutes=1)))
+    db.commit()
+    created = iter(range(10))
+
+    async def fake_upload():
+        n = next(created)
+        return {"upload_id": f"up-{n}", "upload_url": f"https://mux.test/{n}"}
+
+    with patch("app.services.mux_upload_pool.create_direct_upload", side_effect=fake_upload):
+        assert asyncio.run(fill(db)) == 3
+        assert asyncio.run(fill(db)) == 0
+
+    assert sorted(u.id for u in db.query(MuxUpload)) == ["up-0", "up-1", "up-2"]
+    metrics = registry.render()
+    assert "mux_upload_pool_depth 3" in metrics
+    assert "mux_upload_pool_expired_total 1" in metrics
+
+
+def test_mux_calls_share_client_and_record_metrics():
+    import asyncio
+    from types import SimpleNamespace
+    from app.core.metrics import registry
+    from app.services import mux_service
+
+    asset = SimpleNamespace(data=SimpleNamespace(
+        id="asset-1", status="ready", playback_ids=[SimpleNamespace(id="pb-1")]
+    ))
+    clients = []
+
+    def fake_get_asset(self, asset_id, **kwargs):
+        clients.append(self.api_client)
+        assert kwargs["_return_http_data_only"] is False
+        return asset, 200, {}
+
+    try:
+        with patch("mux_python.AssetsApi.get_asset_with_http_info", fake_get_asset):
+            first = asyncio.run(mux_service.get_asset("asset-1"))
+            asyncio.run(mux_service.get_asset("asset-1"))
+    finally:
+        mux_service.close_mux_client()
+
+    assert first == {"asset_id": "asset-1", "playback_id": "pb-1", "status": "ready"}
+    assert clients[0] is clients[1]
+    metrics = registry.render()
+    assert 'upstream_requests_total{method="GET",service="mux",status="200"} 2' in metrics
+    assert 'upstream_request_duration_seconds_count{method="GET",service="mux"} 2' in metrics
+
+
 def test_mux_webhook_asset_ready(client, db):
     """Test Mux webhook for video.asset.ready event"""
     from app.models.video import ListingVideo
@@ -132,6 +218,7 @@ def test_mux_webhook_asset_ready(client, db):
         },
     })
     assert response.status_code == 200
+    assert process_events(db) == 1
 
     # Verify video was updated
     db.refresh(video)
@@ -160,6 +247,7 @@ def test_mux_webhook_asset_errored(client, db):
         "data": {"id": "asset-err-456"},
     })
     assert response.status_code == 200
+    assert process_events(db) == 1
 
     db.refresh(video)
     assert video.status == "error"
@@ -173,3 +261,231 @@ def test_mux_webhook_unknown_event(client):
     })
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+@patch("app.api.videos.create_direct_upload", new_callable=AsyncMock, return_value=MOCK_UPLOAD_RESULT)
+def test_mux_webhooks_link_upload_and_dedupe(mock_mux, client, db):
+    from app.models.video import ListingVideo
+    from app.models.webhook import MuxWebhookEvent
+
+    headers, listing_id = _setup_user_and_listing(client)
+    video_id = client.post(f"/listings/{listing_id}/videos", json={}, headers=headers).json()["video_id"]
+    linked = {
+        "id": "evt-1", "type": "video.upload.asset_created", "created_at": "2026-10-19T10:00:00Z",
+        "data": {"id": "mux-upload-123", "asset_id": "asset-new"},
+    }
+    ready = {
+        "id": "evt-2", "type": "video.asset.ready", "created_at": "2026-10-19T10:01:00Z",
+        "data": {"id": "asset-new", "upload_id": "mux-upload-123", "playback_ids": [{"id": "pb-new"}]},
+    }
+    # Delivered out of order, and the ready event twice
+    for event in (ready, linked, ready):
+        assert client.post("/webhooks/mux", json=event).status_code == 200
+    assert db.query(MuxWebhookEvent).count() == 2
+
+    assert process_events(db) == 2
+    assert process_events(db) == 0
+    video = db.query(ListingVideo).filter(ListingVideo.id == video_id).one()
+    assert (video.mux_asset_id, video.mux_playback_id, video.status) == ("asset-new", "pb-new", "ready")
+
+
+def test_mux_webhook_failure_does_not_block_batch(client, db, monkeypatch):
+    from app.core.config import settings
+    from app.models.video import ListingVideo
+    from app.models.webhook import MuxWebhookEvent
+
+    monkeypatch.setattr(settings, "MUX_WEBHOOK_MAX_ATTEMPTS", 2)
+    headers, listing_id = _setup_user_and_listing(client)
+    broken = ListingVideo(listing_id=listing_id, mux_asset_id="asset-broken", status="processing")
+    fine = ListingVideo(listing_id=listing_id, mux_asset_id="asset-fine", status="processing")
+    db.add_all([broken, fine])
+    db.commit()
+    client.post("/webhooks/mux", json={
+        "id": "evt-bad", "type": "video.asset.ready", "created_at": "2026-10-19T10:00:00Z",
+        "data": {"id": "asset-broken", "playback_ids": [{"policy": "public"}]},  # no playback id
+    })
+    client.post("/webhooks/mux", json={
+        "id": "evt-ok", "type": "video.asset.errored", "created_at": "2026-10-19T10:01:00Z",
+        "data": {"id": "asset-fine"},
+    })
+    client.post("/webhooks/mux", json={
+        "id": "evt-later", "type": "video.asset.errored", "created_at": "2026-10-19T10:02:00Z",
+        "data": {"id": "asset-broken"},
+    })
+
+    assert process_events(db) == 3
+    db.refresh(broken)
+    db.refresh(fine)
+    assert (broken.status, fine.status) == ("processing", "error")
+    failed = db.get(MuxWebhookEvent, "evt-bad")
+    assert (failed.attempts, failed.processed_at) == (1, None)
+    assert "KeyError" in failed.last_error
+    # Held back so it can't be overtaken by the retry
+    assert db.get(MuxWebhookEvent, "evt-later").processed_at is None
+
+    # Retried in the next batch and given up on; the held event then applies
+    assert process_events(db) == 2
+    db.refresh(failed)
+    assert failed.attempts == 2 and failed.processed_at is not None
+    assert process_events(db) == 0
+    db.refresh(broken)
+    assert broken.status == "error"
+
+
+def test_mux_webhook_invalid_json(client):
+    response = client.post("/webhooks/mux", content=b"{not json", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+
+
+def _add_video(db, listing_id, status, playback_id=None):
+    from app.models.video import ListingVideo
+
+    video = ListingVideo(listing_id=listing_id, status=status, mux_playback_id=playback_id)
+    db.add(video)
+    db.commit()
+    return video.id
+
+
+def test_video_events_stream_ends_when_nothing_is_processing(client, db, session_local):
+    headers, listing_id = _setup_user_and_listing(client)
+    video_id = _add_video(db, listing_id, "ready", "pb-1")
+
+    response = client.get(f"/listings/{listing_id}/videos/events", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == (
+        "event: status\n"
+        f'data: {{"id": "{video_id}", "status": "ready", "mux_playback_id": "pb-1"}}\n\n'
+    )
+
+
+def test_video_events_stream_relays_published_transitions(client, db, session_local):
+    import threading
+    import time
+    from app.services.video_events import broker, publish_video_status
+
+    headers, listing_id = _setup_user_and_listing(client)
+    video_id = _add_video(db, listing_id, "processing")
+
+    def publish_when_subscribed():
+        deadline = time.monotonic() + 5
+        while broker.subscriber_count(f"videos:{listing_id}") == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # From another thread, as the webhook worker may be
+        publish_video_status([(listing_id, {"id": video_id, "status": "ready", "mux_playback_id": "pb-2"})])
+
+    publisher = threading.Thread(target=publish_when_subscribed)
+    publisher.start()
+    response = client.get(f"/listings/{listing_id}/videos/events", headers=headers)
+    publisher.join()
+
+    events = [block for block in response.text.split("\n\n") if block.startswith("event:")]
+    assert len(events) == 2
+    assert '"status": "processing"' in events[0]
+    assert '"status": "ready", "mux_playback_id": "pb-2"' in events[1]
+    assert broker.subscriber_count(f"videos:{listing_id}") == 0
+
+
+def test_video_events_stream_outlives_request_session(client, db, session_local):
+    from app.core.database import get_db
+    from app.main import app
+
+    headers, listing_id = _setup_user_and_listing(client)
+    video_id = _add_video(db, listing_id, "ready", "pb-1")
+    exited = []
+
+    def request_db():
+        session = session_local()
+        try:
+            yield session
+        finally:
+            session.close()
+            session.bind = None  # any later use fails
+            exited.append(session)
+
+    app.dependency_overrides[get_db] = request_db
+    response = client.get(f"/listings/{listing_id}/videos/events", headers=headers)
+    assert exited
+    assert response.status_code == 200
+    assert f'"id": "{video_id}", "status": "ready"' in response.text
+
+
+def test_video_events_requires_own_listing(client):
+    headers, _ = _setup_user_and_listing(client)
+    response = client.get("/listings/nonexistent/videos/events", headers=headers)
+    assert response.status_code == 404
+
+
+def test_reconcile_stale_videos(client, db, query_counter):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from app.core.metrics import registry
+    from app.models.video import ListingVideo
+    from app.services.video_reconciler import reconcile
+
+    headers, listing_id = _setup_user_and_listing(client)
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.add_all([
+        # Lost its ready webhook
+        ListingVideo(id="v-ready", listing_id=listing_id, status="processing", mux_asset_id="a-1", created_at=old),
+        # Lost its asset_created webhook, and the asset has failed
+        ListingVideo(id="v-error", listing_id=listing_id, status="waiting", mux_upload_id="u-2", created_at=old),
+        # The browser hasn't uploaded yet
+        ListingVideo(id="v-waiting", listing_id=listing_id, status="waiting", mux_upload_id="u-3", created_at=old),
+        # Too recent to be stale
+        ListingVideo(id="v-new", listing_id=listing_id, status="processing", mux_asset_id="a-4"),
+    ])
+    db.commit()
+
+    assets = {
+        "a-1": {"asset_id": "a-1", "playback_id": "pb-1", "status": "ready"},
+        "a-2": {"asset_id": "a-2", "playback_id": None, "status": "errored"},
+    }
+    uploads = {
+        "u-2": {"upload_id": "u-2", "status": "asset_created", "asset_id": "a-2"},
+        "u-3": {"upload_id": "u-3", "status": "waiting", "asset_id": None},
+    }
+    with patch("app.services.video_reconciler.get_asset", new_callable=AsyncMock, side_effect=assets.get) as mock_asset, \
+            patch("app.services.video_reconciler.get_direct_upload", new_callable=AsyncMock, side_effect=uploads.get):
+        assert asyncio.run(reconcile(db)) == 2
+    assert sorted(call.args[0] for call in mock_asset.call_args_list) == ["a-1", "a-2"]
+    assert len([statement for statement in query_counter if statement.startswith("UPDATE listing_videos")]) == 1
+
+    db.expire_all()
+    state = {v.id: (v.status, v.mux_asset_id, v.mux_playback_id) for v in db.query(ListingVideo)}
+    assert state == {
+        "v-ready": ("ready", "a-1", "pb-1"),
+        "v-error": ("error", "a-2", None),
+        "v-waiting": ("waiting", None, None),
+        "v-new": ("processing", "a-4", None),
+    }
+    assert 'video_reconcile_checked_total{result="healed"} 2' in registry.render()
+
+
+def test_reconcile_keeps_webhook_state_set_during_mux_call(client, db, session_local):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from app.models.video import ListingVideo
+    from app.services.video_reconciler import reconcile
+
+    headers, listing_id = _setup_user_and_listing(client)
+    old = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.add(ListingVideo(id="v-raced", listing_id=listing_id, status="processing", mux_asset_id="a-1", created_at=old))
+    db.commit()
+
+    async def errored_after_webhook(asset_id):
+        # The ready webhook is applied while Mux still reports the asset as errored
+        other = session_local()
+        other.query(ListingVideo).filter(ListingVideo.id == "v-raced").update(
+            {ListingVideo.status: "ready", ListingVideo.mux_playback_id: "pb-1"}
+        )
+        other.commit()
+        other.close()
+        return {"asset_id": asset_id, "playback_id": None, "status": "errored"}
+
+    with patch("app.services.video_reconciler.get_asset", side_effect=errored_after_webhook):
+        assert asyncio.run(reconcile(db)) == 0
+
+    db.expire_all()
+    video = db.get(ListingVideo, "v-raced")
+    assert (video.status, video.mux_playback_id) == ("ready", "pb-1")
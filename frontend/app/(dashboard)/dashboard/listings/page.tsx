@@ -37,6 +37,12 @@ interface Listing {
   first_photo_url: string | null;
 }
 
+interface ListingPage {
+  items: Listing[];
+  next_cursor: string | null;
+  facets: Record<string, number> | null;
+}
+
 type FilterTab = "active" | "archived" | "all";
 
 function formatPrice(cents: number): string {
@@ -57,19 +63,28 @@ const FREE_TIER_LIMIT = 5;
 export default function ListingsPage() {
   const router = useRouter();
   const [listings, setListings] = useState<Listing[]>([]);
-  const [allListings, setAllListings] = useState<Listing[]>([]);
+  const [facets, setFacets] = useState<Record<string, number>>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [activeTab, setActiveTab] = useState<FilterTab>("active");
 
+  const listingsPath = useCallback(
+    (cursor?: string) => {
+      const params = new URLSearchParams({ include: "facets" });
+      if (activeTab !== "all") params.set("status", activeTab);
+      if (cursor) params.set("cursor", cursor);
+      return `/listings?${params}`;
+    },
+    [activeTab]
+  );
+
   const fetchListings = useCallback(async () => {
     try {
-      const params = activeTab === "all" ? "" : `?status=${activeTab}`;
-      const [filtered, all] = await Promise.all([
-        api.fetch(`/listings${params}`),
-        api.fetch("/listings"),
-      ]);
-      setListings(filtered);
-      setAllListings(all);
+      const page: ListingPage = await api.fetch(listingsPath());
+      setListings(page.items);
+      setFacets(page.facets ?? {});
+      setNextCursor(page.next_cursor);
     } catch (err) {
       toast.error(
         err instanceof Error ? err.message : "Failed to load listings"
@@ -77,9 +92,27 @@ export default function ListingsPage() {
     } finally {
       setLoading(false);
     }
-  }, [activeTab]);
+  }, [listingsPath]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page: ListingPage = await api.fetch(listingsPath(nextCursor));
+      setListings((prev) => [...prev, ...page.items]);
+      if (page.facets) setFacets(page.facets);
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      toast.error(
+        err instanceof Error ? err.message : "Failed to load listings"
+      );
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-  const activeCount = allListings.filter((l) => l.status === "active").length;
+  // Facets count all listings whatever the status filter, so this is right on every tab
+  const activeCount = facets.active ?? 0;
   const atLimit = activeCount >= FREE_TIER_LIMIT;
 
   useEffect(() => {
@@ -363,6 +396,14 @@ export default function ListingsPage() {
           </Card>
         ))}
       </div>
+
+      {nextCursor && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? "Loading..." : "Load more"}
+          </Button>
+        </div>
+      )}
     </div>
   );
 }
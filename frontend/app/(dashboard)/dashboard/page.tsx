@@ -1,7 +1,9 @@
 "use client";
 
+import { useEffect, useState } from "react";
 import Link from "next/link";
 import { useAuth } from "@/lib/auth";
+import { api } from "@/lib/api";
 import { Button } from "@/components/ui/button";
 import {
   Card,
@@ -11,14 +13,29 @@ import {
 } from "@/components/ui/card";
 import { Building2, Users, Mail } from "lucide-react";
 
-const stats = [
-  { label: "Active Listings", value: "0", icon: Building2 },
-  { label: "Total Agents", value: "0", icon: Users },
-  { label: "Leads Received", value: "0", icon: Mail },
-];
+interface Stats {
+  active_listings: number;
+  total_listings: number;
+  total_leads: number;
+  total_agents: number;
+}
 
 export default function DashboardPage() {
   const { user } = useAuth();
+  const [counts, setCounts] = useState<Stats | null>(null);
+
+  useEffect(() => {
+    api
+      .fetch("/stats")
+      .then(setCounts)
+      .catch(() => setCounts(null));
+  }, []);
+
+  const stats = [
+    { label: "Active Listings", value: counts?.active_listings, icon: Building2 },
+    { label: "Total Agents", value: counts?.total_agents, icon: Users },
+    { label: "Leads Received", value: counts?.total_leads, icon: Mail },
+  ];
 
   return (
     <div className="space-y-8">
@@ -46,7 +63,7 @@ export default function DashboardPage() {
               </CardHeader>
               <CardContent>
                 <p className="text-3xl font-bold text-gray-900">
-                  {stat.value}
+                  {stat.value ?? "–"}
                 </p>
               </CardContent>
             </Card>
@@ -14,6 +14,7 @@ interface Photo {
   url: string;
   thumbnail_url: string;
   position: number;
+  blur_data_url?: string | null;
 }
 
 interface Video {
@@ -94,7 +95,7 @@ export default async function UnbrandedPropertyPage({
     <div className="mx-auto max-w-5xl bg-white">
       {/* Hero */}
       {heroPhoto && (
-        <HeroImage src={heroPhoto.url} alt={listing.address} />
+        <HeroImage src={heroPhoto.url} alt={listing.address} blurDataURL={heroPhoto.blur_data_url} />
       )}
 
       {/* Property details */}
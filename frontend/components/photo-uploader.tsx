@@ -32,6 +32,11 @@ interface Photo {
   position: number;
 }
 
+interface DirectUploadTicket {
+  photo_id: string;
+  upload_url: string;
+}
+
 interface PhotoUploaderProps {
   listingId: string;
   photos: Photo[];
@@ -39,6 +44,7 @@ interface PhotoUploaderProps {
 }
 
 const MAX_PHOTOS = 50;
+const UPLOAD_CONCURRENCY = 4;
 
 function SortablePhoto({
   photo,
@@ -165,15 +171,43 @@ export function PhotoUploader({
       setUploadCount(filesToUpload.length);
 
       let successCount = 0;
-      for (const file of filesToUpload) {
-        try {
-          await api.uploadFile(`/listings/${listingId}/photos`, file);
-          successCount++;
-        } catch (err) {
-          toast.error(
-            `Failed to upload ${file.name}: ${err instanceof Error ? err.message : "Unknown error"}`
-          );
-        }
+      try {
+        // Photo bytes go straight to Cloudflare; the API only hands out
+        // one-time upload URLs and finalizes each photo afterwards.
+        const tickets: DirectUploadTicket[] = await api.post(
+          `/listings/${listingId}/photos/direct-upload`,
+          { count: filesToUpload.length }
+        );
+        const queue = filesToUpload.map((file, i) => ({ file, ticket: tickets[i] }));
+        const worker = async () => {
+          for (let item = queue.shift(); item; item = queue.shift()) {
+            const { file, ticket } = item;
+            const photoPath = `/listings/${listingId}/photos/${ticket.photo_id}`;
+            try {
+              const formData = new FormData();
+              formData.append("file", file);
+              const res = await globalThis.fetch(ticket.upload_url, {
+                method: "POST",
+                body: formData,
+              });
+              if (!res.ok) throw new Error("Upload failed");
+              await api.post(`${photoPath}/complete`, {});
+              successCount++;
+            } catch (err) {
+              api.delete(photoPath).catch(() => {});
+              toast.error(
+                `Failed to upload ${file.name}: ${err instanceof Error ? err.message : "Unknown error"}`
+              );
+            }
+          }
+        };
+        await Promise.all(
+          Array.from({ length: Math.min(UPLOAD_CONCURRENCY, queue.length) }, worker)
+        );
+      } catch (err) {
+        toast.error(
+          `Failed to upload photos: ${err instanceof Error ? err.message : "Unknown error"}`
+        );
       }
 
       setUploading(false);
@@ -245,9 +279,11 @@ export function PhotoUploader({
       setLocalPhotos(newPhotos);
 
       try {
-        await api.put(`/listings/${listingId}/photos/order`, {
-          photo_ids: newPhotos.map((p) => p.id),
-        });
+        // Only the dragged photo's position changes on the server
+        await api.post(
+          `/listings/${listingId}/photos/${active.id}/move`,
+          newIndex > oldIndex ? { after: over.id } : { before: over.id }
+        );
         onPhotosChange();
       } catch (err) {
         // Revert on error
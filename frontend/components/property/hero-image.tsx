@@ -3,9 +3,10 @@ import Image from "next/image";
 interface HeroImageProps {
   src: string;
   alt: string;
+  blurDataURL?: string | null;
 }
 
-export function HeroImage({ src, alt }: HeroImageProps) {
+export function HeroImage({ src, alt, blurDataURL }: HeroImageProps) {
   return (
     <div className="relative w-full aspect-[16/10] max-h-[60vh] overflow-hidden">
       <Image
@@ -15,6 +16,7 @@ export function HeroImage({ src, alt }: HeroImageProps) {
         priority
         className="object-cover"
         sizes="100vw"
+        {...(blurDataURL ? { placeholder: "blur" as const, blurDataURL } : {})}
       />
     </div>
   );
@@ -66,48 +66,11 @@ function VideoStatusBadge({ status }: { status: string }) {
 
 function VideoCard({
   video,
-  listingId,
   onDelete,
-  onStatusUpdate,
 }: {
   video: VideoData;
-  listingId: string;
   onDelete: (id: string) => void;
-  onStatusUpdate: (id: string, status: string) => void;
 }) {
-  const pollingRef = useRef<ReturnType<typeof setInterval> | null>(null);
-
-  useEffect(() => {
-    // Poll for status updates if video is processing
-    if (video.status === "processing" || video.status === "waiting") {
-      pollingRef.current = setInterval(async () => {
-        try {
-          const data = await api.fetch(
-            `/listings/${listingId}/videos/${video.id}`
-          );
-          if (data.status !== video.status) {
-            onStatusUpdate(video.id, data.status);
-            if (data.status === "ready" || data.status === "error" || data.status === "errored") {
-              if (pollingRef.current) {
-                clearInterval(pollingRef.current);
-                pollingRef.current = null;
-              }
-            }
-          }
-        } catch {
-          // Silently fail on poll errors
-        }
-      }, 5000);
-    }
-
-    return () => {
-      if (pollingRef.current) {
-        clearInterval(pollingRef.current);
-        pollingRef.current = null;
-      }
-    };
-  }, [video.id, video.status, listingId, onStatusUpdate]);
-
   return (
     <div className="flex items-center justify-between p-4 rounded-lg border border-gray-200 bg-white">
       <div className="flex items-center gap-3">
@@ -161,10 +124,19 @@ export function VideoUploader({
     setLocalVideos(videos);
   }
 
+  const videosRef = useRef(localVideos);
+  videosRef.current = localVideos;
+
   const handleStatusUpdate = useCallback(
-    (videoId: string, newStatus: string) => {
+    (videoId: string, newStatus: string, playbackId: string | null) => {
+      const current = videosRef.current.find((v) => v.id === videoId);
+      if (!current || current.status === newStatus) return;
       setLocalVideos((prev) =>
-        prev.map((v) => (v.id === videoId ? { ...v, status: newStatus } : v))
+        prev.map((v) =>
+          v.id === videoId
+            ? { ...v, status: newStatus, mux_playback_id: playbackId }
+            : v
+        )
       );
       if (newStatus === "ready") {
         toast.success("Video is ready!");
@@ -174,6 +146,40 @@ export function VideoUploader({
     [onVideosChange]
   );
 
+  const hasPending = localVideos.some(
+    (v) => v.status === "processing" || v.status === "waiting"
+  );
+
+  useEffect(() => {
+    // One status stream per tab while a video is encoding; the server ends
+    // it once none is
+    if (!hasPending) return;
+    const controller = new AbortController();
+    let retry: ReturnType<typeof setTimeout> | null = null;
+
+    const connect = () => {
+      api
+        .streamEvents(
+          `/listings/${listingId}/videos/events`,
+          (event, data) => {
+            if (event !== "status") return;
+            const update = JSON.parse(data);
+            handleStatusUpdate(update.id, update.status, update.mux_playback_id);
+          },
+          controller.signal
+        )
+        .catch(() => {
+          if (!controller.signal.aborted) retry = setTimeout(connect, 5000);
+        });
+    };
+    connect();
+
+    return () => {
+      controller.abort();
+      if (retry) clearTimeout(retry);
+    };
+  }, [hasPending, listingId, handleStatusUpdate]);
+
   const handleUpload = useCallback(
     async (file: File) => {
       if (localVideos.length >= MAX_VIDEOS) {
@@ -269,13 +275,7 @@ export function VideoUploader({
       {localVideos.length > 0 && (
         <div className="space-y-3">
           {localVideos.map((video) => (
-            <VideoCard
-              key={video.id}
-              video={video}
-              listingId={listingId}
-              onDelete={handleDelete}
-              onStatusUpdate={handleStatusUpdate}
-            />
+            <VideoCard key={video.id} video={video} onDelete={handleDelete} />
           ))}
         </div>
       )}
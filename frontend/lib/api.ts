@@ -59,6 +59,44 @@ class ApiClient {
     return API_URL;
   }
 
+  /**
+   * Read a server-sent events stream. Uses fetch rather than EventSource so
+   * the Authorization header can be sent. Resolves when the server ends it.
+   */
+  async streamEvents(
+    path: string,
+    onEvent: (event: string, data: string) => void,
+    signal?: AbortSignal
+  ) {
+    const token = this.getToken();
+    const headers: Record<string, string> = { Accept: "text/event-stream" };
+    if (token) headers["Authorization"] = `Bearer ${token}`;
+
+    const res = await globalThis.fetch(`${API_URL}${path}`, { headers, signal });
+    if (!res.ok || !res.body) {
+      throw new Error("Stream failed");
+    }
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) return;
+      buffer += value;
+      let end;
+      while ((end = buffer.indexOf("\n\n")) !== -1) {
+        const block = buffer.slice(0, end);
+        buffer = buffer.slice(end + 2);
+        let event = "message";
+        const data: string[] = [];
+        for (const line of block.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+        }
+        if (data.length > 0) onEvent(event, data.join("\n"));
+      }
+    }
+  }
+
   /**
    * Upload a file using FormData. Does NOT set Content-Type header so browser
    * can set it with the correct multipart boundary automatically.
@@ -66,6 +104,10 @@ class ApiClient {
   async uploadFile(path: string, file: File) {
     const formData = new FormData();
     formData.append("file", file);
+    return this.postForm(path, formData);
+  }
+
+  private async postForm(path: string, formData: FormData) {
     const token = this.getToken();
     const headers: Record<string, string> = {};
     if (token) headers["Authorization"] = `Bearer ${token}`;